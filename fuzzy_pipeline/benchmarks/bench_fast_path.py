@@ -0,0 +1,85 @@
+# FILE: bench_fast_path.py
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+os.chdir(current_dir.parent)
+
+# The benchmark never reaches the network; the clients only need a key to be constructed
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("GROQ_API_KEY", "offline")
+
+import main
+from shared.llm_gateway import LLMGateway
+from shared.rule_extractors import FIELD_RULES
+
+# Count every request the pipeline would send, not what a warm response cache saves
+main.llm_cache.enabled = False
+
+PDF_PATH = current_dir.parent / "tests" / "contract_files" / "WMGTS.pdf"
+
+
+class SlowCompletions(LLMGateway):
+    """
+    Stands in for the LLM gateway (keeping the configured providers and routes): answers "value" after a fixed latency and counts requests.
+    """
+    def __init__(self, latency_ms: float):
+        super().__init__(main.llm_gateway.providers, routes=main.llm_gateway.routes)
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def response(self):
+        self.calls += 1
+        return SimpleNamespace(model="offline", usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content="value"))])
+
+    def complete(self, messages, field=None, response_format=None):
+        time.sleep(self.latency_ms / 1000)
+        return self.response()
+
+    async def acomplete(self, messages, field=None, response_format=None):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self.response()
+
+
+def main_benchmark():
+    """
+    Runs `process_document` on a contract with and without the fast path against an LLM stand-in
+    with a fixed latency, and reports LLM calls, time per document and which fields the
+    patterns answered.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the deterministic fast path of the fuzzy pipeline.")
+    parser.add_argument("pdf", nargs="?", default=str(PDF_PATH))
+    parser.add_argument("--llm-ms", type=float, default=1500, help="Latency of every LLM call")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--sequential", action="store_true", help="One field after another (EXTRACTION.async: false)")
+    args = parser.parse_args()
+    main.ASYNC_EXTRACTION = not args.sequential
+
+    # The configured fields, or every supported one while the fast path is off in config.yaml
+    fast_path_fields = list(main.FAST_PATH_FIELDS) or [field for field in main.FIELDS_TO_EXTRACT if field in FIELD_RULES]
+    for label, fields in (("LLM only", []), ("fast path", fast_path_fields)):
+        main.FAST_PATH_FIELDS = fields
+        completions = SlowCompletions(args.llm_ms)
+        main.llm_gateway = completions
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            rows = asyncio.run(main.process_document(args.pdf))
+            timings.append(time.perf_counter() - start)
+        rules = [row for row in rows if row.get("source") == "rules"]
+        print(f"\n{label:>9}: {completions.calls / args.rounds:.0f} LLM calls, "
+              f"{sum(timings) / len(timings):.2f}s per document, {len(rules)} of {len(rows)} fields answered by the patterns")
+        for row in rules:
+            print(f"           {row['field']}: {row['value']} (page {row['page_num']})")
+    print(f"\nFast path: {main.rule_extractor.stats()['ms_per_document']:.1f}ms per document")
+
+
+if __name__ == "__main__":
+    main_benchmark()
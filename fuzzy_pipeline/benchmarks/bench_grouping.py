@@ -0,0 +1,85 @@
+# FILE: bench_grouping.py
+
+import os
+import sys
+import json
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+os.chdir(current_dir.parent)
+
+# The benchmark never reaches the network; the clients only need a key to be constructed
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("GROQ_API_KEY", "offline")
+
+import main
+from shared.llm_gateway import LLMGateway
+from grouped import ExtractionStats
+
+# Count every request the pipeline would send, not what a warm response cache saves
+main.llm_cache.enabled = False
+
+PDF_PATH = current_dir.parent / "tests" / "contract_files" / "WMGTS.pdf"
+
+# Fields the offline model "finds" on the first page it is asked about; the others are 'NA',
+# so they move on through their matched pages
+FOUND_FIELDS = {"currency", "sow_no", "sow_start_date", "client_company_name", "credit_period", "sow_value"}
+
+
+class OfflineCompletions(LLMGateway):
+    """
+    Stands in for the LLM gateway (keeping the configured providers and routes) and records the prompt size of every request.
+    """
+    def __init__(self):
+        super().__init__(main.llm_gateway.providers, routes=main.llm_gateway.routes)
+        self.prompt_chars = 0
+
+    async def acomplete(self, messages, field=None, response_format=None):
+        prompt = messages[-1]["content"]
+        self.prompt_chars += sum(len(message["content"]) for message in messages)
+        if response_format:
+            keys = prompt.rsplit("exactly these keys: ", 1)[1].split(". Each value")[0]
+            fields = [key.strip().strip('"') for key in keys.split(",")]
+            content = json.dumps({field: ("value" if field in FOUND_FIELDS else "NA") for field in fields})
+        else:
+            field = next((field for field, template in main.PROMPTS.items() if prompt.startswith(template.split("{page_content}")[0])), "")
+            content = "value" if field in FOUND_FIELDS else "NA"
+        return SimpleNamespace(model="offline", usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+async def run(grouping: str, document, match_result, fields):
+    completions = OfflineCompletions()
+    main.llm_gateway = completions
+    stats = ExtractionStats()
+    if grouping == "page":
+        values = await main.extract_fields_grouped_async(fields, document, match_result, stats)
+    else:
+        values = await main.extract_fields_async(fields, document, match_result, stats)
+    return values, stats, completions.prompt_chars
+
+
+def main_benchmark():
+    """
+    Counts LLM calls and prompt size per document in field-by-field and page-grouped modes.
+    """
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else str(PDF_PATH)
+    document = main.load_pdf_content(pdf_path)
+    match_result = main.MATCHER.score(document)
+    fields = list(main.PROMPTS.keys())
+
+    results = {}
+    for grouping in ("field", "page"):
+        results[grouping] = asyncio.run(run(grouping, document, match_result, fields))
+
+    print(f"\nDocument: {pdf_path} ({len(document)} pages, {len(fields)} fields)")
+    for grouping, (values, stats, prompt_chars) in results.items():
+        print(f"{grouping:>5} grouping: {stats.summary()}, ~{prompt_chars // 4} prompt tokens")
+    same = results["field"][0] == results["page"][0]
+    print(f"Identical extracted values: {same}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
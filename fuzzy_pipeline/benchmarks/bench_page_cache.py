@@ -0,0 +1,74 @@
+# FILE: bench_page_cache.py
+
+import sys
+import time
+from pathlib import Path
+
+import yaml
+import PyPDF2
+from fuzzywuzzy import fuzz
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from document import PdfDocument
+
+PDF_PATH = current_dir.parent / "tests" / "contract_files" / "WMGTS.pdf"
+CONFIG_PATH = current_dir.parent / "config.yaml"
+
+
+def match_uncached(pdf_reader: PyPDF2.PdfReader, templates: dict) -> int:
+    """
+    Previous behaviour: every field re-extracts and re-lowercases every page.
+    Returns the number of page extractions performed.
+    """
+    extractions = 0
+    for field, field_templates in templates.items():
+        for page_num in range(len(pdf_reader.pages)):
+            page_text = pdf_reader.pages[page_num].extract_text() or ""
+            extractions += 1
+            for template in field_templates:
+                if fuzz.partial_ratio(template.lower(), page_text.lower()) > 60:
+                    break
+    return extractions
+
+
+def match_cached(document: PdfDocument, templates: dict) -> int:
+    """
+    New behaviour: pages are extracted once and read from the PdfDocument cache.
+    Returns the number of page extractions performed.
+    """
+    for field, field_templates in templates.items():
+        for page_num, page_text in document.pages():
+            for template in field_templates:
+                if fuzz.partial_ratio(template.lower(), page_text) > 60:
+                    break
+    return document.extractions
+
+
+def main():
+    """
+    Compares the page-parse cost of fuzzy matching with and without the page text cache.
+    """
+    with open(CONFIG_PATH, "r") as file:
+        templates = yaml.safe_load(file).get("SOW_TEMPLATES", {})
+
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else str(PDF_PATH)
+
+    start = time.perf_counter()
+    uncached_extractions = match_uncached(PyPDF2.PdfReader(pdf_path), templates)
+    uncached_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cached_extractions = match_cached(PdfDocument(PyPDF2.PdfReader(pdf_path)), templates)
+    cached_time = time.perf_counter() - start
+
+    pages = len(PyPDF2.PdfReader(pdf_path).pages)
+    print(f"Document: {pdf_path} ({pages} pages, {len(templates)} fields)")
+    print(f"Uncached: {uncached_extractions} page extractions in {uncached_time:.2f}s")
+    print(f"Cached:   {cached_extractions} page extractions in {cached_time:.2f}s")
+    print(f"Speedup:  {uncached_time / cached_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# FILE: bench_prefilter.py
+
+import sys
+import time
+from pathlib import Path
+
+import yaml
+import PyPDF2
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from document import PdfDocument
+from matcher import SCORERS, TemplateMatcher
+
+PDF_PATH = current_dir.parent / "tests" / "contract_files" / "WMGTS.pdf"
+CONFIG_PATH = current_dir.parent / "config.yaml"
+
+
+def main():
+    """
+    Benchmarks the matching stage with and without the exact-anchor prefilter on long pages.
+
+    Usage: python bench_prefilter.py [pdf_path] [page_multiplier]
+    Each page is concatenated with itself `page_multiplier` times to simulate long pages.
+    """
+    with open(CONFIG_PATH, "r") as file:
+        templates = yaml.safe_load(file).get("SOW_TEMPLATES", {})
+
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else str(PDF_PATH)
+    page_multiplier = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    document = PdfDocument(PyPDF2.PdfReader(pdf_path)).preload()
+    pages = [" ".join([page_text] * page_multiplier) for _, page_text in document.pages()]
+    average_length = sum(len(page) for page in pages) // len(pages)
+    print(f"Document: {pdf_path} ({len(pages)} pages, {average_length} chars per page on average)")
+
+    for scorer in SCORERS:
+        full = TemplateMatcher(templates, scorer=scorer, prefilter=False)
+        prefiltered = TemplateMatcher(templates, scorer=scorer, prefilter=True)
+
+        start = time.perf_counter()
+        full_result = full.score_pages(pages)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        prefiltered_result = prefiltered.score_pages(pages)
+        prefiltered_time = time.perf_counter() - start
+
+        changed = [
+            field for field in templates
+            if [page for page, _, _ in full_result.matched_pages(field)]
+            != [page for page, _, _ in prefiltered_result.matched_pages(field)]
+        ]
+
+        print(f"\nScorer: {scorer}")
+        print(f"  No prefilter: {full_time:.3f}s ({full_result.fuzzy_pairs} fuzzy pairs)")
+        print(
+            f"  Prefiltered:  {prefiltered_time:.3f}s ({prefiltered_result.fuzzy_pairs} fuzzy pairs, "
+            f"{int(prefiltered_result.anchored.sum())} exact anchors)"
+        )
+        print(f"  Speedup:      {full_time / prefiltered_time:.1f}x")
+        print(f"  Fields with different matched pages: {', '.join(changed) if changed else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
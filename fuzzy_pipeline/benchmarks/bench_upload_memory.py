@@ -0,0 +1,73 @@
+# FILE: bench_upload_memory.py
+
+import os
+import sys
+import asyncio
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+
+from fastapi import UploadFile
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent.parent))
+
+from shared.uploads import save_upload
+
+SIZES_MB = [10, 40, 80, 160]
+
+
+async def save_buffered(file: UploadFile, file_location: str) -> None:
+    """
+    Previous behaviour: read the whole upload into memory, then write it out.
+    """
+    with open(file_location, "wb") as f:
+        f.write(await file.read())
+
+
+def measure(mode: str, source_path: str) -> None:
+    """
+    Saves `source_path` as an upload with the given mode and prints this process's peak RSS in MB.
+    """
+    target_dir = tempfile.mkdtemp()
+    target = os.path.join(target_dir, "upload.pdf")
+    with open(source_path, "rb") as source:
+        upload = UploadFile(file=source, filename="upload.pdf")
+        if mode == "buffered":
+            asyncio.run(save_buffered(upload, target))
+        else:
+            asyncio.run(save_upload(upload, target))
+    os.remove(target)
+    os.rmdir(target_dir)
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def main():
+    """
+    Compares peak RSS of buffered vs streamed uploads as the file size grows.
+    Each measurement runs in a fresh process so peaks do not carry over.
+    """
+    print(f"{'size':>8} {'buffered':>12} {'streamed':>12}")
+    for size_mb in SIZES_MB:
+        with tempfile.NamedTemporaryFile(delete=False) as source:
+            for _ in range(size_mb):
+                source.write(os.urandom(1024 * 1024))
+        try:
+            peaks = {}
+            for mode in ("buffered", "streamed"):
+                output = subprocess.run(
+                    [sys.executable, __file__, mode, source.name],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                peaks[mode] = float(output.strip().splitlines()[-1])
+            print(f"{size_mb:>6}MB {peaks['buffered']:>10.0f}MB {peaks['streamed']:>10.0f}MB")
+        finally:
+            os.remove(source.name)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure(sys.argv[1], sys.argv[2])
+    else:
+        main()
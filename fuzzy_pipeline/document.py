@@ -0,0 +1,62 @@
+from typing import Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+
+class PdfDocument:
+    """
+    Wraps a PdfReader and extracts every page at most once.
+
+    Page text is extracted lazily on first access and memoized, together with its
+    lowercased form, so fuzzy matching and the LLM stage can read the same page any
+    number of times without re-parsing the PDF.
+
+    Attributes:
+        pdf_reader (PyPDF2.PdfReader): The underlying reader.
+        extractions (int): Number of times a page was actually parsed (for benchmarking).
+    """
+    def __init__(self, pdf_reader: PyPDF2.PdfReader):
+        self.pdf_reader = pdf_reader
+        self.extractions = 0
+        self._page_count = len(pdf_reader.pages)
+        self._texts: List[Optional[str]] = [None] * self._page_count
+        self._lowered: List[Optional[str]] = [None] * self._page_count
+
+    def __len__(self) -> int:
+        return self._page_count
+
+    def page_text(self, page_num: int) -> str:
+        """
+        Returns the raw extracted text of a page (0-based), as sent to the LLM.
+        """
+        text = self._texts[page_num]
+        if text is None:
+            text = self.pdf_reader.pages[page_num].extract_text() or ""
+            self.extractions += 1
+            self._texts[page_num] = text
+        return text
+
+    def lower_text(self, page_num: int) -> str:
+        """
+        Returns the lowercased text of a page (0-based), used for matching.
+        """
+        lowered = self._lowered[page_num]
+        if lowered is None:
+            lowered = self.page_text(page_num).lower()
+            self._lowered[page_num] = lowered
+        return lowered
+
+    def pages(self) -> Iterator[Tuple[int, str]]:
+        """
+        Iterates over (page_num, lowercased text) for every page.
+        """
+        for page_num in range(self._page_count):
+            yield page_num, self.lower_text(page_num)
+
+    def preload(self) -> "PdfDocument":
+        """
+        Extracts and lowercases every page up front.
+        """
+        for page_num in range(self._page_count):
+            self.lower_text(page_num)
+        return self
@@ -0,0 +1,77 @@
+import json
+import re
+from typing import Dict, List
+
+
+class ExtractionStats:
+    """
+    Counts LLM traffic for one document.
+
+    Attributes:
+        llm_calls (int): Chat completion requests actually sent.
+        field_requests (int): (field, page) extraction requests; in field-by-field mode every
+            request is its own call, so this is the call count that mode would have made.
+        cache_hits (int): Requests answered from the LLM response cache instead of the API.
+    """
+    def __init__(self):
+        self.llm_calls = 0
+        self.field_requests = 0
+        self.cache_hits = 0
+
+    def summary(self) -> str:
+        return (
+            f"LLM calls: {self.llm_calls} for {self.field_requests} field/page requests, "
+            f"{self.cache_hits} answered from cache"
+        )
+
+
+def build_grouped_prompt(fields: List[str], prompts: Dict[str, str], page_content: str) -> str:
+    """
+    Builds one prompt asking for several fields from the same page.
+
+    The page text is included once, and each field's prompt from config.yaml is kept as that
+    field's instructions, with its {page_content} placeholder pointing back at the page.
+    """
+    instructions = "\n\n".join(
+        f"### {field}\n{prompts[field].format(page_content='(the page text above)').strip()}"
+        for field in fields
+    )
+    keys = ", ".join(f'"{field}"' for field in fields)
+    return (
+        "The following text is one page of a contract:\n\n"
+        f"<page>\n{page_content}\n</page>\n\n"
+        "Extract each of the fields below from this page, following the instructions given for that field.\n\n"
+        f"{instructions}\n\n"
+        f"Return only a JSON object with exactly these keys: {keys}. "
+        "Each value must be a string formatted as its instructions require, or 'NA' if the field is not found on this page."
+    )
+
+
+def parse_grouped_response(response_text: str, fields: List[str]) -> Dict[str, str]:
+    """
+    Parses the JSON object returned for a grouped prompt.
+
+    Returns the fields the object answers ('NA' if its value is empty). Fields it lacks, or all
+    fields if the response is not a JSON object, are left out as unresolved, so the caller can
+    extract them field by field.
+    """
+    if not response_text:
+        return {}
+
+    # Tolerate a fenced code block around the object
+    match = re.search(r"\{.*\}", response_text, re.DOTALL)
+    try:
+        response_json = json.loads(match.group(0) if match else response_text)
+    except json.JSONDecodeError as e:
+        print(f"Could not parse grouped response for fields {fields}: {e}")
+        return {}
+    if not isinstance(response_json, dict):
+        print(f"Grouped response for fields {fields} is not a JSON object")
+        return {}
+
+    extracted = {}
+    for field in fields:
+        if field in response_json:
+            value = response_json[field]
+            extracted[field] = str(value).strip() if value is not None and str(value).strip() else "NA"
+    return extracted
@@ -1,23 +1,36 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import os
+import sys
+import uuid
 import yaml
 import json
-from typing import Dict, List
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
 
 import PyPDF2
-from fuzzywuzzy import fuzz
-from groq import Groq
+
+from document import PdfDocument
+from matcher import MatchResult, TemplateMatcher
+from grouped import ExtractionStats, build_grouped_prompt, parse_grouped_response
+
+# Make the repository level `shared` package importable when running from fuzzy_pipeline/
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from shared.jobs import DONE, FAILED, JobStore, WorkerPool
+from shared.llm_cache import LLMCache, LLMCacheMiss
+from shared.llm_gateway import LLMGateway, load_providers
+from shared.rule_extractors import RuleExtractor
+from shared.uploads import save_upload
 
 app = FastAPI()
 
 load_dotenv()
 
-client = OpenAI(api_key = os.getenv("OPENAI_API_KEY"))
-
 
 def load_config(config_path: str = 'config.yaml') -> dict:
     """
@@ -35,17 +48,79 @@ def load_config(config_path: str = 'config.yaml') -> dict:
 
 config = load_config()
 
-# Initialize Groq client (reads API key from environment variable)
-groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# LLM providers (OpenAI and Groq through their OpenAI-compatible APIs): requests are routed to
+# the healthiest, fastest provider allowed for the field and fail over on errors
+LLM_ROUTER = config.get("LLM_ROUTER") or {}
+llm_gateway = LLMGateway(
+    load_providers(LLM_ROUTER.get("providers") or [{"name": "openai", "model": "gpt-4o-mini", "api_key_env": "OPENAI_API_KEY"}]),
+    routes=LLM_ROUTER.get("field_routes") or {},
+    window_seconds=LLM_ROUTER.get("window_seconds", 300),
+    slow_factor=LLM_ROUTER.get("slow_factor", 2.0),
+    max_error_rate=LLM_ROUTER.get("max_error_rate", 0.5),
+    cooldown_seconds=LLM_ROUTER.get("cooldown_seconds", 30)
+)
 
 # Directory to save uploaded files
 UPLOAD_DIR = "contract_files"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Uploads are streamed to disk; larger files are rejected
+MAX_UPLOAD_SIZE = (config.get("UPLOADS") or {}).get("max_size_mb", 100) * 1024 * 1024
+
 # Define templates and prompts
 TEMPLATES = config.get("SOW_TEMPLATES", {})
 PROMPTS = config.get("SOW_PROMPTS", {})
 
+# Compile the template matcher once; templates are lowercased here and never again
+MATCHER = TemplateMatcher.from_config(config)
+
+# LLM extraction settings: run fields concurrently through the async client, with at most
+# `max_concurrency` requests in flight per upload, and optionally group fields by page
+EXTRACTION = config.get("EXTRACTION") or {}
+ASYNC_EXTRACTION = EXTRACTION.get("async", True)
+MAX_CONCURRENCY = EXTRACTION.get("max_concurrency", 8)
+GROUPING = EXTRACTION.get("grouping", "field")
+if GROUPING not in ("field", "page"):
+    raise ValueError(f"Invalid EXTRACTION.grouping '{GROUPING}'. Expected 'field' or 'page'.")
+
+# Deterministic fast path over the cached page text (dates in the prompts' DD-MM-YYYY format)
+FAST_PATH_FIELDS = (config.get("FAST_PATH") or {}).get("fields") or []
+rule_extractor = RuleExtractor(date_format="%d-%m-%Y")
+
+# Asynchronous job queue: uploads submitted to /jobs are processed by worker processes
+JOBS = config.get("JOBS") or {}
+JOBS_DATABASE_URL = JOBS.get("database_url", "sqlite:///jobs.sqlite")
+JOB_HANDLER = "main:process_document_job"
+job_store = JobStore(JOBS_DATABASE_URL)
+worker_pool = WorkerPool(
+    JOBS_DATABASE_URL,
+    JOB_HANDLER,
+    workers=JOBS.get("workers", 0),
+    poll_interval=JOBS.get("poll_interval", 1.0)
+)
+
+# LLM response cache: identical prompts (boilerplate clauses recur across contracts) are
+# answered from memory or the SQLite tier instead of the API. Keys include the providers and
+# models the field is routed to, and only answers of the field's first provider are stored
+LLM_CACHE = config.get("LLM_CACHE") or {}
+llm_cache = LLMCache(
+    database_url=LLM_CACHE.get("database_url") or None,
+    memory_entries=LLM_CACHE.get("memory_entries", 1024),
+    disk_entries=LLM_CACHE.get("disk_entries", 50000),
+    ttl_seconds=(LLM_CACHE.get("ttl_hours") or 0) * 3600 or None,
+    enabled=LLM_CACHE.get("enabled", True),
+    offline=LLM_CACHE.get("offline", False) or os.getenv("LLM_CACHE_OFFLINE") == "1"
+)
+
+# Define the fields to extract (assuming SOW fields)
+FIELDS_TO_EXTRACT = [
+    "currency", "sow_no", "sow_start_date", "remark",
+    "inclusive_or_exclusive_gst", "subcontract_clause", "sow_value", "credit_period",
+    "cola", "total_fte", "client_company_name",
+    "sow_end_date", "type_of_billing", "po_number",
+    "amendment_no", "billing_unit_type_and_rate_cost", "particular_role_rate"
+]
+
 # -----------------------------
 # CORS Configuration
 # -----------------------------
@@ -67,42 +142,172 @@ app.add_middleware(
 # Extraction Functions
 # -----------------------------
 
-def extract_info_with_llm(field: str, page_content: str) -> str:
+def build_prompt(field: str, page_content: str) -> Optional[str]:
     """
-    Calls the Groq LLM to extract information based on the field and page content.
+    Renders the configured prompt for a field, or returns None if the field has no prompt.
     """
     prompt_template = PROMPTS.get(field, "")
     if not prompt_template:
         print(f"No prompt found for field '{field}'.")
-        return "NA"
+        return None
 
     # Replace the placeholder with actual page content
-    prompt = prompt_template.format(page_content=page_content)
+    return prompt_template.format(page_content=page_content)
 
+def build_messages(prompt: str) -> List[Dict[str, str]]:
+    """
+    Builds the chat messages sent to the LLM for a rendered prompt.
+    """
+    return [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": prompt},
+    ]
+
+def extract_info_with_llm(field: str, page_content: str, stats: Optional[ExtractionStats] = None) -> str:
+    """
+    Calls the LLM to extract information based on the field and page content.
+    """
+    prompt = build_prompt(field, page_content)
+    if prompt is None:
+        return "NA"
+
+    if stats:
+        stats.field_requests += 1
+
+    messages = build_messages(prompt)
     try:
-        # Call the Groq API to get a completion
-        chat_completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt},
-            ]
-        )
+        cache_key = llm_cache.make_key(llm_gateway.fingerprint(field), messages)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            if stats:
+                stats.cache_hits += 1
+            return cached.content.strip() or "NA"
+
+        if stats:
+            stats.llm_calls += 1
+        chat_completion = llm_gateway.complete(messages, field=field)
 
         # Extract and return the concise response content
         response = chat_completion.choices[0].message.content
+        if response and llm_gateway.answered_by_primary(chat_completion, field):
+            llm_cache.set(cache_key, chat_completion.model, response, chat_completion.usage)
         return response.strip() if response else "NA"
+    except LLMCacheMiss:
+        print(f"Offline mode: no cached LLM response for '{field}'")
+        return "NA"
     except Exception as e:
         print(f"Error extracting '{field}' with LLM: {e}")
         return "NA"
 
-def load_pdf_content(pdf_path: str) -> PyPDF2.PdfReader:
+async def extract_info_with_llm_async(
+    field: str,
+    page_content: str,
+    semaphore: asyncio.Semaphore,
+    stats: Optional[ExtractionStats] = None
+) -> str:
     """
-    Loads the PDF file and returns a PdfReader object.
+    Async variant of `extract_info_with_llm`; the semaphore bounds requests in flight.
+    """
+    prompt = build_prompt(field, page_content)
+    if prompt is None:
+        return "NA"
+
+    if stats:
+        stats.field_requests += 1
+
+    messages = build_messages(prompt)
+    try:
+        cache_key = llm_cache.make_key(llm_gateway.fingerprint(field), messages)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            if stats:
+                stats.cache_hits += 1
+            return cached.content.strip() or "NA"
+
+        if stats:
+            stats.llm_calls += 1
+        async with semaphore:
+            chat_completion = await llm_gateway.acomplete(messages, field=field)
+
+        # Extract and return the concise response content
+        response = chat_completion.choices[0].message.content
+        if response and llm_gateway.answered_by_primary(chat_completion, field):
+            llm_cache.set(cache_key, chat_completion.model, response, chat_completion.usage)
+        return response.strip() if response else "NA"
+    except LLMCacheMiss:
+        print(f"Offline mode: no cached LLM response for '{field}'")
+        return "NA"
+    except Exception as e:
+        print(f"Error extracting '{field}' with LLM: {e}")
+        return "NA"
+
+async def extract_page_fields_async(
+    fields: List[str],
+    page_content: str,
+    semaphore: asyncio.Semaphore,
+    stats: Optional[ExtractionStats] = None
+) -> Dict[str, str]:
+    """
+    Extracts several fields from one page with a single LLM call returning a JSON object.
+    Each field's prompt from config.yaml is embedded as that field's instructions. Fields the
+    answer does not resolve (missing keys, or a response that is not a JSON object) fall back
+    to per-field extraction on the page.
+    """
+    fields = [field for field in fields if PROMPTS.get(field)]
+    if not fields:
+        return {}
+    if len(fields) == 1:
+        return {fields[0]: await extract_info_with_llm_async(fields[0], page_content, semaphore, stats)}
+
+    if stats:
+        stats.field_requests += len(fields)
+
+    messages = build_messages(build_grouped_prompt(fields, PROMPTS, page_content))
+    response_format = {"type": "json_object"}
+    # A page group follows the routing override of its first field that has one
+    route = llm_gateway.route(fields)
+    try:
+        cache_key = llm_cache.make_key(llm_gateway.fingerprint(route), messages, response_format=response_format)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            if stats:
+                stats.cache_hits += 1
+            extracted = parse_grouped_response(cached.content, fields)
+        else:
+            if stats:
+                stats.llm_calls += 1
+            async with semaphore:
+                chat_completion = await llm_gateway.acomplete(messages, field=route, response_format=response_format)
+            response = chat_completion.choices[0].message.content
+            if response and llm_gateway.answered_by_primary(chat_completion, route):
+                llm_cache.set(cache_key, chat_completion.model, response, chat_completion.usage)
+            extracted = parse_grouped_response(response, fields)
+    except LLMCacheMiss:
+        print(f"Offline mode: no cached LLM response for {fields}")
+        return {field: "NA" for field in fields}
+    except Exception as e:
+        print(f"Error extracting {fields} with LLM: {e}")
+        return {field: "NA" for field in fields}
+
+    # Fields the grouped answer did not resolve are asked one by one on the same page
+    unresolved = [field for field in fields if field not in extracted]
+    if unresolved:
+        if stats:
+            # Counted again by the per-field requests
+            stats.field_requests -= len(unresolved)
+        values = await asyncio.gather(*(
+            extract_info_with_llm_async(field, page_content, semaphore, stats) for field in unresolved
+        ))
+        extracted.update(zip(unresolved, values))
+    return extracted
+
+def load_pdf_content(pdf_path: str) -> PdfDocument:
+    """
+    Loads the PDF file and returns a PdfDocument that caches the text of each page.
     """
     try:
         pdf_reader = PyPDF2.PdfReader(pdf_path)
-        return pdf_reader
+        return PdfDocument(pdf_reader)
     except FileNotFoundError:
         print(f"PDF file not found at path: {pdf_path}")
         raise
@@ -110,29 +315,39 @@ def load_pdf_content(pdf_path: str) -> PyPDF2.PdfReader:
         print(f"Error loading PDF file: {e}")
         raise
 
-def process_field(field: str, pdf_reader: PyPDF2.PdfReader, templates: dict) -> str:
+def fast_path(fields: List[str], document: PdfDocument) -> Dict[str, dict]:
     """
-    Processes a single field by performing fuzzy matching and LLM extraction.
+    Answers the FAST_PATH fields that have a single unambiguous pattern match in the page text,
+    before any matching or LLM call. Returns field -> {"value", "page_number"} (1-based pages).
+    """
+    fields = [field for field in FAST_PATH_FIELDS if field in fields]
+    if not fields:
+        return {}
+    pages = [(page_num + 1, document.page_text(page_num)) for page_num in range(len(document))]
+    answered = rule_extractor.extract(pages, fields)
+    for field, field_info in answered.items():
+        print(f"Fast path answered '{field}': {field_info['value']} (page {field_info['page_number']})")
+    print(f"Fast path answered {len(answered)} of {len(fields)} fields")
+    return answered
+
+def process_field(
+    field: str,
+    document: PdfDocument,
+    match_result: MatchResult,
+    stats: Optional[ExtractionStats] = None
+) -> str:
+    """
+    Processes a single field by looking up its fuzzy matched pages and running LLM extraction.
+    Page text is read from the document cache, so each page is parsed only once per document.
     """
-    matched_pages = []
-    total_pages = len(pdf_reader.pages)
-
     # First pass: Collect all pages with a matching template
-    for page_num in range(total_pages):
-        page_obj = pdf_reader.pages[page_num]
-        page_text = page_obj.extract_text() or ""
-
-        # Perform fuzzy matching for each template
-        for template in templates.get(field, []):
-            ratio = fuzz.partial_ratio(template.lower(), page_text.lower())
-            if ratio > 60:
-                print(f"Page {page_num + 1} matched with template '{template}' for field '{field}' (Score: {ratio})")
-                matched_pages.append((page_num, page_text))
-                break  # Only collect the first match on the page
+    matched_pages = match_result.matched_pages(field)
+    for page_num, template, score in matched_pages:
+        print(f"Page {page_num + 1} matched with template '{template}' for field '{field}' (Score: {score:.0f})")
 
     # Second pass: Process all matched pages and extract information
-    for page_num, page_text in matched_pages:
-        extracted_value = extract_info_with_llm(field, page_text)
+    for page_num, _, _ in matched_pages:
+        extracted_value = extract_info_with_llm(field, document.page_text(page_num), stats)
         if extracted_value and extracted_value.lower() != "na":
             print(f"Extracted '{field}' from Page {page_num + 1}: {extracted_value}")
             return extracted_value
@@ -141,6 +356,182 @@ def process_field(field: str, pdf_reader: PyPDF2.PdfReader, templates: dict) ->
     print(f"No valid '{field}' found in the document after checking all matched pages.")
     return "NA"
 
+async def process_field_async(
+    field: str,
+    document: PdfDocument,
+    match_result: MatchResult,
+    semaphore: asyncio.Semaphore,
+    stats: Optional[ExtractionStats] = None
+) -> str:
+    """
+    Async variant of `process_field`. Matched pages are still tried in page order, so the
+    result is the same as the sequential path; only different fields run concurrently.
+    """
+    matched_pages = match_result.matched_pages(field)
+    for page_num, template, score in matched_pages:
+        print(f"Page {page_num + 1} matched with template '{template}' for field '{field}' (Score: {score:.0f})")
+
+    for page_num, _, _ in matched_pages:
+        extracted_value = await extract_info_with_llm_async(field, document.page_text(page_num), semaphore, stats)
+        if extracted_value and extracted_value.lower() != "na":
+            print(f"Extracted '{field}' from Page {page_num + 1}: {extracted_value}")
+            return extracted_value
+
+    print(f"No valid '{field}' found in the document after checking all matched pages.")
+    return "NA"
+
+def extract_fields(
+    fields: List[str],
+    document: PdfDocument,
+    match_result: MatchResult,
+    stats: Optional[ExtractionStats] = None
+) -> List[str]:
+    """
+    Extracts fields one after another with the blocking client.
+    """
+    extracted_values = []
+    for field in fields:
+        print(f"\nProcessing field: {field}")
+        extracted_values.append(process_field(field, document, match_result, stats))
+    return extracted_values
+
+async def extract_fields_async(
+    fields: List[str],
+    document: PdfDocument,
+    match_result: MatchResult,
+    stats: Optional[ExtractionStats] = None
+) -> List[str]:
+    """
+    Extracts all fields concurrently, with at most MAX_CONCURRENCY LLM requests in flight.
+    Results are returned in the order of `fields`.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    return await asyncio.gather(*(
+        process_field_async(field, document, match_result, semaphore, stats)
+        for field in fields
+    ))
+
+async def extract_fields_grouped_async(
+    fields: List[str],
+    document: PdfDocument,
+    match_result: MatchResult,
+    stats: Optional[ExtractionStats] = None
+) -> List[str]:
+    """
+    Extracts fields page by page: one LLM call per page asks for every field matched on it.
+
+    Works in waves. In each wave every unresolved field moves to its next matched page, the
+    fields are grouped by page and one call is made per page (concurrently). Fields that get
+    a valid answer are resolved; the rest try their next page in the following wave. Each
+    field therefore still sees its matched pages in page order, as in field-by-field mode.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY if ASYNC_EXTRACTION else 1)
+    pending = {}
+    for field in fields:
+        matched_pages = match_result.matched_pages(field)
+        for page_num, template, score in matched_pages:
+            print(f"Page {page_num + 1} matched with template '{template}' for field '{field}' (Score: {score:.0f})")
+        pending[field] = iter([page_num for page_num, _, _ in matched_pages])
+
+    extracted_data = {field: "NA" for field in fields}
+    while pending:
+        # Group each unresolved field under its next matched page
+        page_fields: Dict[int, List[str]] = {}
+        for field, page_iter in list(pending.items()):
+            page_num = next(page_iter, None)
+            if page_num is None:
+                print(f"No valid '{field}' found in the document after checking all matched pages.")
+                del pending[field]
+            else:
+                page_fields.setdefault(page_num, []).append(field)
+
+        pages = list(page_fields.items())
+        results = await asyncio.gather(*(
+            extract_page_fields_async(page_field_list, document.page_text(page_num), semaphore, stats)
+            for page_num, page_field_list in pages
+        ))
+
+        for (page_num, page_field_list), page_values in zip(pages, results):
+            for field in page_field_list:
+                extracted_value = page_values.get(field, "NA")
+                if extracted_value and extracted_value.lower() != "na":
+                    print(f"Extracted '{field}' from Page {page_num + 1}: {extracted_value}")
+                    extracted_data[field] = extracted_value
+                    pending.pop(field, None)
+
+    return [extracted_data[field] for field in fields]
+
+async def process_document(pdf_path: str) -> List[Dict[str, str]]:
+    """
+    Runs matching and LLM extraction on a saved SOW PDF and returns the response rows.
+    """
+    # PDF parsing and matching are CPU bound, keep them off the event loop
+    document = await run_in_threadpool(load_pdf_content, pdf_path)
+
+    # Fields with a single unambiguous pattern match in the page text need no LLM call
+    fast_path_data = await run_in_threadpool(fast_path, FIELDS_TO_EXTRACT, document)
+    llm_fields = [field for field in FIELDS_TO_EXTRACT if field not in fast_path_data]
+
+    # Find the pages where each field's templates match
+    match_result = await run_in_threadpool(MATCHER.score, document)
+
+    stats = ExtractionStats()
+    if GROUPING == "page":
+        extracted_values = await extract_fields_grouped_async(llm_fields, document, match_result, stats)
+    elif ASYNC_EXTRACTION:
+        extracted_values = await extract_fields_async(llm_fields, document, match_result, stats)
+    else:
+        extracted_values = await run_in_threadpool(extract_fields, llm_fields, document, match_result, stats)
+
+    llm_values = dict(zip(llm_fields, extracted_values))
+    extracted_data = {
+        field: fast_path_data[field]["value"] if field in fast_path_data else llm_values[field]
+        for field in FIELDS_TO_EXTRACT
+    }
+
+    print("\nMatching and extraction completed.")
+    print(f"{stats.summary()} (grouping: {GROUPING})")
+    print(json.dumps(extracted_data, indent=4))
+
+    # Format the extracted data for the response; with the fast path on, note which path answered each field
+    final_extracted_data = []
+    for field_name, field_value in extracted_data.items():
+        row = {
+            "field": field_name,
+            "value": field_value if field_value else "NA",
+            # `process_field` doesn't return page_num, so only fast path answers have one
+            "page_num": str(fast_path_data[field_name]["page_number"]) if field_name in fast_path_data else "0"
+        }
+        if FAST_PATH_FIELDS:
+            row["source"] = "rules" if field_name in fast_path_data else "llm"
+        final_extracted_data.append(row)
+    return final_extracted_data
+
+# Event loop of a job worker process, reused across jobs so the async client's connections stay valid
+_worker_loop = None
+
+def process_document_job(pdf_type: str, file_location: str) -> List[Dict[str, str]]:
+    """
+    Job handler run inside a worker process (see shared/jobs.py).
+    """
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(process_document(file_location))
+
+async def save_uploaded_file(file: UploadFile, file_location: str) -> None:
+    """
+    Streams an uploaded file to disk.
+    """
+    try:
+        saved = await save_upload(file, file_location, max_size=MAX_UPLOAD_SIZE)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+    print(f"File saved to {file_location} ({saved.size} bytes, sha256 {saved.sha256})")
+
 @app.post("/upload")
 async def upload_file(
     file: UploadFile = File(...),
@@ -155,51 +546,92 @@ async def upload_file(
 
     # Save the uploaded file
     file_location = os.path.join(UPLOAD_DIR, file.filename)
-    try:
-        with open(file_location, "wb") as f:
-            f.write(await file.read())
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
-
-    print(f"File saved to {file_location}")
-
-    # Set the PDF_PATH to the saved file
-    pdf_path = file_location
+    await save_uploaded_file(file, file_location)
 
     try:
-        pdf_reader = load_pdf_content(pdf_path)
+        final_extracted_data = await process_document(file_location)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    # Define the fields to extract (assuming SOW fields)
-    fields_to_extract = [
-        "currency", "sow_no", "sow_start_date", "remark",
-        "inclusive_or_exclusive_gst", "subcontract_clause", "sow_value", "credit_period",
-        "cola", "total_fte", "client_company_name",
-        "sow_end_date", "type_of_billing", "po_number",
-        "amendment_no", "billing_unit_type_and_rate_cost", "particular_role_rate"
-    ]
+    return JSONResponse({"extracted_data": final_extracted_data})
 
-    extracted_data = {field: None for field in fields_to_extract}
+@app.post("/jobs")
+async def submit_job(
+    file: UploadFile = File(...),
+    pdfType: str = Form(...)
+):
+    """
+    Endpoint to queue a SOW PDF document for processing; returns the job id immediately.
+    """
+    if pdfType.upper() != "SOW":
+        raise HTTPException(status_code=400, detail="Invalid pdfType. Only 'SOW' is supported.")
 
-    for field in fields_to_extract:
-        print(f"\nProcessing field: {field}")
-        extracted_value = process_field(field, pdf_reader, TEMPLATES)
-        extracted_data[field] = extracted_value
+    job_id = uuid.uuid4().hex
+    file_location = os.path.join(UPLOAD_DIR, f"{job_id}_{file.filename}")
+    await save_uploaded_file(file, file_location)
 
-    print("\nMatching and extraction completed.")
-    print(json.dumps(extracted_data, indent=4))
+    job_store.submit(pdfType, file.filename, file_location, job_id=job_id)
+    return JSONResponse({"job_id": job_id, "status": "queued"}, status_code=202)
 
-    # Format the extracted data for the response
-    final_extracted_data = []
-    for field_name, field_value in extracted_data.items():
-        final_extracted_data.append({
-            "field": field_name,
-            "value": field_value if field_value else "NA",
-            "page_num": "0"  # Since `process_field` doesn't return page_num, setting as "0"
-        })
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    """
+    Endpoint to get the status of a job (queued, running, done or failed).
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
 
-    return JSONResponse({"extracted_data": final_extracted_data})
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """
+    Endpoint to get the extracted data of a finished job. Pending jobs answer 202 with their status.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != DONE:
+        return JSONResponse({"job_id": job_id, "status": job.status}, status_code=202)
+    return JSONResponse({"extracted_data": job_store.result(job)})
+
+@app.on_event("startup")
+def start_job_workers():
+    """
+    Starts the job worker processes owned by this API process (JOBS.workers, may be 0).
+    """
+    if worker_pool.workers:
+        requeued = job_store.requeue_running()
+        if requeued:
+            print(f"Requeued {requeued} interrupted job(s)")
+        worker_pool.start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    worker_pool.stop()
+
+@app.get("/llm-cache-stats")
+def get_llm_cache_stats():
+    """
+    Returns hit rate and saved tokens of the LLM response cache in this process.
+    """
+    return llm_cache.stats()
+
+@app.get("/fast-path-stats")
+def get_fast_path_stats():
+    """
+    Returns how often the deterministic fast path answered each field in this process.
+    """
+    return rule_extractor.stats()
+
+@app.get("/llm-router-stats")
+def get_llm_router_stats():
+    """
+    Returns the LLM gateway's requests, failovers and per-provider health in this process.
+    """
+    return llm_gateway.stats()
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,274 @@
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Levenshtein
+
+from document import PdfDocument
+from prefilter import AhoCorasick
+
+# Minimum partial ratio for a template to count as matching a page (legacy scorer)
+MATCH_THRESHOLD = 60
+
+
+def legacy_partial_ratio(s1: str, s2: str, **kwargs) -> float:
+    """
+    fuzzywuzzy-compatible partial ratio built on rapidfuzz primitives.
+
+    Aligns the shorter string with the longer one at each matching block and keeps the best
+    ratio, exactly like `fuzzywuzzy.fuzz.partial_ratio` with python-Levenshtein installed, so
+    existing thresholds keep matching the same pages.
+    """
+    shorter, longer = (s1, s2) if len(s1) <= len(s2) else (s2, s1)
+    if not shorter:
+        return 0
+
+    best = 0.0
+    for short_start, long_start, _ in Levenshtein.editops(shorter, longer).as_matching_blocks():
+        window_start = max(long_start - short_start, 0)
+        ratio = fuzz.ratio(shorter, longer[window_start:window_start + len(shorter)])
+        if ratio > 99.5:
+            return 100
+        best = max(best, ratio)
+    return round(best)
+
+
+# Available scorers: "legacy" reproduces the previous fuzzywuzzy scores, "optimal" is
+# rapidfuzz's native partial ratio (exact best alignment, scored in parallel in native
+# code, but higher scores than legacy, so it needs a higher threshold).
+SCORERS: Dict[str, Callable] = {
+    "legacy": legacy_partial_ratio,
+    "optimal": fuzz.partial_ratio,
+}
+
+# Default threshold of each scorer. The optimal scorer is never below the legacy one, and 76
+# is the threshold whose matched pages come closest to legacy's at 60 on the test contracts
+# (benchmarks/bench_matcher.py); the pages still differ for a few fields.
+SCORER_THRESHOLDS: Dict[str, float] = {
+    "legacy": MATCH_THRESHOLD,
+    "optimal": 76,
+}
+
+# Characters of page text kept on each side of a verbatim template occurrence when the
+# prefilter scores the template on that window instead of the whole page
+ANCHOR_MARGIN = 16
+
+
+class MatchResult:
+    """
+    Template x page fuzzy scores for one document.
+
+    Attributes:
+        scores (np.ndarray): Matrix of shape (templates, pages) with partial ratio scores, NaN
+            where the score is not known. Pairs that cannot change the matched pages are not
+            scored: with the legacy scorer, the templates after a field's first match on a page,
+            and with the optimal scorer, every score below the threshold (cut off by `cdist`).
+        field_scores (np.ndarray): Matrix of shape (fields, pages) with the best known score of
+            the field's templates (NaN if none of them was scored on the page).
+        threshold (float): Score a template must exceed for a page to match.
+        anchored (np.ndarray): Boolean matrix of shape (templates, pages), True where the template
+            occurs verbatim in the page (set only when the prefilter is enabled).
+        fuzzy_pairs (int): Number of (unique template, page) pairs that were fuzzy scored.
+    """
+    def __init__(self, matcher: "TemplateMatcher", scores: np.ndarray, anchored: np.ndarray = None, fuzzy_pairs: int = None):
+        self.matcher = matcher
+        self.scores = scores
+        self.anchored = anchored if anchored is not None else np.zeros(scores.shape, dtype=bool)
+        self.fuzzy_pairs = fuzzy_pairs if fuzzy_pairs is not None else len(matcher.unique_templates) * scores.shape[1]
+        self.threshold = matcher.threshold
+        self.field_scores = np.full((len(matcher.fields), scores.shape[1]), np.nan, dtype=np.float32)
+        for i, rows in enumerate(matcher.field_rows.values()):
+            if rows.stop > rows.start and scores.shape[1]:
+                # fmax ignores the NaN of unscored pairs
+                self.field_scores[i] = np.fmax.reduce(scores[rows], axis=0)
+
+    def page_scores(self, field: str) -> np.ndarray:
+        """
+        Returns the best known score of the field's templates on every page (NaN if unscored).
+        """
+        return self.field_scores[self.matcher.fields.index(field)]
+
+    def matched_pages(self, field: str) -> List[Tuple[int, str, float]]:
+        """
+        Returns (page_num, template, score) for every page where one of the field's templates
+        scores above the threshold, in page order. The template is the first one in
+        configuration order that exceeds the threshold.
+        """
+        rows = self.matcher.field_rows.get(field)
+        if rows is None or rows.stop == rows.start:
+            return []
+
+        field_block = self.scores[rows]
+        matched = []
+        for page_num in np.flatnonzero(np.fmax.reduce(field_block, axis=0) > self.threshold):
+            first_row = int(np.argmax(field_block[:, page_num] > self.threshold))
+            matched.append((
+                int(page_num),
+                self.matcher.templates[rows.start + first_row],
+                float(field_block[first_row, page_num])
+            ))
+        return matched
+
+
+class TemplateMatcher:
+    """
+    Scores the configured templates against the pages of a document.
+
+    Templates are lowercased and de-duplicated once when the matcher is compiled
+    (at startup). The legacy scorer is not batched: it is called per (template, page) pair in
+    Python, and only where it can change the result. Each field's templates are scored on a
+    page in configuration order until one matches, and templates shared between fields are
+    scored once per page. The optimal scorer is batched: the whole unique-templates x pages
+    matrix goes to rapidfuzz's `cdist` (native code, all cores) with the threshold as
+    `score_cutoff`.
+
+    With the prefilter enabled, an Aho-Corasick automaton over all templates first finds where
+    the templates occur verbatim in each page in one linear scan. Each field tries its anchored
+    templates first, and scores them only on a window of `len(template) + 2 * ANCHOR_MARGIN`
+    characters around each occurrence instead of the whole page; templates without an anchor
+    are scored on the full page as before. With the optimal scorer this does not change the matched
+    pages (a verbatim occurrence scores 100 either way); the legacy heuristic can score a
+    verbatim occurrence below the threshold on the full page, so with it the prefilter can
+    match additional pages.
+
+    Attributes:
+        fields (List[str]): Field names in configuration order.
+        templates (List[str]): Original template strings, grouped by field.
+        field_rows (Dict[str, slice]): Rows of the score matrix that belong to each field.
+        unique_templates (List[str]): Lowercased templates actually scored.
+    """
+    def __init__(
+        self,
+        templates: Dict[str, List[str]],
+        scorer: str = "legacy",
+        threshold: float = None,
+        prefilter: bool = False
+    ):
+        if scorer not in SCORERS:
+            raise ValueError(f"Unknown scorer '{scorer}'. Expected one of: {', '.join(SCORERS)}")
+
+        self.scorer_name = scorer
+        self.scorer = SCORERS[scorer]
+        self.threshold = SCORER_THRESHOLDS[scorer] if threshold is None else threshold
+        self.prefilter = prefilter
+        self.fields = list(templates.keys())
+        self.templates: List[str] = []
+        self.field_rows: Dict[str, slice] = {}
+
+        for field in self.fields:
+            start = len(self.templates)
+            self.templates.extend(templates.get(field) or [])
+            self.field_rows[field] = slice(start, len(self.templates))
+
+        # Templates shared between fields (e.g. "Commercials") are scored only once
+        self.unique_templates: List[str] = []
+        unique_index: Dict[str, int] = {}
+        self.template_rows = np.empty(len(self.templates), dtype=np.intp)
+        for i, template in enumerate(self.templates):
+            lowered = template.lower()
+            if lowered not in unique_index:
+                unique_index[lowered] = len(self.unique_templates)
+                self.unique_templates.append(lowered)
+            self.template_rows[i] = unique_index[lowered]
+
+        self.automaton = AhoCorasick(self.unique_templates) if prefilter else None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TemplateMatcher":
+        """
+        Builds the matcher from the `SOW_TEMPLATES` and optional `MATCHING` sections of config.yaml
+        (without a threshold, the scorer's default from SCORER_THRESHOLDS).
+        """
+        matching = config.get("MATCHING") or {}
+        return cls(
+            config.get("SOW_TEMPLATES", {}),
+            scorer=matching.get("scorer", "legacy"),
+            threshold=matching.get("threshold"),
+            prefilter=matching.get("prefilter", False)
+        )
+
+    def score(self, document: PdfDocument) -> MatchResult:
+        """
+        Computes the template x page score matrix for a document.
+        """
+        return self.score_pages([page_text for _, page_text in document.pages()])
+
+    def score_pages(self, pages: List[str]) -> MatchResult:
+        """
+        Computes the template x page score matrix for already lowercased page texts.
+        """
+        if not pages or not self.unique_templates:
+            return MatchResult(self, np.full((len(self.templates), len(pages)), np.nan, dtype=np.float32))
+
+        if self.prefilter or self.scorer_name == "legacy":
+            return self._score_pages_until_match(pages)
+
+        unique_scores = process.cdist(
+            self.unique_templates,
+            pages,
+            scorer=self.scorer,
+            score_cutoff=self.threshold,
+            dtype=np.float32,
+            workers=-1
+        )
+        # cdist reports scores below the cutoff as 0; their actual value is not known
+        unique_scores[unique_scores < self.threshold] = np.nan
+        return MatchResult(self, unique_scores[self.template_rows])
+
+    def _score_pages_until_match(self, pages: List[str]) -> MatchResult:
+        """
+        Scores each field's templates on each page in configuration order, stopping at the first
+        one above the threshold. The matched pages (and their templates) are those of the full
+        matrix; unscored pairs are left at NaN.
+
+        With the prefilter, the templates found verbatim on the page are scored first, and only
+        on the windows around their occurrences, so a field usually stops at its first (anchored)
+        template after a short comparison. Anchored scores are still compared with the threshold
+        rather than assumed to match, as the legacy heuristic can score a verbatim occurrence
+        below it; the template reported for a page can then be a later one.
+        """
+        unique_scores = np.full((len(self.unique_templates), len(pages)), np.nan, dtype=np.float32)
+        unique_anchored = np.zeros((len(self.unique_templates), len(pages)), dtype=bool)
+        scored = np.zeros((len(self.unique_templates), len(pages)), dtype=bool)
+        fuzzy_pairs = 0
+
+        for page_num, page_text in enumerate(pages):
+            anchors = self.automaton.find_all(page_text) if self.automaton is not None else {}
+            unique_anchored[list(anchors), page_num] = True
+            for rows in self.field_rows.values():
+                templates = self.template_rows[rows]
+                if anchors:
+                    # Stable sort: anchored templates first, each group in configuration order
+                    templates = templates[np.argsort(~unique_anchored[templates, page_num], kind="stable")]
+                for template in templates:
+                    if not scored[template, page_num]:
+                        unique_scores[template, page_num] = self._score_template(
+                            self.unique_templates[template], page_text, anchors.get(template)
+                        )
+                        scored[template, page_num] = True
+                        fuzzy_pairs += 1
+                    if unique_scores[template, page_num] > self.threshold:
+                        break
+
+        return MatchResult(
+            self,
+            unique_scores[self.template_rows],
+            anchored=unique_anchored[self.template_rows],
+            fuzzy_pairs=fuzzy_pairs
+        )
+
+    def _score_template(self, template: str, page_text: str, starts: List[int] = None) -> float:
+        """
+        Scores a template on the page, or only on the windows around its verbatim occurrences
+        (`starts`) when the prefilter found any.
+        """
+        if not starts:
+            return self.scorer(template, page_text)
+
+        best = 0.0
+        for start in starts:
+            window = page_text[max(start - ANCHOR_MARGIN, 0):start + len(template) + ANCHOR_MARGIN]
+            best = max(best, self.scorer(template, window))
+            if best >= 100:
+                break
+        return best
@@ -0,0 +1,64 @@
+from collections import deque
+from typing import Dict, List
+
+
+class AhoCorasick:
+    """
+    Multi-pattern exact string matcher (Aho-Corasick automaton).
+
+    All patterns are compiled into one trie with failure links, so a single left-to-right
+    scan of a text reports every pattern that occurs in it, in time linear in the text
+    length regardless of how many patterns there are.
+
+    Attributes:
+        patterns (List[str]): The compiled patterns; matches are reported as indices into this list.
+    """
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[tuple] = [()]
+
+        # Build the trie
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        # Breadth-first pass to set failure links and merge outputs along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Dict[int, List[int]]:
+        """
+        Returns the start positions of every occurrence of each pattern in the text, keyed by
+        the pattern's index (patterns that do not occur are left out).
+        """
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        found: Dict[int, List[int]] = {}
+        state = 0
+        for position, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                found.setdefault(index, []).append(position - len(patterns[index]))
+        return found
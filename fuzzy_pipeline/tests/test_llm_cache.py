@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Make the pipeline (main.py) and the repository level `shared` package importable; run from
+# fuzzy_pipeline/, where main.py finds config.yaml
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+sys.path.append(str(current_dir.parent.parent))
+
+import main as pipeline
+from shared.llm_cache import LLMCache
+from shared.llm_gateway import LLMGateway, Provider
+
+
+class StubProvider(Provider):
+    """
+    Provider answering every request with a fixed value, or failing when `down` is set.
+    """
+    def __init__(self, name: str, model: str):
+        super().__init__(name, model, api_key="stub")
+        self.down = False
+        self.calls = 0
+
+    def create(self, model: str, messages: list, **options):
+        self.calls += 1
+        if self.down:
+            raise RuntimeError(f"{self.name} is down")
+        return SimpleNamespace(
+            model=model,
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=5),
+            choices=[SimpleNamespace(message=SimpleNamespace(content="INR"))]
+        )
+
+    @property
+    def client(self):
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create)))
+
+
+def test_llm_cache():
+    """
+    Checks the pipeline's LLM response cache through `extract_info_with_llm`, with a stubbed
+    gateway: a repeated prompt is answered from the cache, fallback answers are not cached,
+    and changing the providers or routes misses.
+    """
+    openai = StubProvider("openai", "gpt-4o-mini")
+    groq = StubProvider("groq", "llama-3.3-70b-versatile")
+    pipeline.llm_cache = LLMCache()
+    page_content = "All amounts in this SOW are payable in INR."
+
+    # Repeated prompt: one API call, then a cache hit
+    pipeline.llm_gateway = LLMGateway([openai, groq])
+    assert pipeline.extract_info_with_llm("currency", page_content) == "INR"
+    assert pipeline.extract_info_with_llm("currency", page_content) == "INR"
+    assert openai.calls == 1, openai.calls
+
+    # An answer from the fallback provider is returned but not cached
+    openai.down = True
+    assert pipeline.extract_info_with_llm("currency", page_content + " ") == "INR"
+    assert pipeline.extract_info_with_llm("currency", page_content + " ") == "INR"
+    assert groq.calls == 2, groq.calls
+    openai.down = False
+
+    # Other providers or routes for the field do not reuse the cached answer
+    pipeline.llm_gateway = LLMGateway([groq, openai])
+    pipeline.extract_info_with_llm("currency", page_content)
+    assert groq.calls == 3, groq.calls
+    pipeline.llm_gateway = LLMGateway([openai, groq], routes={"currency": ["groq"]})
+    pipeline.extract_info_with_llm("currency", page_content)
+    assert groq.calls == 4, groq.calls
+
+    stats = pipeline.llm_cache.stats()
+    print(f"LLM cache check passed: {stats}")
+
+
+if __name__ == "__main__":
+    test_llm_cache()
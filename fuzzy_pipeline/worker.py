@@ -0,0 +1,10 @@
+from main import JOB_HANDLER, JOBS, JOBS_DATABASE_URL
+from shared.jobs import parse_worker_args, run_workers
+
+# Runs job workers separately from the API so they can be scaled independently:
+#   cd fuzzy_pipeline && python worker.py --workers 4
+# The API starts none itself unless JOBS.workers is set in config.yaml.
+
+if __name__ == "__main__":
+    args = parse_worker_args(JOBS_DATABASE_URL, JOBS.get("workers") or 1, JOBS.get("poll_interval", 1.0))
+    run_workers(args.database_url, JOB_HANDLER, args.workers, args.poll_interval)
@@ -1 +1,14 @@
-from .main import app
\ No newline at end of file
+import sys
+from pathlib import Path
+
+# Make the repository level `shared` package importable when running from rag_pipeline/
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+
+def __getattr__(name):
+    # `from app import app` builds the FastAPI application (and its DocumentProcessor) on first
+    # use only, so job workers importing `app.services.jobs` load just what jobs need
+    if name == "app":
+        from .main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
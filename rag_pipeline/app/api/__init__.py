@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import upload, intial  # Import endpoint routers
+from app.api.endpoints import upload, intial, jobs  # Import endpoint routers
 
 # Initialize the main API router
 api_router = APIRouter()
@@ -11,6 +11,13 @@ api_router.include_router(
     tags=["upload"]
 )
 
+# Include the asynchronous job endpoints (submit, status and result)
+api_router.include_router(
+    jobs.router,
+    prefix="/jobs",
+    tags=["jobs"]
+)
+
 # Include the initial endpoint router with a specific prefix and tag
 api_router.include_router(
     intial.router,
@@ -1,4 +1,9 @@
 from fastapi import APIRouter
+from app.utils.result_cache import result_cache
+from app.utils.extract_fields import cascade_gateway, cascade_stats, extraction_stats, llm_cache, llm_gateway, rule_extractor
+from app.utils.latency import field_latency, query_latency
+from app.database.reranker import rerank_stats
+from app.database.lexical_index import retrieval_stats
 
 # Create a new APIRouter instance
 router = APIRouter()
@@ -12,4 +17,112 @@ def get_status():
         dict: A dictionary containing the status of the application.
     """
     # Return a JSON response indicating the server status
-    return {"status": "Server is running!"}
\ No newline at end of file
+    return {"status": "Server is running!"}
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """
+    Endpoint to get the result cache hit and miss counts.
+
+    Returns:
+        dict: Hits, misses and bypasses served by this process, and the persisted
+              entry and hit totals per database for the current extraction config.
+    """
+    return result_cache.stats()
+
+@router.get("/llm-cache-stats")
+def get_llm_cache_stats():
+    """
+    Endpoint to get the LLM response cache metrics.
+
+    Returns:
+        dict: Lookups, hits per tier, hit rate and the prompt and completion tokens
+              saved by this process, plus the current entry counts.
+    """
+    return llm_cache.stats()
+
+@router.get("/rate-limit-stats")
+def get_rate_limit_stats():
+    """
+    Endpoint to get each LLM provider's rate limits and how often they made calls wait.
+
+    Returns:
+        dict: Per provider name, the configured requests and tokens per minute and the waits so far.
+    """
+    return {**llm_gateway.rate_limit_stats(), **cascade_gateway.rate_limit_stats()}
+
+@router.get("/latency-stats")
+def get_latency_stats():
+    """
+    Endpoint to get extraction latency percentiles per field, for tuning the hedge delay.
+
+    Returns:
+        dict: Count, p50 and p95 in seconds per field, for whole fields and for single query attempts.
+    """
+    return {"fields": field_latency.stats(), "queries": query_latency.stats()}
+
+@router.get("/rerank-stats")
+def get_rerank_stats():
+    """
+    Endpoint to get the rerank stage totals (only counts when RERANK_ENABLED is set).
+
+    Returns:
+        dict: Candidate lists reranked, chunks scored and kept, estimated prompt tokens saved,
+              and the cross-encoder time spent.
+    """
+    return rerank_stats.to_dict()
+
+@router.get("/retrieval-stats")
+def get_retrieval_stats():
+    """
+    Endpoint to get how many queries each field needed before the LLM found its value.
+
+    Returns:
+        dict: LLM calls, fallback calls (queries after the first) and the first-query hit rate,
+              in total and per field with the field's retrieval mode.
+    """
+    return retrieval_stats.to_dict()
+
+
+@router.get("/extraction-stats")
+def get_extraction_stats():
+    """
+    Endpoint to get LLM extraction call totals per extraction mode.
+
+    Returns:
+        dict: Calls, output tokens, parse failures, repairs and response time per mode.
+    """
+    return extraction_stats.to_dict()
+
+@router.get("/cascade-stats")
+def get_cascade_stats():
+    """
+    Endpoint to get the cascade mode outcomes (only counts when EXTRACTION_MODE is "cascade").
+
+    Returns:
+        dict: Cheap-model answers kept and escalated overall, and per field the escalation rate,
+              reasons and latency percentiles (overall and per outcome).
+    """
+    return cascade_stats.to_dict()
+
+@router.get("/fast-path-stats")
+def get_fast_path_stats():
+    """
+    Endpoint to get how often the deterministic fast path answered each field.
+
+    Returns:
+        dict: Documents checked, time per document, and per field how often the patterns
+              answered it, found conflicting values, or found nothing (leaving it to the LLM).
+    """
+    return rule_extractor.stats()
+
+@router.get("/llm-router-stats")
+def get_llm_router_stats():
+    """
+    Endpoint to get the LLM provider gateway's view of each provider.
+
+    Returns:
+        dict: Requests and failovers, and per provider its model, totals, and the error rate,
+              p95 latency and cooldown state over the rolling window.
+    """
+    return llm_gateway.stats()
\ No newline at end of file
@@ -0,0 +1,72 @@
+import uuid
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.services.jobs import job_store
+from shared.jobs import DONE, FAILED
+from shared.uploads import save_upload
+
+router = APIRouter()
+
+@router.post("/")
+async def submit_job(
+    file: UploadFile = File(...),
+    pdfType: str = Form(...),
+    bypassCache: bool = Form(False)
+):
+    """
+    Saves the uploaded file and queues it for processing by a worker.
+
+    Parameters:
+        file (UploadFile): The file to be processed.
+        pdfType (str): The type of PDF to process ('SOW' or 'MSA').
+        bypassCache (bool): Re-extract even if this file was already processed with the current settings.
+    Returns:
+        JSONResponse: The job id and its initial status, returned immediately.
+    """
+    if pdfType.upper() not in ("SOW", "MSA"):
+        raise HTTPException(status_code=400, detail=f"Invalid pdfType: {pdfType}")
+
+    job_id = uuid.uuid4().hex
+    file_location = f"contract_files/{job_id}_{file.filename}"
+
+    try:
+        saved = await save_upload(file, file_location, max_size=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+    job_store.submit(
+        pdfType,
+        file.filename,
+        file_location,
+        job_id=job_id,
+        options={"content_hash": saved.sha256, "bypass_cache": bypassCache, "file_name": file.filename}
+    )
+    return JSONResponse({"job_id": job_id, "status": "queued"}, status_code=202)
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str):
+    """
+    Returns the status of a job (queued, running, done or failed).
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str):
+    """
+    Returns the extracted data of a finished job. Pending jobs answer 202 with their status.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != DONE:
+        return JSONResponse({"job_id": job_id, "status": job.status}, status_code=202)
+    return JSONResponse({"extracted_data": job_store.result(job)})
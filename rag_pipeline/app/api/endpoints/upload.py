@@ -1,17 +1,38 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from typing import List
 from app.utils.document_processor import DocumentProcessor
+from app.core.config import settings
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from shared.uploads import save_upload
 
 import os
+import threading
+import uuid
 
 router = APIRouter()
+
+# Shared by all requests; each document is processed in its own vector store collection
 document_processor = DocumentProcessor()
 
+# Bounds the documents processed at once; further uploads wait for a free slot
+document_slots = threading.BoundedSemaphore(settings.MAX_CONCURRENT_DOCUMENTS)
+
+def process_document(pdfType: str, file_location: str, content_hash: str, bypass_cache: bool, file_name: str) -> list:
+    with document_slots:
+        return document_processor.process(
+            pdfType,
+            file_location,
+            content_hash=content_hash,
+            bypass_cache=bypass_cache,
+            file_name=file_name
+        )
+
 @router.post("/")
 async def upload_files(
     file: UploadFile = File(...),
-    pdfType: str = Form(...)
+    pdfType: str = Form(...),
+    bypassCache: bool = Form(False)
 ):
     """
     This endpoint accepts a file and a PDF type, saves the file to the server, processes it,
@@ -19,6 +40,7 @@ async def upload_files(
     Parameters:
         file (UploadFile): The file to be uploaded.
         pdfType (str): The type of PDF to process.
+        bypassCache (bool): Re-extract even if this file was already processed with the current settings.
     Returns:
         JSONResponse: A response containing the extracted data from the file.
     Raises:
@@ -27,21 +49,26 @@ async def upload_files(
     """
     Endpoint to upload one or multiple files.
     """
+    # Unique name, so simultaneous uploads of files with the same name do not collide
+    file_location = f"contract_files/{uuid.uuid4().hex}_{file.filename}"
     try:
         results = []
-        content = await file.read()
-        file_location = f"contract_files/{file.filename}"
 
-        # Save the uploaded file
-        with open(file_location, "wb") as f:
-            f.write(content)
+        # Stream the uploaded file to disk
+        saved = await save_upload(file, file_location, max_size=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024)
 
-        # Process the file content
-        results = document_processor.process(pdfType, file_location)
+        # Process the file content in a worker thread, so the event loop keeps serving other
+        # requests (served from the result cache for already seen files)
+        results = await run_in_threadpool(
+            process_document, pdfType, file_location, saved.sha256, bypassCache, file.filename
+        )
 
-        # Remove the uploaded file
-        os.remove(file_location)
-        
         return JSONResponse({"extracted_data": results})
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        # Remove the uploaded file
+        if os.path.exists(file_location):
+            os.remove(file_location)
\ No newline at end of file
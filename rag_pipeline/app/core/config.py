@@ -1,7 +1,7 @@
 
 import os
 from pydantic_settings import BaseSettings
-from typing import List, Dict, ClassVar
+from typing import List, Dict, ClassVar, Optional
 
 class Settings(BaseSettings):
     """
@@ -19,15 +19,108 @@ class Settings(BaseSettings):
     SOW_DATABASE_URL: str = f"sqlite:///{os.path.join(DB_DIR, 'sow_contracts.sqlite')}"
     MSA_DATABASE_URL: str = f"sqlite:///{os.path.join(DB_DIR, 'msa_contracts.sqlite')}"
  
+    # Vector store for the per-document chunks: "memory" (in-process NumPy index, nothing
+    # written to disk) or "milvus" (Milvus Lite at MILVUS_URI, for persistent use)
+    VECTOR_STORE: str = "memory"
     MILVUS_URI: str = os.path.join(DB_DIR, 'milvus_test.db')
     MILVUS_COLLECTION_NAME: str = "contract_collection"
     
     EMBEDDING_MODEL_NAME: str = "jinaai/jina-embeddings-v2-small-en"
     RERANKER_MODEL_NAME: str = "jinaai/jina-reranker-v2-base-multilingual"
+
+    # Retrieval per query: "dense" (embeddings), "lexical" (BM25 over an in-memory index of the
+    # document's chunks) or "hybrid" (reciprocal rank fusion, with RRF_K, of the top
+    # HYBRID_CANDIDATES of both rankings). RETRIEVAL_MODE_BY_FIELD overrides it per field, e.g.
+    # {"po_number": "lexical"} for identifier fields whose labels and values are literal tokens.
+    # BM25 has no stopword handling and hybrid/lexical have not been measured with the real
+    # embedding model yet, so dense stays the default.
+    RETRIEVAL_MODE: str = "dense"
+    RETRIEVAL_MODE_BY_FIELD: Dict[str, str] = {}
+    RRF_K: int = 60
+    HYBRID_CANDIDATES: int = 20
+
+    # Optional rerank stage: retrieve RERANK_CANDIDATES chunks per query, score them with the
+    # reranker and send only the best RERANK_TOP_N to the LLM (twice as many for
+    # insurance_required), dropping chunks scoring below RERANK_MIN_SCORE if set
+    RERANK_ENABLED: bool = False
+    RERANK_CANDIDATES: int = 20
+    RERANK_TOP_N: int = 3
+    RERANK_MIN_SCORE: Optional[float] = None
+
+    # Embedding backend: "torch", "onnx" (fp32) or "onnx-int8" (dynamically quantized).
+    # The ONNX models are exported once with `python -m app.database.export_onnx`, which also
+    # checks that their embeddings keep at least EMBEDDING_ONNX_MIN_COSINE similarity to torch.
+    EMBEDDING_BACKEND: str = "torch"
+    ONNX_MODEL_DIR: str = os.path.join(DB_DIR, 'onnx')
+    EMBEDDING_ONNX_MIN_COSINE: float = 0.99
     
+    # Uploads are streamed to disk; larger files are rejected
+    MAX_UPLOAD_SIZE_MB: int = 100
+
+    # Documents processed at the same time by one API process (each in its own collection)
+    MAX_CONCURRENT_DOCUMENTS: int = 4
+
+    # Asynchronous job queue. JOB_WORKERS worker processes are started with the API, each with
+    # its own embedding model; 0 (default) leaves jobs to workers run with `python -m app.worker`
+    JOBS_DATABASE_URL: str = f"sqlite:///{os.path.join(DB_DIR, 'jobs.sqlite')}"
+    JOB_WORKERS: int = 0
+    JOB_POLL_INTERVAL: float = 1.0
+
+    # LLM response cache, keyed by a hash of the model and the rendered prompt.
+    # LLM_CACHE_OFFLINE never calls the LLM: a prompt missing from the cache is an error.
+    LLM_MODEL: str = "gpt-4o-mini"
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_DATABASE_URL: str = f"sqlite:///{os.path.join(DB_DIR, 'llm_cache.sqlite')}"
+    LLM_CACHE_MEMORY_ENTRIES: int = 1024
+    LLM_CACHE_DISK_ENTRIES: int = 50000
+    LLM_CACHE_TTL_HOURS: int = 720
+    LLM_CACHE_OFFLINE: bool = False
+
+    # LLM providers (OpenAI-compatible endpoints) in order of preference; entries whose API key
+    # variable is not set are skipped. Each request goes to the first provider that is healthy and
+    # not LLM_ROUTER_SLOW_FACTOR times slower (p95) than the fastest over the last
+    # LLM_ROUTER_WINDOW_SECONDS, failing over to the next on errors. A provider failing 3 times in
+    # a row cools down for LLM_ROUTER_COOLDOWN_SECONDS. LLM_FIELD_ROUTES limits a field (or a field
+    # group, through its members) to some providers, e.g. {"sow_no": ["groq", "openai"]}.
+    LLM_PROVIDERS: List[Dict] = [
+        {"name": "openai", "model": "gpt-4o-mini", "api_key_env": "OPENAI_API_KEY"},
+        {"name": "groq", "model": "llama-3.3-70b-versatile", "base_url": "https://api.groq.com/openai/v1", "api_key_env": "GROQ_API_KEY"}
+    ]
+    LLM_FIELD_ROUTES: Dict[str, List[str]] = {}
+    LLM_ROUTER_WINDOW_SECONDS: float = 300
+    LLM_ROUTER_SLOW_FACTOR: float = 2.0
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.5
+    LLM_ROUTER_COOLDOWN_SECONDS: float = 30
+
+    # Fields extracted in parallel per document (1 = one field after another). Each provider has
+    # its own token-bucket limits, spent per attempt (0 = no limit); these are the defaults, which
+    # a provider entry can override with "requests_per_minute" / "tokens_per_minute".
+    FIELD_EXTRACTION_WORKERS: int = 4
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200000
+
+    # Hedged query fallback (opt-in): for fields with several queries, start the next query once
+    # the current one has run longer than the HEDGE_LATENCY_PERCENTILE of the field's recent query
+    # latencies (HEDGE_DELAY_SECONDS until HEDGE_MIN_SAMPLES are recorded, or if the percentile is 0)
+    HEDGED_QUERIES: bool = False
+    HEDGE_DELAY_SECONDS: float = 8.0
+    HEDGE_LATENCY_PERCENTILE: float = 95
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_WORKERS: int = 16
+
+    # Embeddings of the static SOW/MSA queries, keyed by model name and query text hash
+    QUERY_EMBEDDINGS_PATH: str = os.path.join(DB_DIR, 'query_embeddings.npz')
+
     DIMENSION: int = 512
     CHUNK_SIZE: int = 2048
     CHUNK_OVERLAP: int = 25
+
+    # Token budget of the context sent to the LLM per field, counted with the LLM's tokenizer.
+    # Overlapping chunks are merged and duplicates dropped before it is applied. 0 (default) is
+    # no limit, so all five retrieved chunks are sent; a budget below about five full chunks
+    # cuts the least relevant ones.
+    CONTEXT_MAX_TOKENS: int = 0
+    CONTEXT_MAX_TOKENS_BY_FIELD: Dict[str, int] = {}
     
     # Prompt Template
     PROMPT_TEMPLATE: str = """
@@ -73,6 +166,38 @@ class Settings(BaseSettings):
     Relevant Contract Content: {similar_content}
     """
 
+    # Extraction mode: "reasoning" (PROMPT_TEMPLATE, step-by-step answer parsed from <extracted>
+    # tags, up to 3 attempts), "structured" (STRUCTURED_PROMPT_TEMPLATE, JSON-schema output
+    # validated with a pydantic model per field, one repair request if it does not validate) or
+    # "cascade" (a cheap model first, see below)
+    EXTRACTION_MODE: str = "reasoning"
+
+    STRUCTURED_PROMPT_TEMPLATE: str = """
+    You extract field values from legally binding business contracts. Use only the provided contract content; do not assume or invent anything.
+    Answer with the JSON object of the response schema. Use "null" as the value when the content does not contain it, and 0 as its page number. The page number is the PageNumber of the chunk the value was found in; return a single page number.
+
+    Points To Remember while extracting {required_field} : {points_to_remember}
+    Required Field: {required_field}
+    Query: {query}
+    Relevant Contract Content: {similar_content}
+    """
+
+    STRUCTURED_REPAIR_PROMPT: str = "Your answer does not match the response schema: {errors}. Return the corrected JSON object only."
+
+    # Cascade mode: fields whose points to remember constrain the answer (quoted choices,
+    # YYYY-MM-DD dates, numerical values) are first asked of the cheap CASCADE_PROVIDERS, in the
+    # structured mode with a self-reported confidence. The answer is kept if it has the field's
+    # format, cites a page of the context and its confidence is at least CASCADE_MIN_CONFIDENCE
+    # (and, with CASCADE_ESCALATE_NOT_FOUND, a value was found). Otherwise, and for free-text
+    # fields, the field is extracted with LLM_PROVIDERS in CASCADE_ESCALATION_MODE.
+    CASCADE_PROVIDERS: List[Dict] = [
+        {"name": "openai-nano", "model": "gpt-4.1-nano", "api_key_env": "OPENAI_API_KEY"},
+        {"name": "groq-8b", "model": "llama-3.1-8b-instant", "base_url": "https://api.groq.com/openai/v1", "api_key_env": "GROQ_API_KEY"}
+    ]
+    CASCADE_MIN_CONFIDENCE: str = "high"
+    CASCADE_ESCALATE_NOT_FOUND: bool = True
+    CASCADE_ESCALATION_MODE: str = "reasoning"
+
     # SOW Fields to Extract
     SOW_FIELDS_TO_EXTRACT: List[str] = [
         "client_company_name", "currency", "sow_start_date", "sow_end_date",
@@ -183,6 +308,25 @@ class Settings(BaseSettings):
         ]
     }
 
+    # Fields drawing on the same contract region are extracted together: one merged retrieval
+    # (the members' first queries) and one LLM call returning an entry per member. Members the
+    # group call leaves unresolved fall back to per-field extraction.
+    FIELD_GROUPS_ENABLED: bool = True
+    SOW_FIELD_GROUPS: Dict[str, List[str]] = {
+        "header": ["sow_no", "amendment_no", "po_number"],
+        "term": ["sow_start_date", "sow_end_date"],
+        "commercials": ["sow_value", "currency", "billing_unit_type_and_rate_cost", "particular_role_rate"],
+        "payment_terms": ["type_of_billing", "credit_period", "inclusive_or_exclusive_gst", "cola"]
+    }
+
+    # Deterministic fast path: these fields are first looked up with labelled patterns in the
+    # page text (shared/rule_extractors.py). A single unambiguous match answers the field without
+    # retrieval or an LLM call; no match or conflicting matches leave it to the LLM. Off by
+    # default ([]); when on, each response row also gets a "source" of "rules" or "llm".
+    # Supported: sow_no, po_number, amendment_no, currency, credit_period, cola, sow_start_date,
+    # sow_end_date, msa_start_date, msa_end_date
+    SOW_FAST_PATH_FIELDS: List[str] = []
+
     # MSA Fields to Extract
     MSA_FIELDS_TO_EXTRACT: List[str] = [
         "client_company_name", "currency", "msa_start_date", "msa_end_date",
@@ -246,6 +390,12 @@ class Settings(BaseSettings):
             "Can you identify any clauses related to Data Processing Agreement (DPA) in the contract? If so, provide the details."
         ]
     }
+
+    MSA_FIELD_GROUPS: Dict[str, List[str]] = {
+        "term": ["msa_start_date", "msa_end_date"]
+    }
+
+    MSA_FAST_PATH_FIELDS: List[str] = []
     
     # Additional Configurations (If any)
     class Config:
@@ -0,0 +1,34 @@
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+
+def split_pages(pages: list, chunk_size: int, chunk_overlap: int) -> list:
+    """
+    Splits the text of every page into overlapping chunks.
+
+    Args:
+        pages (list): Dictionaries with 'page_number' and 'text', as returned by load_documents.
+        chunk_size (int): Maximum characters per chunk.
+        chunk_overlap (int): Characters shared by consecutive chunks.
+
+    Returns:
+        list: (text, page_number, chunk_start) tuples, where chunk_start is the character offset
+              of the chunk in its page text (None if it could not be located).
+    """
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+    chunks = []
+    for page in pages:
+        page_number = page["page_number"]
+        search_from = 0
+        for text in text_splitter.split_text(page["text"]):
+            start = page["text"].find(text, search_from)
+            if start == -1:
+                start = page["text"].find(text)
+            chunks.append((text, page_number, start if start != -1 else None))
+            if start != -1:
+                search_from = start + 1
+    return chunks
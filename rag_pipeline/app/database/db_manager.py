@@ -1,34 +1,57 @@
 
-import torch
-from transformers import AutoTokenizer, AutoModel
-from pymilvus import MilvusClient
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import threading
+import uuid
+from contextlib import contextmanager
+
+from transformers import AutoTokenizer
+
+from app.database.chunking import split_pages
+from app.database.embedding_backends import load_embedding_backend, mean_pool_and_normalize
+from app.database.lexical_index import RETRIEVAL_MODES, BM25Index, reciprocal_rank_fusion
+from app.database.query_embeddings import QueryEmbeddingStore
+from app.database.vector_store import create_vector_store
 
 class DatabaseManager:
     """
-        Manages interactions with the Milvus vector database, including collection setup, text chunking, data insertion with embeddings,
+        Manages interactions with the vector store (in-memory NumPy or Milvus), including collection setup, text chunking, data insertion with embeddings,
         and retrieval of similar content based on queries. Utilizes a specified ML model for encoding text into embeddings.
         Attributes:
             model_name (str): Pre-trained model for text encoding.
-            milvus_uri (str): URI for Milvus database connection.
-            collection_name (str): Name of the Milvus collection.
+            milvus_uri (str): URI for Milvus database connection (used by the "milvus" vector store).
+            collection_name (str): Name of the collection, and the prefix of per-document collections.
+            vector_store (VectorStore): "memory" (default, per-document search) or "milvus" (persistent).
             dimension (int): Dimensionality of vector embeddings.
             chunk_size (int): Size of each text chunk.
             chunk_overlap (int, optional): Overlap between chunks. Defaults to 25.
             inference_batch_size (int): Batch size for inference.
+            embedding_backend (str): "torch", "onnx" (fp32) or "onnx-int8" (see embedding_backends.py).
+            query_embeddings (QueryEmbeddingStore): Persisted embeddings of the static retrieval queries.
+            retrieval_mode (str): Default retrieval: "dense", "lexical" (BM25) or "hybrid" (both, fused).
+            rrf_k (int): Rank constant of the reciprocal rank fusion in the hybrid mode.
+            hybrid_candidates (int): Hits of each ranking fused in the hybrid mode.
+            lexical_indexes (dict): In-memory BM25 index of each collection, built on insertion.
         Methods:
-            setup_milvus():
-                Sets up the Milvus collection.
-            chunk_and_insert(pages: list):
-                Splits and inserts text chunks into Milvus.(Chuking)
+            document_collection():
+                Context manager creating an isolated, uniquely named collection for one document
+                and dropping it afterwards, also when processing fails.
+            setup_collection(collection_name: str = None):
+                Sets up the collection in the vector store.
+            chunk_and_insert(pages: list, collection_name: str = None):
+                Splits and inserts text chunks into the vector store.(Chuking)
+            process_chunks(chunks: list) -> list:
+                Encodes (text, page_number[, chunk_start]) chunks of all pages in length-sorted full batches.
             process_chunked_texts(chunked_texts: list, page_number: int) -> list:
                 Encodes chunked texts and prepares data for insertion.
-            insert_data(data_list: list):
-                Inserts data into Milvus.
-            retrieve_similar_content(query: str, k: int = 3) -> list:
+            insert_data(data_list: list, collection_name: str = None):
+                Inserts data into the vector store and the collection's BM25 index.
+            precompute_query_embeddings(queries: list) -> int:
+                Encodes the queries missing from the on-disk query embeddings.
+            retrieve_similar_content(query: str, k: int = 3, collection_name: str = None, mode: str = None) -> list:
                 Retrieves top k similar content based on query.(Retrieval)
-            delete_collection():
-                Deletes the Milvus collection.
+            retrieve_similar_content_batch(requests: list, collection_name: str = None) -> list:
+                Retrieves the top k similar content for many (query, k[, mode]) requests with one search.
+            delete_collection(collection_name: str = None):
+                Deletes the collection.
             encode_text(texts: Union[str, list]) -> torch.Tensor:
                 Encodes text into normalized sentence embeddings.(Embedding)
     """
@@ -39,7 +62,14 @@ class DatabaseManager:
         collection_name: str,
         dimension: int,
         chunk_size: int,
-        chunk_overlap: int = 25
+        chunk_overlap: int = 25,
+        query_embeddings_path: str = None,
+        embedding_backend: str = "torch",
+        onnx_model_dir: str = None,
+        vector_store: str = "memory",
+        retrieval_mode: str = "dense",
+        rrf_k: int = 60,
+        hybrid_candidates: int = 20
     ):
         self.model_name = model_name
         self.milvus_uri = milvus_uri
@@ -48,96 +78,188 @@ class DatabaseManager:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.inference_batch_size = 64
+        self.embedding_backend = embedding_backend
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{retrieval_mode}', expected one of {RETRIEVAL_MODES}")
+        self.retrieval_mode = retrieval_mode
+        self.rrf_k = rrf_k
+        self.hybrid_candidates = hybrid_candidates
+        self.lexical_indexes = {}
 
+        # The tokenizer and model are shared by all threads; encoding is serialized by this lock
+        # (fast tokenizers are not thread-safe, and a forward pass already uses every core)
+        self._encode_lock = threading.Lock()
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, trust_remote_code=True)
-        self.model = AutoModel.from_pretrained(self.model_name, trust_remote_code=True)
-        self.milvus_client = MilvusClient(self.milvus_uri)
-    
-    def setup_milvus(self):
-        print(f"Setting up Milvus collection '{self.collection_name}'...")
-        if self.milvus_client.has_collection(collection_name=self.collection_name):
-            self.milvus_client.drop_collection(collection_name=self.collection_name)
-
-        self.milvus_client.create_collection(
-            collection_name=self.collection_name,
-            dimension=self.dimension,
-            auto_id=True,
-            enable_dynamic_field=True,
-            vector_field_name="text_embedding",
-            consistency_level="Strong"
-        )
+        self.encoder = load_embedding_backend(embedding_backend, self.model_name, onnx_model_dir)
+        self.vector_store = create_vector_store(vector_store, self.milvus_uri)
+
+        # Vectors from different backends differ slightly, so they are stored under separate keys
+        encoder_id = self.model_name if embedding_backend == "torch" else f"{self.model_name}:{embedding_backend}"
+        self.query_embeddings = QueryEmbeddingStore(self.encode_text, encoder_id, query_embeddings_path)
     
-    def chunk_and_insert(self, pages: list):
-        print("Chunking and inserting text content into Milvus collection")
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            separators=["\n\n", "\n", " ", ""]
-        )
-
-        data_list = []
-        for page in pages:
-            page_number = page["page_number"]
-            chunked_texts = text_splitter.split_text(page["text"])
-            data_list.extend(self.process_chunked_texts(chunked_texts, page_number))
-
-        self.insert_data(data_list)
+    @contextmanager
+    def document_collection(self):
+        collection_name = f"{self.collection_name}_{uuid.uuid4().hex}"
+        self.setup_collection(collection_name)
+        try:
+            yield collection_name
+        finally:
+            self.delete_collection(collection_name)
+
+    def setup_collection(self, collection_name=None):
+        collection_name = collection_name or self.collection_name
+        print(f"Setting up collection '{collection_name}'...")
+        if self.vector_store.has_collection(collection_name):
+            self.vector_store.drop_collection(collection_name)
+        self.lexical_indexes.pop(collection_name, None)
+
+        self.vector_store.create_collection(collection_name, self.dimension)
     
-    def process_chunked_texts(self, chunked_texts, page_number):
-        data_list = []
-        for i in range(0, len(chunked_texts), self.inference_batch_size):
-            batch = chunked_texts[i:i + self.inference_batch_size]
-            embeddings = self.encode_text(batch)
-            for text, embedding in zip(batch, embeddings):
-                data_list.append({
+    def chunk_and_insert(self, pages: list, collection_name=None):
+        print("Chunking and inserting text content into the vector store")
+        # Chunks of all pages are embedded together, in full batches. Each keeps its offset in the
+        # page text, so overlapping hits can be merged in the prompt context. The BM25 index of
+        # the collection is built from the same chunks
+        chunks = split_pages(pages, self.chunk_size, self.chunk_overlap)
+        self.insert_data(self.process_chunks(chunks), collection_name)
+
+    def process_chunks(self, chunks):
+        """
+        Encodes (text, page_number) or (text, page_number, chunk_start) chunks from any number of pages.
+
+        Chunks are sorted by length and encoded in batches of `inference_batch_size`, so each
+        batch is full and pads only to lengths close to its own. The results are returned in
+        the original chunk order with their page numbers.
+        """
+        data_list = [None] * len(chunks)
+        by_length = sorted(range(len(chunks)), key=lambda i: len(chunks[i][0]))
+        for start in range(0, len(by_length), self.inference_batch_size):
+            bucket = by_length[start:start + self.inference_batch_size]
+            embeddings = self.encode_text([chunks[i][0] for i in bucket])
+            for i, embedding in zip(bucket, embeddings):
+                text, page_number = chunks[i][:2]
+                data_list[i] = {
                     "text": text,
                     "text_embedding": embedding.tolist(),
                     "page_number": page_number  # Add the page number as metadata
-                })
+                }
+                if len(chunks[i]) > 2 and chunks[i][2] is not None:
+                    data_list[i]["chunk_start"] = chunks[i][2]  # Character offset in the page text
         return data_list
 
-    def insert_data(self, data_list):
-        print("Inserting data into Milvus collection")
-        self.milvus_client.insert(collection_name=self.collection_name, data=data_list)
+    def process_chunked_texts(self, chunked_texts, page_number):
+        return self.process_chunks([(text, page_number) for text in chunked_texts])
+
+    def insert_data(self, data_list, collection_name=None):
+        print("Inserting data into the vector store")
+        collection_name = collection_name or self.collection_name
+        self.vector_store.insert(collection_name, data_list)
+
+        # Rebuilt over all of the collection's chunks (a document's chunks are inserted at once)
+        index = self.lexical_indexes.get(collection_name)
+        entities = (index.entities if index else []) + [
+            {key: value for key, value in item.items() if key != "text_embedding"} for item in data_list
+        ]
+        self.lexical_indexes[collection_name] = BM25Index(entities)
     
-    def retrieve_similar_content(self, query, k=3):
-        query_embedding = self.encode_text(query).tolist()[0]  # Extract the first (and only) embedding
-        search_results = self.milvus_client.search(
-            collection_name=self.collection_name,
-            data=[query_embedding],  # Pass as a list of a single embedding
-            limit=k,
-            output_fields=["text", "page_number"]  # Include page number in the output fields
-        )
-        return [
-            {"text": r["entity"]["text"], "page_number": r["entity"]["page_number"]}
-            for r in search_results[0]
-        ]  # Return both text and page number
-
-    def delete_collection(self):
-        if self.milvus_client.has_collection(collection_name=self.collection_name):
-            self.milvus_client.drop_collection(collection_name=self.collection_name)
-            print(f"Collection '{self.collection_name}' has been deleted.")
+    def precompute_query_embeddings(self, queries):
+        encoded = self.query_embeddings.precompute(queries, batch_size=self.inference_batch_size)
+        print(f"Query embeddings ready: {len(self.query_embeddings)} stored, {encoded} encoded")
+        return encoded
+
+    def retrieve_similar_content(self, query, k=3, collection_name=None, mode=None):
+        return self.retrieve_similar_content_batch([(query, k, mode)], collection_name)[0]
+
+    def retrieve_similar_content_batch(self, requests, collection_name=None):
+        """
+        Runs many retrievals with one encode and one multi-vector search.
+
+        Each request is retrieved in its own mode (`retrieval_mode` if not given): "dense" ranks
+        the chunks by embedding similarity, "lexical" by BM25 over the collection's index, and
+        "hybrid" fuses the top `hybrid_candidates` of both rankings with reciprocal rank fusion.
+        Without a BM25 index (a collection filled by another process), every mode is dense.
+
+        Args:
+            requests (list): (query, k) or (query, k, mode) tuples.
+
+        Returns:
+            list: For each request, in order, the same hits `retrieve_similar_content(query, k)` returns.
+        """
+        if not requests:
+            return []
+        collection_name = collection_name or self.collection_name
+        lexical_index = self.lexical_indexes.get(collection_name)
+        normalized = []
+        for request in requests:
+            query, k = request[:2]
+            mode = (request[2] if len(request) > 2 else None) or self.retrieval_mode
+            if mode not in RETRIEVAL_MODES:
+                raise ValueError(f"Unknown retrieval mode '{mode}', expected one of {RETRIEVAL_MODES}")
+            normalized.append((query, k, mode if lexical_index is not None else "dense"))
+        requests = normalized
+
+        def depth(k, mode):
+            return max(k, self.hybrid_candidates) if mode == "hybrid" else k
+
+        # Static queries are precomputed, so encoding is normally a lookup rather than a forward pass
+        dense = [i for i, (_, _, mode) in enumerate(requests) if mode != "lexical"]
+        dense_results = {}
+        if dense:
+            query_embeddings = self.query_embeddings.get_many([requests[i][0] for i in dense])
+            search_results = self.vector_store.search(
+                collection_name=collection_name,
+                data=[embedding.tolist() for embedding in query_embeddings],
+                limit=max(depth(k, mode) for _, k, mode in (requests[i] for i in dense)),  # Ranked, so each request keeps its top hits
+                output_fields=["text", "page_number", "chunk_start"]
+            )
+            dense_results = dict(zip(dense, search_results))
+
+        lexical = [i for i, (_, _, mode) in enumerate(requests) if mode != "dense"]
+        lexical_results = {}
+        if lexical:
+            search_results = lexical_index.search(
+                [requests[i][0] for i in lexical],
+                limit=max(depth(k, mode) for _, k, mode in (requests[i] for i in lexical))
+            )
+            lexical_results = dict(zip(lexical, search_results))
+
+        results = []
+        for i, (_, k, mode) in enumerate(requests):
+            if mode == "dense":
+                hits = dense_results[i]
+            elif mode == "lexical":
+                hits = lexical_results[i]
+            else:
+                hits = reciprocal_rank_fusion(
+                    [dense_results[i][:self.hybrid_candidates], lexical_results[i][:self.hybrid_candidates]],
+                    k=self.rrf_k
+                )
+            results.append([self.to_hit(r) for r in hits[:k]])
+        return results
+
+    @staticmethod
+    def to_hit(result):
+        entity = result["entity"]
+        return {"text": entity["text"], "page_number": entity["page_number"], "chunk_start": entity.get("chunk_start")}
+
+    def delete_collection(self, collection_name=None):
+        collection_name = collection_name or self.collection_name
+        self.lexical_indexes.pop(collection_name, None)
+        if self.vector_store.has_collection(collection_name):
+            self.vector_store.drop_collection(collection_name)
+            print(f"Collection '{collection_name}' has been deleted.")
         else:
-            print(f"Collection '{self.collection_name}' does not exist.")
+            print(f"Collection '{collection_name}' does not exist.")
 
     def encode_text(self, texts):
         if isinstance(texts, str):
             texts = [texts]
-        encoded_input = self.tokenizer(
-            texts,
-            padding=True,
-            truncation=True,
-            return_tensors="pt"
-        )
-
-        with torch.no_grad():
-            model_output = self.model(**encoded_input)
-
-        token_embeddings = model_output[0]  # First element contains token embeddings
-        attention_mask = encoded_input["attention_mask"]
-        input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-        sentence_embeddings = torch.sum(
-            token_embeddings * input_mask_expanded, 1
-        ) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-
-        return torch.nn.functional.normalize(sentence_embeddings, p=2, dim=1)
\ No newline at end of file
+        with self._encode_lock:
+            encoded_input = self.tokenizer(
+                texts,
+                padding=True,
+                truncation=True,
+                return_tensors="pt"
+            )
+            token_embeddings = self.encoder.token_embeddings(encoded_input)
+        return mean_pool_and_normalize(token_embeddings, encoded_input["attention_mask"])
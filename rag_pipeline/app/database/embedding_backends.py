@@ -0,0 +1,81 @@
+import os
+
+import torch
+from transformers import AutoModel
+
+# Selectable with the EMBEDDING_BACKEND setting
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Files written by `python -m app.database.export_onnx` into ONNX_MODEL_DIR
+ONNX_MODEL_FILES = {
+    "onnx": "model.onnx",
+    "onnx-int8": "model_int8.onnx",
+}
+
+
+def onnx_model_path(onnx_model_dir: str, backend: str) -> str:
+    return os.path.join(onnx_model_dir, ONNX_MODEL_FILES[backend])
+
+
+def mean_pool_and_normalize(token_embeddings: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    """
+    Mean-pools token embeddings over the attention mask and L2-normalizes the result.
+    Shared by every backend, so only the transformer forward pass differs between them.
+    """
+    input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
+    sentence_embeddings = torch.sum(
+        token_embeddings * input_mask_expanded, 1
+    ) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+
+    return torch.nn.functional.normalize(sentence_embeddings, p=2, dim=1)
+
+
+class TorchEmbeddingBackend:
+    """
+    Runs the Hugging Face model with PyTorch.
+    """
+    def __init__(self, model_name: str):
+        self.model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
+        self.model.eval()
+
+    def token_embeddings(self, encoded_input) -> torch.Tensor:
+        with torch.no_grad():
+            model_output = self.model(**encoded_input)
+        return model_output[0]  # First element contains token embeddings
+
+
+class OnnxEmbeddingBackend:
+    """
+    Runs an exported (fp32 or dynamically int8-quantized) ONNX model with ONNX Runtime on CPU.
+    The PyTorch model is never loaded.
+    """
+    def __init__(self, model_path: str):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("The ONNX embedding backends need onnxruntime: pip install onnxruntime")
+
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(
+                f"ONNX model not found at '{model_path}'. Export it first with: python -m app.database.export_onnx"
+            )
+
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def token_embeddings(self, encoded_input) -> torch.Tensor:
+        feeds = {name: encoded_input[name].numpy() for name in self.input_names}
+        return torch.from_numpy(self.session.run(None, feeds)[0])
+
+
+def load_embedding_backend(backend: str, model_name: str, onnx_model_dir: str = None):
+    """
+    Creates the embedding backend selected by name (see EMBEDDING_BACKENDS).
+    """
+    if backend == "torch":
+        return TorchEmbeddingBackend(model_name)
+    if backend in ONNX_MODEL_FILES:
+        if not onnx_model_dir:
+            raise ValueError(f"Embedding backend '{backend}' needs an ONNX model directory")
+        return OnnxEmbeddingBackend(onnx_model_path(onnx_model_dir, backend))
+    raise ValueError(f"Unknown embedding backend '{backend}'. Expected one of: {', '.join(EMBEDDING_BACKENDS)}")
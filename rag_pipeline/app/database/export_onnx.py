@@ -0,0 +1,143 @@
+import argparse
+import os
+import sys
+import time
+
+import torch
+from transformers import AutoModel, AutoTokenizer
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from app.core.config import settings
+from app.database.embedding_backends import (
+    ONNX_MODEL_FILES,
+    OnnxEmbeddingBackend,
+    TorchEmbeddingBackend,
+    mean_pool_and_normalize,
+    onnx_model_path,
+)
+from app.utils.utilities import load_documents
+
+# One-time export of the embedding model for the "onnx" and "onnx-int8" backends:
+#   cd rag_pipeline && python -m app.database.export_onnx
+# Writes ONNX_MODEL_DIR/model.onnx (fp32) and model_int8.onnx (dynamic int8 quantization), then
+# compares their embeddings with the torch backend. `--check-only` reruns just the comparison.
+
+SAMPLE_PDF = os.path.join(settings.BASE_DIR, "tests", "contract_files", "WMGTS.pdf")
+
+
+class TokenEmbeddings(torch.nn.Module):
+    """
+    Wraps the model so the exported graph takes input_ids / attention_mask and returns token embeddings.
+    """
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+
+def export(model_name: str, output_dir: str, opset: int) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = onnx_model_path(output_dir, "onnx")
+    int8_path = onnx_model_path(output_dir, "onnx-int8")
+
+    print(f"Exporting '{model_name}' to {fp32_path}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+    model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
+    model.eval()
+    sample = tokenizer(["A short sample.", "A somewhat longer sample sentence to export with."], padding=True, return_tensors="pt")
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(model),
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["token_embeddings"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "token_embeddings": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset
+        )
+
+    print(f"Quantizing weights to int8: {int8_path}")
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+
+def sample_texts() -> list:
+    """
+    Texts for the accuracy check: the static retrieval queries and the chunks of the test
+    contract, so both short and full-length inputs are covered.
+    """
+    texts = [query for queries in settings.SOW_QUERIES.values() for query in queries]
+    texts += [query for queries in settings.MSA_QUERIES.values() for query in queries]
+    if os.path.isfile(SAMPLE_PDF):
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            separators=["\n\n", "\n", " ", ""]
+        )
+        for page in load_documents(SAMPLE_PDF) or []:
+            texts.extend(text_splitter.split_text(page["text"]))
+    return texts
+
+
+def encode(tokenizer, encoder, texts: list, batch_size: int = 64) -> torch.Tensor:
+    embeddings = []
+    for i in range(0, len(texts), batch_size):
+        encoded_input = tokenizer(texts[i:i + batch_size], padding=True, truncation=True, return_tensors="pt")
+        embeddings.append(mean_pool_and_normalize(encoder.token_embeddings(encoded_input), encoded_input["attention_mask"]))
+    return torch.cat(embeddings)
+
+
+def check(model_name: str, output_dir: str, min_cosine: float) -> bool:
+    """
+    Compares each ONNX backend with torch on the sample texts. Returns False if any text's
+    cosine similarity falls below `min_cosine`.
+    """
+    texts = sample_texts()
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+
+    start = time.perf_counter()
+    reference = encode(tokenizer, TorchEmbeddingBackend(model_name), texts)
+    torch_time = time.perf_counter() - start
+    print(f"\n{len(texts)} sample texts, torch: {torch_time:.2f}s")
+
+    passed = True
+    for backend in ONNX_MODEL_FILES:
+        start = time.perf_counter()
+        embeddings = encode(tokenizer, OnnxEmbeddingBackend(onnx_model_path(output_dir, backend)), texts)
+        elapsed = time.perf_counter() - start
+
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        cosine = (reference * embeddings).sum(dim=1)
+        ok = cosine.min().item() >= min_cosine
+        passed = passed and ok
+        print(
+            f"{backend:>9}: {elapsed:.2f}s ({torch_time / elapsed:.2f}x torch), "
+            f"cosine min {cosine.min().item():.5f} mean {cosine.mean().item():.5f} "
+            f"[{'OK' if ok else f'below {min_cosine}'}]"
+        )
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX (fp32 and int8) and check its accuracy.")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output-dir", default=settings.ONNX_MODEL_DIR)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--min-cosine", type=float, default=settings.EMBEDDING_ONNX_MIN_COSINE)
+    parser.add_argument("--check-only", action="store_true", help="Skip the export and only run the accuracy check")
+    args = parser.parse_args()
+
+    if not args.check_only:
+        export(args.model, args.output_dir, args.opset)
+    if not check(args.model, args.output_dir, args.min_cosine):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import re
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+# Selectable with the RETRIEVAL_MODE / RETRIEVAL_MODE_BY_FIELD settings
+RETRIEVAL_MODES = ("dense", "lexical", "hybrid")
+
+# Lowercased runs of letters and digits, so "PO#4500383264" and "po # 4500383264" share tokens
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    In-memory BM25 (Okapi) index over the chunks of one document.
+
+    Built alongside the vectors when chunks are inserted. A document has tens to a few hundred
+    chunks, so the term weights are kept as a dense chunks x vocabulary matrix and a query is
+    one matrix-vector product. Search results have the shape of vector store hits
+    (`{"id", "distance", "entity"}`), the BM25 score taking the place of the distance.
+
+    Attributes:
+        entities (list): The indexed chunks (text, page_number, chunk_start), by id.
+        k1 (float): Term frequency saturation.
+        b (float): Chunk length normalization.
+    """
+    def __init__(self, entities: List[dict], k1: float = 1.2, b: float = 0.75):
+        self.entities = list(entities)
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        documents = [tokenize(entity["text"]) for entity in self.entities]
+        for tokens in documents:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        counts = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(documents):
+            for token in tokens:
+                counts[row, self.vocabulary[token]] += 1
+        lengths = counts.sum(axis=1, keepdims=True)
+        average_length = float(lengths.mean()) if len(documents) else 0.0
+
+        document_frequency = (counts > 0).sum(axis=0)
+        idf = np.log(1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(average_length, 1e-9))
+        self.weights = (idf * counts * (k1 + 1) / (counts + norm)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def search(self, queries: List[str], limit: int) -> List[List[dict]]:
+        """
+        Returns, for each query, up to `limit` chunks sharing at least one term with it, best first.
+        """
+        results = []
+        for query in queries:
+            terms = [self.vocabulary[token] for token in set(tokenize(query)) if token in self.vocabulary]
+            if not terms:
+                results.append([])
+                continue
+            scores = self.weights[:, terms].sum(axis=1)
+            top = np.argsort(-scores, kind="stable")[:limit]
+            results.append([
+                {"id": int(i), "distance": float(scores[i]), "entity": self.entities[i]}
+                for i in top
+                if scores[i] > 0
+            ])
+        return results
+
+
+def reciprocal_rank_fusion(rankings: List[List[dict]], k: int = 60) -> List[dict]:
+    """
+    Fuses ranked hit lists: each chunk scores the sum of 1 / (k + rank) over the lists it is in.
+
+    Chunks are matched by page, offset and text (ids differ between the vector store and the
+    lexical index). Ties keep the order of the earlier lists.
+    """
+    fused = {}
+    for hits in rankings:
+        for rank, hit in enumerate(hits, start=1):
+            entity = hit["entity"]
+            key = (entity["page_number"], entity.get("chunk_start"), entity["text"])
+            score, first_hit = fused.get(key, (0.0, hit))
+            fused[key] = (score + 1 / (k + rank), first_hit)
+    ordered = sorted(fused.values(), key=lambda item: -item[0])
+    return [{**hit, "distance": score} for score, hit in ordered]
+
+
+class RetrievalStats:
+    """
+    Query fallback per field in this process: how many of a field's queries were sent to the
+    LLM before one found the value (or all of them were tried).
+
+    Attributes:
+        extractions (int): Per-field extractions.
+        llm_calls (int): Queries sent to the LLM.
+        fallback_calls (int): Queries after the first one (the calls better retrieval saves).
+        first_query_hits (int): Fields found with their first query.
+        not_found (int): Fields no query found.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, field: str, mode: str, llm_calls: int, found: bool) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(field, {
+                "mode": mode, "extractions": 0, "llm_calls": 0, "fallback_calls": 0, "first_query_hits": 0, "not_found": 0
+            })
+            totals["mode"] = mode
+            totals["extractions"] += 1
+            totals["llm_calls"] += llm_calls
+            totals["fallback_calls"] += max(llm_calls - 1, 0)
+            totals["first_query_hits"] += int(found and llm_calls == 1)
+            totals["not_found"] += int(not found)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            fields = {field: dict(totals) for field, totals in sorted(self._totals.items())}
+        extractions = sum(totals["extractions"] for totals in fields.values())
+        return {
+            "extractions": extractions,
+            "llm_calls": sum(totals["llm_calls"] for totals in fields.values()),
+            "fallback_calls": sum(totals["fallback_calls"] for totals in fields.values()),
+            "first_query_hit_rate": round(
+                sum(totals["first_query_hits"] for totals in fields.values()) / extractions, 4
+            ) if extractions else 0.0,
+            "fields": fields,
+        }
+
+
+# Process-wide query fallback totals
+retrieval_stats = RetrievalStats()
@@ -0,0 +1,110 @@
+import hashlib
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def query_key(encoder_id: str, query: str) -> str:
+    """
+    Key of a query vector: a hash of the encoder (embedding model) and the query text.
+    """
+    return hashlib.sha256(f"{encoder_id}\x00{query}".encode("utf-8")).hexdigest()
+
+
+class QueryEmbeddingStore:
+    """
+    Embeddings of the static retrieval queries, computed once and persisted to disk.
+
+    The vectors are kept in a .npz artifact keyed by a hash of (embedding model, query text),
+    so a changed query string or EMBEDDING_MODEL_NAME only re-encodes the affected queries.
+    Queries that were not precomputed are encoded on first use and kept in memory.
+
+    Attributes:
+        encoder_id (str): Identifies the embedding model the vectors belong to.
+        path (str): Location of the on-disk artifact (None = memory only).
+        encoded (int): Queries this store had to run through the model.
+    """
+    def __init__(self, encode_fn: Callable, encoder_id: str, path: Optional[str] = None):
+        self.encode_fn = encode_fn
+        self.encoder_id = encoder_id
+        self.path = path
+        self.encoded = 0
+        self._vectors: Dict[str, np.ndarray] = {}
+
+    def load(self) -> int:
+        """
+        Loads the vectors stored in the artifact, returns how many were loaded.
+        """
+        if not self.path or not os.path.isfile(self.path):
+            return 0
+        try:
+            with np.load(self.path) as artifact:
+                keys, vectors = artifact["keys"], artifact["vectors"]
+        except Exception as e:
+            print(f"Could not load query embeddings from '{self.path}': {e}")
+            return 0
+        self._vectors.update(zip(keys.tolist(), vectors))
+        return len(keys)
+
+    def save(self, queries: Iterable[str]) -> None:
+        """
+        Writes the vectors of the given queries to the artifact, dropping all others.
+        """
+        if not self.path:
+            return
+        keys = [query_key(self.encoder_id, query) for query in dict.fromkeys(queries)]
+        keys = [key for key in keys if key in self._vectors]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            keys=np.array(keys),
+            vectors=np.stack([self._vectors[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+        )
+        os.replace(tmp_path, self.path)
+
+    def precompute(self, queries: Iterable[str], batch_size: int = 64) -> int:
+        """
+        Loads the artifact, encodes only the queries it does not cover and saves it again.
+        Returns the number of queries that had to be encoded.
+        """
+        queries = list(dict.fromkeys(queries))
+        self.load()
+        missing = [query for query in queries if query_key(self.encoder_id, query) not in self._vectors]
+        for i in range(0, len(missing), batch_size):
+            self._encode(missing[i:i + batch_size])
+        if missing or not os.path.isfile(self.path or ""):
+            self.save(queries)
+        return len(missing)
+
+    def get(self, query: str) -> np.ndarray:
+        """
+        Returns the embedding of a query, encoding it only if it was not precomputed.
+        """
+        vector = self._vectors.get(query_key(self.encoder_id, query))
+        if vector is None:
+            vector = self._encode([query])[0]
+        return vector
+
+    def get_many(self, queries: List[str]) -> List[np.ndarray]:
+        """
+        Returns the embeddings of several queries; any that were not precomputed are encoded
+        together in one padded batch.
+        """
+        missing = list(dict.fromkeys(
+            query for query in queries if query_key(self.encoder_id, query) not in self._vectors
+        ))
+        if missing:
+            self._encode(missing)
+        return [self._vectors[query_key(self.encoder_id, query)] for query in queries]
+
+    def _encode(self, queries: list) -> list:
+        vectors = [np.asarray(vector, dtype=np.float32) for vector in self.encode_fn(queries).tolist()]
+        for query, vector in zip(queries, vectors):
+            self._vectors[query_key(self.encoder_id, query)] = vector
+        self.encoded += len(queries)
+        return vectors
+
+    def __len__(self) -> int:
+        return len(self._vectors)
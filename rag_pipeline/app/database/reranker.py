@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class RerankStats:
+    """
+    Totals of the rerank stage in this process.
+
+    Attributes:
+        queries (int): Candidate lists reranked.
+        candidates (int): Chunks scored by the cross-encoder.
+        kept (int): Chunks passed on to the LLM.
+        tokens_saved (int): Estimated prompt tokens saved compared with sending the top k retrieved chunks.
+        seconds (float): Time spent in the cross-encoder.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.candidates = 0
+        self.kept = 0
+        self.tokens_saved = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "queries": self.queries,
+            "candidates": self.candidates,
+            "kept": self.kept,
+            "tokens_saved": self.tokens_saved,
+            "seconds": round(self.seconds, 3),
+            "ms_per_query": round(1000 * self.seconds / self.queries, 2) if self.queries else 0.0,
+        }
+
+
+# Totals of every reranker in this process
+rerank_stats = RerankStats()
+
+
+class Reranker:
+    """
+    Cross-encoder rerank stage between retrieval and the LLM prompt.
+
+    Retrieval over-fetches candidates; each (query, chunk) pair is scored by the cross-encoder and
+    only the best chunks are kept (a top-n cut, optionally also a minimum score, always keeping at
+    least one), so far fewer chunk tokens reach the LLM. The model is loaded on first use.
+
+    Attributes:
+        model_name (str): Hugging Face cross-encoder (RERANKER_MODEL_NAME).
+        min_score (float, optional): Chunks scoring below this are dropped.
+        stats (RerankStats): Process-wide rerank totals.
+    """
+    def __init__(self, model_name: str, min_score: Optional[float] = None, max_length: int = 1024, batch_size: int = 16):
+        self.model_name = model_name
+        self.min_score = min_score
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.stats = rerank_stats
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None:
+            from transformers import AutoModelForSequenceClassification
+
+            print(f"Loading reranker '{self.model_name}'...")
+            model = AutoModelForSequenceClassification.from_pretrained(
+                self.model_name,
+                trust_remote_code=True,
+                torch_dtype="auto"
+            )
+            model.eval()
+            self._model = model
+        return self._model
+
+    def rerank(self, requests: List[Tuple[str, list, int, int]]) -> List[list]:
+        """
+        Reranks several candidate lists with one cross-encoder pass.
+
+        Args:
+            requests (list): (query, candidate hits, keep, baseline_k) tuples. Hits are dicts with
+                'text' and 'page_number'; `keep` is how many to pass on, `baseline_k` how many the
+                pipeline would send without reranking (for the tokens-saved estimate).
+
+        Returns:
+            list: For each request, the kept hits ordered by cross-encoder score.
+        """
+        pairs = [[query, hit["text"]] for query, hits, _, _ in requests for hit in hits]
+        if not pairs:
+            return [[] for _ in requests]
+
+        start = time.perf_counter()
+        with self._lock:
+            scores = self._load().compute_score(pairs, max_length=self.max_length, batch_size=self.batch_size)
+        elapsed = time.perf_counter() - start
+        if not isinstance(scores, list):
+            scores = [scores]
+
+        results = []
+        offset = 0
+        tokens_saved = 0
+        with self._lock:
+            self.stats.seconds += elapsed
+            for query, hits, keep, baseline_k in requests:
+                hit_scores = scores[offset:offset + len(hits)]
+                offset += len(hits)
+
+                ranked = sorted(zip(hit_scores, range(len(hits))), key=lambda pair: -pair[0])
+                kept = [hits[i] for score, i in ranked[:keep] if self.min_score is None or score >= self.min_score]
+                if not kept and ranked:
+                    kept = [hits[ranked[0][1]]]
+                results.append(kept)
+
+                baseline_chars = sum(len(hit["text"]) for hit in hits[:baseline_k])
+                kept_chars = sum(len(hit["text"]) for hit in kept)
+                self.stats.queries += 1
+                self.stats.candidates += len(hits)
+                self.stats.kept += len(kept)
+                tokens_saved += max(baseline_chars - kept_chars, 0) // 4  # About four characters per token
+            self.stats.tokens_saved += tokens_saved
+
+        print(f"Reranked {len(requests)} queries ({len(pairs)} chunks) in {elapsed:.2f}s, ~{tokens_saved} prompt tokens saved")
+        return results
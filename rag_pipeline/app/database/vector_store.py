@@ -0,0 +1,152 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+import numpy as np
+
+# Selectable with the VECTOR_STORE setting
+VECTOR_STORES = ("memory", "milvus")
+
+
+class VectorStore(ABC):
+    """
+    Collection-based vector storage used by DatabaseManager.
+
+    The interface follows the subset of `pymilvus.MilvusClient` the pipeline uses, and search
+    results have the same shape: for each query vector, a list of hits
+    `{"id": ..., "distance": ..., "entity": {field: value}}` ordered by similarity.
+    """
+    @abstractmethod
+    def has_collection(self, collection_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def create_collection(self, collection_name: str, dimension: int) -> None:
+        ...
+
+    @abstractmethod
+    def drop_collection(self, collection_name: str) -> None:
+        ...
+
+    @abstractmethod
+    def insert(self, collection_name: str, data: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    def search(self, collection_name: str, data: List[list], limit: int, output_fields: List[str]) -> List[List[dict]]:
+        ...
+
+
+class _MemoryCollection:
+    def __init__(self, dimension: int, vector_field_name: str):
+        self.dimension = dimension
+        self.vector_field_name = vector_field_name
+        self.entities: List[dict] = []
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process vector store: each collection is a float32 matrix searched by brute force.
+
+    Meant for the ephemeral per-document collections, which hold tens to a few hundred chunks;
+    a matrix product over them takes microseconds and nothing touches the disk. Embeddings are
+    L2-normalized, so inner product ranks exactly like cosine similarity.
+    """
+    def __init__(self, vector_field_name: str = "text_embedding"):
+        self.vector_field_name = vector_field_name
+        self._collections: Dict[str, _MemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def has_collection(self, collection_name: str) -> bool:
+        return collection_name in self._collections
+
+    def create_collection(self, collection_name: str, dimension: int) -> None:
+        with self._lock:
+            self._collections[collection_name] = _MemoryCollection(dimension, self.vector_field_name)
+
+    def drop_collection(self, collection_name: str) -> None:
+        with self._lock:
+            self._collections.pop(collection_name, None)
+
+    def insert(self, collection_name: str, data: List[dict]) -> None:
+        if not data:
+            return
+        collection = self._collections[collection_name]
+        vectors = np.asarray([item[self.vector_field_name] for item in data], dtype=np.float32)
+        with self._lock:
+            collection.entities.extend(
+                {key: value for key, value in item.items() if key != self.vector_field_name}
+                for item in data
+            )
+            collection.vectors = np.vstack([collection.vectors, vectors])
+
+    def search(self, collection_name: str, data: List[list], limit: int, output_fields: List[str]) -> List[List[dict]]:
+        collection = self._collections[collection_name]
+        vectors, entities = collection.vectors, collection.entities
+        if not len(entities):
+            return [[] for _ in data]
+
+        scores = np.asarray(data, dtype=np.float32) @ vectors.T
+        limit = min(limit, len(entities))
+        results = []
+        for row in scores:
+            top = np.argsort(-row, kind="stable")[:limit]
+            results.append([
+                {
+                    "id": int(i),
+                    "distance": float(row[i]),
+                    "entity": {field: entities[i].get(field) for field in output_fields}
+                }
+                for i in top
+            ])
+        return results
+
+
+class MilvusVectorStore(VectorStore):
+    """
+    Milvus (or Milvus Lite, for a local .db path) collections, for persistent storage.
+    """
+    def __init__(self, uri: str, vector_field_name: str = "text_embedding"):
+        from pymilvus import MilvusClient
+
+        self.client = MilvusClient(uri)
+        self.vector_field_name = vector_field_name
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self.client.has_collection(collection_name=collection_name)
+
+    def create_collection(self, collection_name: str, dimension: int) -> None:
+        self.client.create_collection(
+            collection_name=collection_name,
+            dimension=dimension,
+            auto_id=True,
+            enable_dynamic_field=True,
+            vector_field_name=self.vector_field_name,
+            consistency_level="Strong"
+        )
+
+    def drop_collection(self, collection_name: str) -> None:
+        self.client.drop_collection(collection_name=collection_name)
+
+    def insert(self, collection_name: str, data: List[dict]) -> None:
+        self.client.insert(collection_name=collection_name, data=data)
+
+    def search(self, collection_name: str, data: List[list], limit: int, output_fields: List[str]) -> List[List[dict]]:
+        return self.client.search(
+            collection_name=collection_name,
+            data=data,
+            limit=limit,
+            output_fields=output_fields
+        )
+
+
+def create_vector_store(backend: str, milvus_uri: str = None) -> VectorStore:
+    """
+    Creates the vector store selected by name (see VECTOR_STORES).
+    """
+    if backend == "memory":
+        return NumpyVectorStore()
+    if backend == "milvus":
+        return MilvusVectorStore(milvus_uri)
+    raise ValueError(f"Unknown vector store '{backend}'. Expected one of: {', '.join(VECTOR_STORES)}")
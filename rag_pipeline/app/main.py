@@ -1,8 +1,10 @@
-
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+
 from app.api import api_router
 from app.core.config import settings
+from app.services.jobs import job_store, worker_pool
+from app.utils.result_cache import result_cache
 
 # Initialize FastAPI application with project settings
 app = FastAPI(
@@ -27,4 +29,26 @@ app.add_middleware(
 )
 
 # Include the API router
-app.include_router(api_router)
\ No newline at end of file
+app.include_router(api_router)
+
+@app.on_event("startup")
+def purge_stale_results():
+    """
+    Drops cached extraction results stored under an older configuration version.
+    """
+    result_cache.purge_stale()
+
+@app.on_event("startup")
+def start_job_workers():
+    """
+    Starts the job worker processes owned by this API process (JOB_WORKERS, may be 0).
+    """
+    if worker_pool.workers:
+        requeued = job_store.requeue_running()
+        if requeued:
+            print(f"Requeued {requeued} interrupted job(s)")
+        worker_pool.start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    worker_pool.stop()
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 
 # Base for SOW contracts
@@ -32,6 +32,21 @@ class SOWContract(SOWContractBase):
     billing_unit_type_and_rate_cost = Column(String)
     particular_role_rate = Column(String)
 
+class SOWResultCache(SOWContractBase):
+    """
+    Cached extraction results for SOW documents, keyed by content hash and extraction config version.
+    """
+    __tablename__ = "result_cache"
+    __table_args__ = (UniqueConstraint("content_hash", "pdf_type", "config_version"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, index=True)
+    pdf_type = Column(String)
+    config_version = Column(String, index=True)
+    result = Column(Text)
+    created_at = Column(DateTime)
+    hit_count = Column(Integer, default=0)
+
 # Base for MSA contracts
 MSAContractBase = declarative_base()
 
@@ -61,4 +76,19 @@ class MSAContract(MSAContractBase):
     is_workman_compensation_insurance_required = Column(String)
     workman_compensation_insurance_amount = Column(String)
     other_insurance_required = Column(String)
-    other_insurance_amount = Column(String)
\ No newline at end of file
+    other_insurance_amount = Column(String)
+
+class MSAResultCache(MSAContractBase):
+    """
+    Cached extraction results for MSA documents, keyed by content hash and extraction config version.
+    """
+    __tablename__ = "result_cache"
+    __table_args__ = (UniqueConstraint("content_hash", "pdf_type", "config_version"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, index=True)
+    pdf_type = Column(String)
+    config_version = Column(String, index=True)
+    result = Column(Text)
+    created_at = Column(DateTime)
+    hit_count = Column(Integer, default=0)
\ No newline at end of file
@@ -0,0 +1,169 @@
+import re
+from datetime import date
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+# Fields answered together by the 'insurance_required' extraction
+INSURANCE_FIELDS = [
+    "insurance_required",
+    "type_of_insurance_required",
+    "is_cyber_insurance_required",
+    "cyber_insurance_amount",
+    "is_workman_compensation_insurance_required",
+    "workman_compensation_insurance_amount",
+    "other_insurance_required",
+    "other_insurance_amount"
+]
+
+class FieldExtraction(BaseModel):
+    """
+    Structured LLM answer for one field (the JSON between <extracted> tags in the reasoning mode).
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    value: str = Field(description='The extracted value, or "null" if the content does not contain it')
+    field_value_found: bool
+    page_number: int = Field(description="PageNumber of the chunk containing the value, 0 if not found")
+
+class InsuranceEntry(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    value: str = Field(description='The extracted value, or "null" if the content does not contain it')
+    page_number: int
+
+class InsuranceTypesEntry(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    value: List[str] = Field(description="Insurance types as named in the content")
+    page_number: int
+
+class InsuranceExtraction(BaseModel):
+    """
+    Structured LLM answer for 'insurance_required', which extracts all INSURANCE_FIELDS at once.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    insurance_required: InsuranceEntry
+    type_of_insurance_required: InsuranceTypesEntry
+    is_cyber_insurance_required: InsuranceEntry
+    cyber_insurance_amount: InsuranceEntry
+    is_workman_compensation_insurance_required: InsuranceEntry
+    workman_compensation_insurance_amount: InsuranceEntry
+    other_insurance_required: InsuranceEntry
+    other_insurance_amount: InsuranceEntry
+
+@lru_cache(maxsize=None)
+def extraction_model(field: str) -> Type[BaseModel]:
+    """
+    Returns the pydantic model validating the LLM answer for a field. Every field gets its own
+    model (named after it, with the field in the value description), so the JSON schema sent
+    to the LLM names the field it asks for.
+    """
+    if field == "insurance_required":
+        return InsuranceExtraction
+    model_name = "".join(part.capitalize() for part in field.split("_")) + "Extraction"
+    return create_model(
+        model_name,
+        __base__=FieldExtraction,
+        value=(str, Field(description=f'The {field} value, or "null" if the content does not contain it'))
+    )
+
+@lru_cache(maxsize=None)
+def group_extraction_model(fields: tuple) -> Type[BaseModel]:
+    """
+    Returns the pydantic model validating a field group's answer: one entry per member field,
+    each validated by that field's own model.
+    """
+    model_name = "".join(part.capitalize() for field in fields for part in field.split("_"))[:48] + "GroupExtraction"
+    return create_model(
+        model_name,
+        __config__=ConfigDict(extra="forbid"),
+        **{field: (extraction_model(field), ...) for field in fields}
+    )
+
+@lru_cache(maxsize=None)
+def cascade_extraction_model(field: str) -> Type[BaseModel]:
+    """
+    Returns the model of a cheap-model answer in the cascade mode: the field's answer plus the
+    model's own confidence in it.
+    """
+    base = extraction_model(field)
+    return create_model(
+        base.__name__.replace("Extraction", "CascadeExtraction"),
+        __base__=base,
+        confidence=(Literal["high", "medium", "low"], Field(description="How certain the value (or its absence) is given the content"))
+    )
+
+@lru_cache(maxsize=None)
+def cascade_group_extraction_model(fields: tuple) -> Type[BaseModel]:
+    """
+    Returns the model of a cheap-model answer for a field group: one cascade entry per member.
+    """
+    model_name = "".join(part.capitalize() for field in fields for part in field.split("_"))[:48] + "GroupCascadeExtraction"
+    return create_model(
+        model_name,
+        __config__=ConfigDict(extra="forbid"),
+        **{field: (cascade_extraction_model(field), ...) for field in fields}
+    )
+
+class FieldFormat:
+    """
+    Format an extracted value must have, derived from the field's points to remember.
+
+    Attributes:
+        kind (str): "choice" (one of `choices`), "date" (YYYY-MM-DD) or "number".
+        choices (tuple): Allowed values of a choice field, compared case-insensitively.
+        allow_null (bool): Whether "null" (value not found) is an acceptable answer.
+    """
+    NUMBER_PATTERN = re.compile(r"[$₹]?\s*[-+]?\d[\d,]*(\.\d+)?\s*%?")
+
+    def __init__(self, kind: str, choices: Tuple[str, ...] = (), allow_null: bool = True):
+        self.kind = kind
+        self.choices = choices
+        self.allow_null = allow_null
+
+    def check(self, value) -> Optional[str]:
+        """
+        Returns why the value does not have this format, or None if it does.
+        """
+        value = str(value).strip()
+        if value.lower() in ("", "null", "none"):
+            return None if self.allow_null else "a value is required"
+        if self.kind == "choice":
+            if value.lower() not in (choice.lower() for choice in self.choices):
+                return f"expected one of {', '.join(self.choices)}"
+        elif self.kind == "date":
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                return "expected a YYYY-MM-DD date"
+        elif self.kind == "number" and not self.NUMBER_PATTERN.fullmatch(value):
+            return "expected a number"
+        return None
+
+def field_format(points_to_remember: str) -> Optional[FieldFormat]:
+    """
+    Derives a field's answer format from its points to remember: quoted alternatives after
+    "should be" ("Your response should be 'Yes' or 'No'"), "YYYY-MM-DD" or "numerical value".
+    "never return NULL" makes "null" unacceptable. Returns None for free-text fields.
+    """
+    allow_null = not re.search(r"never return null", points_to_remember, re.IGNORECASE)
+    if "YYYY-MM-DD" in points_to_remember:
+        return FieldFormat("date", allow_null=allow_null)
+    if "numerical value" in points_to_remember:
+        return FieldFormat("number", allow_null=allow_null)
+    match = re.search(r"should be (?:just |in )?((?:'[^']+'[\s,]*(?:or\s+)?)+)", points_to_remember, re.IGNORECASE)
+    if match:
+        return FieldFormat("choice", tuple(re.findall(r"'([^']+)'", match.group(1))), allow_null=allow_null)
+    return None
+
+def response_format(model: Type[BaseModel]) -> dict:
+    """
+    OpenAI `response_format` requesting strict JSON-schema output for the model.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": model.model_json_schema(), "strict": True}
+    }
@@ -0,0 +1,54 @@
+import os
+from app.core.config import settings
+from app.utils.document_processor import DocumentProcessor
+from shared.jobs import JobStore, WorkerPool
+
+# Handler run by the worker processes (see `process_document_job`)
+JOB_HANDLER = "app.services.jobs:process_document_job"
+
+job_store = JobStore(settings.JOBS_DATABASE_URL)
+worker_pool = WorkerPool(
+    settings.JOBS_DATABASE_URL,
+    JOB_HANDLER,
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL
+)
+
+# Built on the first job, so only worker processes load the embedding model for it
+document_processor = None
+
+def process_document_job(
+    pdf_type: str,
+    file_location: str,
+    content_hash: str = None,
+    bypass_cache: bool = False,
+    file_name: str = None
+) -> list:
+    """
+    Processes a queued document inside a worker process and removes the uploaded file.
+
+    Args:
+        pdf_type (str): The type of PDF document ('SOW' or 'MSA').
+        file_location (str): The file path to the uploaded document.
+        content_hash (str, optional): SHA-256 of the file, computed during upload.
+        bypass_cache (bool, optional): Skip the result cache lookup.
+        file_name (str, optional): Original name of the uploaded file, stored with the extracted record.
+
+    Returns:
+        list: The extracted field data, as returned by `DocumentProcessor.process`.
+    """
+    global document_processor
+    if document_processor is None:
+        document_processor = DocumentProcessor()
+
+    try:
+        return document_processor.process(
+            pdf_type,
+            file_location,
+            content_hash=content_hash,
+            bypass_cache=bypass_cache,
+            file_name=file_name
+        )
+    finally:
+        if os.path.exists(file_location):
+            os.remove(file_location)
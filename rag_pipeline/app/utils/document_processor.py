@@ -1,11 +1,20 @@
 
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 import os
+import threading
+import time
 from app.core.config import settings
 from app.utils.utilities import load_documents
-from app.utils.extract_fields import ExtractField
+from app.utils.extract_fields import ExtractField, rule_extractor
 from app.database.db_manager import DatabaseManager
-from app.utils.util import convert_list_to_xml
+from app.database.lexical_index import RETRIEVAL_MODES, retrieval_stats
+from app.database.reranker import Reranker
+from app.utils.util import TokenCounter, pack_context
+from app.schemas.extraction import INSURANCE_FIELDS
+from app.utils.result_cache import result_cache
+from app.utils.latency import field_latency, query_latency
+from shared.uploads import hash_file
 
 # Import the database sessions and models
 from app.database.connection import SOWSessionLocal, MSASessionLocal
@@ -16,6 +25,8 @@ from sqlalchemy.orm import Session
 class DocumentProcessor:
     """
     Handles processing of documents by extracting relevant fields and storing them in the database.
+    One instance (and its embedding model) can be shared by concurrent requests: each call to
+    `process` works in its own vector store collection.
     """
 
     def __init__(self):
@@ -26,33 +37,157 @@ class DocumentProcessor:
         self.chunk_overlap = settings.CHUNK_OVERLAP
         self.extractor = ExtractField()
         
-        # Initialize the database manager with Milvus settings
+        # Initialize the database manager with the vector store and Milvus settings
         self.db_manager = DatabaseManager(
             model_name=settings.EMBEDDING_MODEL_NAME,
             milvus_uri=settings.MILVUS_URI,
             collection_name=settings.MILVUS_COLLECTION_NAME,
             dimension=settings.DIMENSION,
             chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            query_embeddings_path=settings.QUERY_EMBEDDINGS_PATH,
+            embedding_backend=settings.EMBEDDING_BACKEND,
+            onnx_model_dir=settings.ONNX_MODEL_DIR,
+            vector_store=settings.VECTOR_STORE,
+            retrieval_mode=settings.RETRIEVAL_MODE,
+            rrf_k=settings.RRF_K,
+            hybrid_candidates=settings.HYBRID_CANDIDATES
         )
         self.config = settings
+        for field, mode in settings.RETRIEVAL_MODE_BY_FIELD.items():
+            if mode not in RETRIEVAL_MODES:
+                raise ValueError(f"Unknown retrieval mode '{mode}' for field '{field}', expected one of {RETRIEVAL_MODES}")
+        self.result_cache = result_cache
+        self.reranker = Reranker(settings.RERANKER_MODEL_NAME, settings.RERANK_MIN_SCORE) if settings.RERANK_ENABLED else None
+        self.token_counter = TokenCounter(settings.LLM_MODEL)
+        self.rule_extractor = rule_extractor
 
-    def process(self, pdfType: str, file_location: str):
+        # Per-field latencies (p50/p95 are reported by /other/latency-stats) and the threads
+        # running hedged queries
+        self.field_latency = field_latency
+        self.query_latency = query_latency
+        self.hedge_executor = ThreadPoolExecutor(max_workers=settings.HEDGE_WORKERS)
+        self.retrieval_stats = retrieval_stats
+
+        # Embed every static retrieval query once, so processing a document needs no
+        # query-side forward passes
+        self.db_manager.precompute_query_embeddings(self.retrieval_queries())
+
+    def retrieval_queries(self):
+        """
+        Returns every query string `process` can search with, for both contract types.
+        """
+        queries = []
+        for queries_by_field, query_for_each_field in (
+            (self.config.SOW_QUERIES, self.config.SOW_QUERY_FOR_EACH_FIELD),
+            (self.config.MSA_QUERIES, self.config.MSA_QUERY_FOR_EACH_FIELD),
+        ):
+            for field_queries in queries_by_field.values():
+                queries.extend(field_queries)
+            queries.extend(query_for_each_field.values())
+        return [query for query in queries if query]
+
+    def process(self, pdfType: str, file_location: str, content_hash: str = None, bypass_cache: bool = False, file_name: str = None):
         """
         Processes the specified document by extracting required fields and saving the data.
 
         Args:
             pdfType (str): The type of PDF document ('SOW' or 'MSA').
             file_location (str): The file path to the document.
+            content_hash (str, optional): SHA-256 of the file, if already known (computed otherwise).
+            bypass_cache (bool, optional): Skip the result cache lookup and re-extract. The fresh
+                result still replaces the cached one. Defaults to False.
+            file_name (str, optional): Name stored with the contract record. Defaults to the
+                file name of `file_location`.
 
         Returns:
             list: A list of dictionaries containing extracted field data.
         """
-        # Load and process the document
+        if pdfType.upper() not in ("SOW", "MSA"):
+            raise ValueError(f"Invalid pdfType: {pdfType}")
+
+        # Return the stored result if this exact file was already processed with the current settings
+        content_hash = content_hash or hash_file(file_location)
+        if bypass_cache:
+            self.result_cache.bypassed += 1
+        else:
+            cached_data = self.result_cache.get(content_hash, pdfType)
+            if cached_data is not None:
+                print(f"Result cache hit for '{os.path.basename(file_location)}' ({content_hash[:12]})")
+                self.save_contract(pdfType, file_location, cached_data, file_name)
+                return cached_data
+
+        # Fields with a single unambiguous pattern match in the page text need no LLM call
         pages = load_documents(file_location)
-        self.db_manager.setup_milvus()
-        self.db_manager.chunk_and_insert(pages)
+        fast_path_data = self.fast_path(pdfType, pages)
+
+        # Load the document into its own collection, which is dropped afterwards even if
+        # extraction fails, so concurrent documents never see or drop each other's chunks
+        with self.db_manager.document_collection() as collection_name:
+            self.db_manager.chunk_and_insert(pages, collection_name)
+            extracted_data = self.extract_fields(pdfType, collection_name, fast_path_data)
+
+        # Prepare the final extracted data; with the fast path on, note which path answered each field
+        final_extracted_data = [
+            {
+                "field": field_name,
+                "value": field_info.get("value", ""),
+                "page_num": field_info.get("page_number", "0")
+            }
+            for field_name, field_info in extracted_data.items()
+        ]
+        if self.fast_path_fields(pdfType):
+            for item in final_extracted_data:
+                item["source"] = "rules" if item["field"] in fast_path_data else "llm"
+
+        self.save_contract(pdfType, file_location, final_extracted_data, file_name)
+
+        # Do not cache a run where nothing was found (e.g. the LLM was unreachable)
+        if any(item["value"] not in ("null", None, "") for item in final_extracted_data):
+            self.result_cache.put(content_hash, pdfType, final_extracted_data)
+
+        # Output extracted data for debugging
+        print(f"\n\nExtracted data: {final_extracted_data}")
+
+        # Return the extracted data
+        return final_extracted_data
+
+    def fast_path_fields(self, pdfType: str) -> list:
+        return self.config.SOW_FAST_PATH_FIELDS if pdfType.upper() == "SOW" else self.config.MSA_FAST_PATH_FIELDS
+
+    def fast_path(self, pdfType: str, pages: list) -> dict:
+        """
+        Answers the contract type's SOW_FAST_PATH_FIELDS / MSA_FAST_PATH_FIELDS that have a single
+        unambiguous pattern match in the page text.
+
+        Returns:
+            dict: Field name -> {"value", "page_number"} for the answered fields only.
+        """
+        fields = self.fast_path_fields(pdfType)
+        if not fields or not pages:
+            return {}
+        start = time.perf_counter()
+        answered = self.rule_extractor.extract([(page["page_number"], page["text"]) for page in pages], fields)
+        elapsed = time.perf_counter() - start
+        for field, field_info in answered.items():
+            self.field_latency.record(field, elapsed)
+            print(f"Fast path answered '{field}': {field_info['value']} (page {field_info['page_number']})")
+        print(f"Fast path answered {len(answered)} of {len(fields)} fields in {1000 * elapsed:.1f}ms")
+        return answered
+
+    def extract_fields(self, pdfType: str, collection_name: str, prefilled: dict = None) -> dict:
+        """
+        Extracts every configured field of the contract type from a document's collection.
 
+        Args:
+            pdfType (str): The type of PDF document ('SOW' or 'MSA').
+            collection_name (str): The vector store collection holding the document's chunks.
+            prefilled (dict, optional): Fields already answered (by the fast path); they are
+                neither retrieved nor sent to the LLM.
+
+        Returns:
+            dict: Field name -> {"value", "page_number"}, in extraction order.
+        """
         # Initialize extracted data storage
         extracted_data = {}
         if pdfType.upper() == "SOW":
@@ -60,86 +195,390 @@ class DocumentProcessor:
             queries = self.config.SOW_QUERIES
             queries_for_each_field = self.config.SOW_QUERY_FOR_EACH_FIELD
             points_to_remember = self.config.SOW_POINTS_TO_REMEMBER
+            field_groups = self.config.SOW_FIELD_GROUPS
         elif pdfType.upper() == "MSA":
             fields_to_extract = self.config.MSA_FIELDS_TO_EXTRACT
             queries = self.config.MSA_QUERIES
             queries_for_each_field = self.config.MSA_QUERY_FOR_EACH_FIELD
             points_to_remember = self.config.MSA_POINTS_TO_REMEMBER
+            field_groups = self.config.MSA_FIELD_GROUPS
         else:
             raise ValueError(f"Invalid pdfType: {pdfType}")
+        results = dict(prefilled or {})
+        remaining_fields = [field for field in fields_to_extract if field not in results]
 
-        # Extract each field from the document
+        # Retrieve the context of every (field, query) pair up front with one batched search
+        retrieval_requests = [
+            (field, query, self.retrieval_k(field), self.retrieval_mode(field))
+            for field in remaining_fields
+            for query in queries.get(field, [queries_for_each_field.get(field, "")])
+        ]
+        try:
+            retrieved = self.db_manager.retrieve_similar_content_batch(
+                [(query, k, mode) for _, query, k, mode in retrieval_requests],
+                collection_name=collection_name
+            )
+            if self.reranker:
+                retrieved = self.rerank([(field, query, hits) for (field, query, *_), hits in zip(retrieval_requests, retrieved)])
+        except Exception as e:
+            print(f"Batched retrieval failed, falling back to one search per query: {e}")
+            retrieved = [None] * len(retrieval_requests)
+        similar_content_by_query = {
+            (field, query): hits for (field, query, *_), hits in zip(retrieval_requests, retrieved)
+        }
+
+        # Field groups (with at least two members to extract) are asked for in one call each
+        groups = {}
+        if self.config.FIELD_GROUPS_ENABLED:
+            for group, members in field_groups.items():
+                members = [field for field in members if field in remaining_fields]
+                if len(members) > 1:
+                    groups[group] = members
+        grouped_fields = {field for members in groups.values() for field in members}
+
+        # Extract each group and each remaining field from the document; with several workers
+        # they run in parallel, each field still trying its queries in order
+        def extract(task):
+            kind, name = task
+            if kind == "group":
+                return self.extract_group(
+                    name, groups[name], queries, queries_for_each_field, points_to_remember,
+                    similar_content_by_query, collection_name
+                )
+            return self.extract_field(
+                name,
+                queries.get(name, [queries_for_each_field.get(name, "")]),
+                queries_for_each_field.get(name, ""),
+                points_to_remember.get(name, ""),
+                similar_content_by_query,
+                collection_name
+            )
+
+        tasks = [("group", group) for group in groups]
+        tasks += [("field", field) for field in remaining_fields if field not in grouped_fields]
+        for field_data in self.run_tasks(extract, tasks):
+            results.update(field_data)
+
+        # Group members the group call did not resolve fall back to per-field extraction
+        unresolved = [field for field in remaining_fields if field in grouped_fields and field not in results]
+        if groups:
+            print(f"Field groups resolved {len(grouped_fields) - len(unresolved)} of {len(grouped_fields)} fields "
+                  f"with {len(groups)} calls, {len(unresolved)} fall back to per-field extraction")
+        for field_data in self.run_tasks(extract, [("field", field) for field in unresolved]):
+            results.update(field_data)
+
+        # Merge the results in field order ('insurance_required' adds its entries after itself)
         for field in fields_to_extract:
-            field_value_found = False
-            query_for_llm = queries_for_each_field.get(field, "")
-            field_points_to_remember = points_to_remember.get(field, "")
-            k_value = 10 if field == 'insurance_required' else 5
-
-            # Iterate through queries to find the field value
-            for query in queries.get(field, [query_for_llm]):
-                if not field_value_found:
-                    try:
-                        similar_content = self.db_manager.retrieve_similar_content(query, k=k_value)
-                        xml_content = convert_list_to_xml(similar_content)
-
-                        response = self.extractor.extract_field_value(
-                            field,
-                            xml_content,
-                            query=query_for_llm,
-                            points_to_remember=field_points_to_remember
-                        )
-
-                        if field == 'insurance_required':
-                            insurance_fields = [
-                                "insurance_required",
-                                "type_of_insurance_required",
-                                "is_cyber_insurance_required",
-                                "cyber_insurance_amount",
-                                "is_workman_compensation_insurance_required",
-                                "workman_compensation_insurance_amount",
-                                "other_insurance_required",
-                                "other_insurance_amount"
-                            ]
-                            # Extract multiple insurance-related fields
-                            for insurance_field in insurance_fields:
-                                if insurance_field in response:
-                                    extracted_data[insurance_field] = {
-                                        "value": response[insurance_field]["value"],
-                                        "page_number": response[insurance_field]["page_number"]
-                                    }
-                            field_value_found = True
-                            break
-                        else:
-                            if response.get("field_value_found"):
-                                extracted_data[field] = {
-                                    "value": response.get("value"),
-                                    "page_number": response.get("page_number")
-                                }
-                                field_value_found = True
-                                break
-                    except Exception as e:
-                        print(f"An error occurred while extracting field '{field}': {e}")
-
-            # Set default value if field not found
-            if not field_value_found:
-                extracted_data[field] = {
+            if field in results:
+                extracted_data[field] = results.pop(field)
+            for insurance_field in INSURANCE_FIELDS if field == 'insurance_required' else ():
+                if insurance_field in results:
+                    extracted_data[insurance_field] = results.pop(insurance_field)
+        extracted_data.update(results)
+
+        return extracted_data
+
+    def run_tasks(self, function, tasks: list) -> list:
+        """
+        Runs the extraction tasks on up to FIELD_EXTRACTION_WORKERS threads, results in task order.
+        """
+        workers = min(self.config.FIELD_EXTRACTION_WORKERS, len(tasks))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(function, tasks))
+        return [function(task) for task in tasks]
+
+    def extract_group(
+        self,
+        group: str,
+        members: list,
+        queries: dict,
+        queries_for_each_field: dict,
+        points_to_remember: dict,
+        similar_content_by_query: dict,
+        collection_name: str
+    ) -> dict:
+        """
+        Extracts a field group with one LLM call over the merged context of its members.
+
+        The members' first-query hits are interleaved by rank (so each member's best chunks come
+        first under the token budget) and packed into one context; the LLM returns an entry per
+        member, following each member's own points to remember.
+
+        Returns:
+            dict: Member field -> {"value", "page_number"} for the members found.
+        """
+        start = time.perf_counter()
+        extracted_data = {}
+        try:
+            hits_by_member = [
+                self.similar_content(
+                    field, queries.get(field, [queries_for_each_field.get(field, "")])[0],
+                    similar_content_by_query, collection_name
+                )
+                for field in members
+            ]
+            merged_hits = [
+                hits[rank]
+                for rank in range(max(len(hits) for hits in hits_by_member))
+                for hits in hits_by_member
+                if rank < len(hits)
+            ]
+            xml_content = pack_context(merged_hits, self.context_budget(group), self.token_counter)
+
+            response = self.extractor.extract_field_value(
+                ", ".join(members),
+                xml_content,
+                query=" ".join(f"{field}: {queries_for_each_field.get(field, '')}" for field in members),
+                points_to_remember=self.group_points_to_remember(members, points_to_remember),
+                group_fields=members
+            )
+            for field in members:
+                entry = response.get(field)
+                if isinstance(entry, dict) and entry.get("field_value_found") and entry.get("value") not in (None, "", "null"):
+                    extracted_data[field] = {"value": entry["value"], "page_number": entry.get("page_number")}
+        except Exception as e:
+            print(f"An error occurred while extracting field group '{group}': {e}")
+        self.field_latency.record(group, time.perf_counter() - start)
+        return extracted_data
+
+    @staticmethod
+    def group_points_to_remember(members: list, points_to_remember: dict) -> str:
+        """
+        Points to remember of a field group: each member's own points, and the answer format.
+        """
+        instructions = "\n\n".join(
+            f"### {field}\n{points_to_remember.get(field, '').strip()}" for field in members
+        )
+        example = ",\n".join(
+            f'  "{field}": {{"value": "[Extracted value]", "field_value_found": true, "page_number": "[Page No]"}}'
+            for field in members
+        )
+        return (
+            "\n<Very_Important>\n"
+            f"1. From the provided content, you are going to extract {len(members)} fields: {', '.join(members)}. "
+            "Follow the points given for each field below.\n"
+            "2. Return one entry per field inside the <extracted> tags, as JSON with double quotes:\n"
+            f"{{\n{example}\n}}\n"
+            '3. For a field that is not in the content, return {"value": "null", "field_value_found": false, "page_number": "0"}.\n\n'
+            f"{instructions}\n"
+            "</Very_Important>"
+        )
+
+    def extract_field(
+        self,
+        field: str,
+        field_queries: list,
+        query_for_llm: str,
+        field_points_to_remember: str,
+        similar_content_by_query: dict,
+        collection_name: str
+    ) -> dict:
+        """
+        Extracts one field, trying its queries in order until the LLM finds a value. How many
+        queries it took is recorded in `retrieval_stats` (each query after the first is a
+        fallback LLM call).
+
+        In hedged mode (HEDGED_QUERIES) the next query is started as soon as the current one has
+        been running longer than the hedge delay, instead of after it finished empty. The answer
+        of the first query in priority order that finds a value still wins, so results match
+        the sequential fallback; queries that lose are cancelled.
+
+        Args:
+            field (str): The field to extract.
+            field_queries (list): Retrieval queries for the field, in priority order.
+            query_for_llm (str): The question asked to the LLM for the field.
+            field_points_to_remember (str): Extraction guidelines for the field.
+            similar_content_by_query (dict): Pre-fetched hits per (field, query).
+            collection_name (str): The document's vector store collection, for queries not pre-fetched.
+
+        Returns:
+            dict: Field name -> {"value", "page_number"}; several entries for 'insurance_required'.
+        """
+        attempts = []
+
+        def attempt(query, cancel_event=None):
+            attempts.append(query)
+            return self.try_query(
+                field, query, query_for_llm, field_points_to_remember,
+                similar_content_by_query, collection_name, cancel_event
+            )
+
+        start = time.perf_counter()
+        if self.config.HEDGED_QUERIES and len(field_queries) > 1:
+            extracted_data = self.extract_field_hedged(field, field_queries, attempt)
+        else:
+            extracted_data = None
+            for query in field_queries:
+                extracted_data = attempt(query)
+                if extracted_data is not None:
+                    break
+        self.field_latency.record(field, time.perf_counter() - start)
+        self.retrieval_stats.record(field, self.retrieval_mode(field), len(attempts), extracted_data is not None)
+
+        # Set default value if field not found
+        if extracted_data is None:
+            extracted_data = {
+                field: {
                     "value": "null",
                     "page_number": 0
                 }
+            }
 
-        # Clean up Milvus collection after processing
-        self.db_manager.delete_collection()
+        return extracted_data
 
-        # Prepare the final extracted data
-        final_extracted_data = [
-            {
-                "field": field_name,
-                "value": field_info.get("value", ""),
-                "page_num": field_info.get("page_number", "0")
-            }
-            for field_name, field_info in extracted_data.items()
-        ]
+    def extract_field_hedged(self, field: str, field_queries: list, attempt) -> dict:
+        """
+        Runs a field's queries with hedging: waits on the highest-priority unresolved query, and
+        each time it exceeds the hedge delay, starts the next query alongside it.
+        Returns the first found value in priority order, or None.
+        """
+        cancel_event = threading.Event()
+        futures = [self.hedge_executor.submit(attempt, field_queries[0], cancel_event)]
+        try:
+            for index in range(len(field_queries)):
+                while True:
+                    can_hedge = len(futures) < len(field_queries)
+                    done, _ = wait([futures[index]], timeout=self.hedge_delay(field) if can_hedge else None)
+                    if done:
+                        break
+                    # The current query is slow: start the next one in case this one finds nothing
+                    futures.append(self.hedge_executor.submit(attempt, field_queries[len(futures)], cancel_event))
+
+                extracted_data = futures[index].result()
+                if extracted_data is not None:
+                    return extracted_data
+                if len(futures) == index + 1 and index + 1 < len(field_queries):
+                    futures.append(self.hedge_executor.submit(attempt, field_queries[index + 1], cancel_event))
+            return None
+        finally:
+            # Lower-priority queries lost: drop the ones not started, stop retries of the others
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+
+    def hedge_delay(self, field: str) -> float:
+        """
+        Seconds a query may run before the next one is started: the HEDGE_LATENCY_PERCENTILE of
+        this field's recent query latencies once there are enough samples, else HEDGE_DELAY_SECONDS.
+        """
+        percentile = self.config.HEDGE_LATENCY_PERCENTILE
+        if percentile and self.query_latency.count(field) >= self.config.HEDGE_MIN_SAMPLES:
+            return self.query_latency.percentile(field, percentile)
+        return self.config.HEDGE_DELAY_SECONDS
+
+    def try_query(
+        self,
+        field: str,
+        query: str,
+        query_for_llm: str,
+        field_points_to_remember: str,
+        similar_content_by_query: dict,
+        collection_name: str,
+        cancel_event: threading.Event = None
+    ):
+        """
+        Asks the LLM for a field using the context retrieved for one query.
+
+        Returns:
+            dict: The extracted entries if the value was found (for 'insurance_required', whatever
+                  insurance entries the response contains), otherwise None.
+        """
+        start = time.perf_counter()
+        llm_calls = self.extractor.llm_calls()
+        try:
+            similar_content = self.similar_content(field, query, similar_content_by_query, collection_name)
+            xml_content = pack_context(similar_content, self.context_budget(field), self.token_counter)
+
+            response = self.extractor.extract_field_value(
+                field,
+                xml_content,
+                query=query_for_llm,
+                points_to_remember=field_points_to_remember,
+                cancel_event=cancel_event
+            )
+
+            extracted_data = {}
+            if field == 'insurance_required':
+                # Extract multiple insurance-related fields
+                for insurance_field in INSURANCE_FIELDS:
+                    if insurance_field in response:
+                        extracted_data[insurance_field] = {
+                            "value": response[insurance_field]["value"],
+                            "page_number": response[insurance_field]["page_number"]
+                        }
+                return extracted_data
+            elif response.get("field_value_found"):
+                extracted_data[field] = {
+                    "value": response.get("value"),
+                    "page_number": response.get("page_number")
+                }
+                return extracted_data
+        except Exception as e:
+            print(f"An error occurred while extracting field '{field}': {e}")
+        finally:
+            # Only attempts that reached the LLM set the hedge delay; cache hits take ~0ms
+            if (cancel_event is None or not cancel_event.is_set()) and self.extractor.llm_calls() > llm_calls:
+                self.query_latency.record(field, time.perf_counter() - start)
+        return None
+
+    def similar_content(self, field: str, query: str, similar_content_by_query: dict, collection_name: str) -> list:
+        """
+        Returns the pre-fetched hits of a (field, query), or retrieves (and reranks) them.
+        """
+        similar_content = similar_content_by_query.get((field, query))
+        if similar_content is None:
+            similar_content = self.db_manager.retrieve_similar_content(
+                query, k=self.retrieval_k(field), collection_name=collection_name, mode=self.retrieval_mode(field)
+            )
+            if self.reranker:
+                similar_content = self.rerank([(field, query, similar_content)])[0]
+        return similar_content
+
+    def retrieval_k(self, field: str) -> int:
+        """
+        Number of chunks retrieved per query: the context size, or the rerank candidates.
+        """
+        k = 10 if field == 'insurance_required' else 5
+        return max(k, self.config.RERANK_CANDIDATES) if self.reranker else k
+
+    def retrieval_mode(self, field: str) -> str:
+        """
+        Retrieval mode of the field's queries (RETRIEVAL_MODE unless overridden per field).
+        """
+        return self.config.RETRIEVAL_MODE_BY_FIELD.get(field, self.config.RETRIEVAL_MODE)
 
+    def context_budget(self, field: str) -> int:
+        """
+        Token budget of the field's LLM context (CONTEXT_MAX_TOKENS unless overridden per field).
+        """
+        return self.config.CONTEXT_MAX_TOKENS_BY_FIELD.get(field, self.config.CONTEXT_MAX_TOKENS)
+
+    def rerank(self, candidates: list) -> list:
+        """
+        Reranks (field, query, hits) candidate lists and returns the kept hits of each.
+        insurance_required keeps twice RERANK_TOP_N chunks, as it retrieves twice as many.
+        """
+        return self.reranker.rerank([
+            (
+                query,
+                hits,
+                self.config.RERANK_TOP_N * (2 if field == 'insurance_required' else 1),
+                10 if field == 'insurance_required' else 5
+            )
+            for field, query, hits in candidates
+        ])
+
+    def save_contract(self, pdfType: str, file_location: str, final_extracted_data: list, file_name: str = None):
+        """
+        Saves the extracted data as a new contract record in the SOW or MSA database.
+
+        Args:
+            pdfType (str): The type of PDF document ('SOW' or 'MSA').
+            file_location (str): The file path to the document.
+            final_extracted_data (list): The extracted field data.
+            file_name (str, optional): Name stored with the record. Defaults to the file name of `file_location`.
+        """
         # Determine the appropriate database session and model based on pdfType
         if pdfType.upper() == "SOW":
             db_session = SOWSessionLocal()
@@ -153,7 +592,7 @@ class DocumentProcessor:
         try:
             # Prepare data for database insertion
             contract_data = {
-                "file_name": os.path.basename(file_location),
+                "file_name": file_name or os.path.basename(file_location),
                 "upload_date": datetime.now(),
                 "processed": True
             }
@@ -177,9 +616,3 @@ class DocumentProcessor:
             print(f"An error occurred while saving to the database: {e}")
         finally:
             db_session.close()
-
-        # Output extracted data for debugging
-        print(f"\n\nExtracted data: {final_extracted_data}")
-
-        # Return the extracted data
-        return final_extracted_data
\ No newline at end of file
@@ -4,26 +4,210 @@ import os
 from dotenv import load_dotenv
 import yaml
 import re
-from openai import OpenAI
+import threading
+import time
+from pydantic import ValidationError
 from langchain.prompts import PromptTemplate
 
 from app.core.config import settings
+from app.schemas.extraction import (
+    cascade_extraction_model, cascade_group_extraction_model, extraction_model, field_format,
+    group_extraction_model, response_format
+)
+from app.utils.latency import LatencyTracker
+from shared.llm_cache import LLMCache, LLMCacheMiss
+from shared.llm_gateway import LLMGateway, load_providers
+from shared.rule_extractors import RuleExtractor
 
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key = os.getenv("OPENAI_API_KEY"))
+# Gateway over the configured OpenAI-compatible providers: each request goes to the healthiest,
+# fastest provider allowed for its field, and fails over to the next one on errors. Every
+# provider has its own request and token budget, which each attempt waits for
+llm_gateway = LLMGateway(
+    load_providers(settings.LLM_PROVIDERS, settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE),
+    routes=settings.LLM_FIELD_ROUTES,
+    window_seconds=settings.LLM_ROUTER_WINDOW_SECONDS,
+    slow_factor=settings.LLM_ROUTER_SLOW_FACTOR,
+    max_error_rate=settings.LLM_ROUTER_MAX_ERROR_RATE,
+    cooldown_seconds=settings.LLM_ROUTER_COOLDOWN_SECONDS
+)
+
+# Cheap models asked first in the cascade mode, behind their own gateway
+cascade_gateway = LLMGateway(
+    load_providers(settings.CASCADE_PROVIDERS, settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE),
+    window_seconds=settings.LLM_ROUTER_WINDOW_SECONDS,
+    slow_factor=settings.LLM_ROUTER_SLOW_FACTOR,
+    max_error_rate=settings.LLM_ROUTER_MAX_ERROR_RATE,
+    cooldown_seconds=settings.LLM_ROUTER_COOLDOWN_SECONDS
+)
+
+# Process-wide LLM response cache; prompts are deterministic given (field, context, query,
+# points to remember, providers the field is routed to), so repeated boilerplate clauses are
+# answered without an API call
+llm_cache = LLMCache(
+    database_url=settings.LLM_CACHE_DATABASE_URL or None,
+    memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+    disk_entries=settings.LLM_CACHE_DISK_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_HOURS * 3600 or None,
+    enabled=settings.LLM_CACHE_ENABLED,
+    offline=settings.LLM_CACHE_OFFLINE
+)
+
+# Tokens reserved for the answer until the real usage is known: a step-by-step answer in the
+# reasoning mode, the bare JSON object in the structured mode
+COMPLETION_TOKENS_ESTIMATE = 400
+STRUCTURED_COMPLETION_TOKENS_ESTIMATE = 100
+
+EXTRACTION_MODES = ("reasoning", "structured", "cascade")
+
+DEFAULT_RESPONSE = {"value": "null", "field_value_found": False, "page_number": 0}
+
+# Answer formats of the constrained fields, which the cascade mode asks the cheap model first
+FIELD_FORMATS = {
+    field: rule
+    for field, points in {**settings.SOW_POINTS_TO_REMEMBER, **settings.MSA_POINTS_TO_REMEMBER}.items()
+    if (rule := field_format(points)) is not None
+}
+
+CONFIDENCE_LEVELS = ("low", "medium", "high")
+
+# Deterministic fast path over the page text, tried before retrieval and the LLM for the
+# SOW_FAST_PATH_FIELDS / MSA_FAST_PATH_FIELDS (dates in the prompts' YYYY-MM-DD format)
+rule_extractor = RuleExtractor(date_format="%Y-%m-%d")
+
+class ExtractionStats:
+    """
+    Totals of the LLM extraction calls made by this process, per extraction mode.
+
+    Attributes:
+        calls (int): Chat completion requests (including retries and repairs).
+        completion_tokens (int): Output tokens of those requests.
+        parse_failures (int): Responses that could not be parsed or validated.
+        repairs (int): Repair requests sent in the structured mode.
+        seconds (float): Time spent waiting for responses.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, mode: str, seconds: float, usage=None, parse_failed: bool = False, repair: bool = False) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(mode, {"calls": 0, "completion_tokens": 0, "parse_failures": 0, "repairs": 0, "seconds": 0.0})
+            totals["calls"] += 1
+            totals["completion_tokens"] += getattr(usage, "completion_tokens", None) or 0
+            totals["parse_failures"] += int(parse_failed)
+            totals["repairs"] += int(repair)
+            totals["seconds"] += seconds
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                mode: {
+                    **totals,
+                    "seconds": round(totals["seconds"], 3),
+                    "completion_tokens_per_call": round(totals["completion_tokens"] / totals["calls"], 1),
+                    "parse_failure_rate": round(totals["parse_failures"] / totals["calls"], 4),
+                    "seconds_per_call": round(totals["seconds"] / totals["calls"], 3),
+                }
+                for mode, totals in self._totals.items()
+            }
+
+# Process-wide extraction totals
+extraction_stats = ExtractionStats()
+
+class CascadeStats:
+    """
+    Outcomes of the cascade mode per field (or field group) in this process.
+
+    Attributes:
+        accepted (int): Cheap-model answers kept.
+        escalated (int): Cheap-model answers rejected, so the field was extracted again with the
+            full model; `escalation_reasons` counts why (confidence, not_found, format, page,
+            invalid_answer, error).
+        direct (int): Free-text fields sent to the full model without a cheap attempt.
+        latency (LatencyTracker): Whole extraction time per field, escalations included.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self.latency = LatencyTracker()
+
+    def record(self, field: str, seconds: float, outcome: str, reason: str = None) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(field, {"accepted": 0, "escalated": 0, "direct": 0, "escalation_reasons": {}})
+            totals[outcome] += 1
+            if reason:
+                totals["escalation_reasons"][reason] = totals["escalation_reasons"].get(reason, 0) + 1
+        self.latency.record(f"{field}:{outcome}", seconds)
+        self.latency.record(field, seconds)
+
+    def to_dict(self) -> dict:
+        latency = self.latency.stats()
+        with self._lock:
+            fields = {}
+            for field, totals in sorted(self._totals.items()):
+                tried = totals["accepted"] + totals["escalated"]
+                fields[field] = {
+                    **totals,
+                    "escalation_rate": round(totals["escalated"] / tried, 4) if tried else None,
+                    "latency": latency.get(field),
+                    "latency_by_outcome": {
+                        outcome: latency[f"{field}:{outcome}"]
+                        for outcome in ("accepted", "escalated", "direct")
+                        if f"{field}:{outcome}" in latency
+                    },
+                }
+            accepted = sum(totals["accepted"] for totals in self._totals.values())
+            escalated = sum(totals["escalated"] for totals in self._totals.values())
+        return {
+            "accepted": accepted,
+            "escalated": escalated,
+            "escalation_rate": round(escalated / (accepted + escalated), 4) if accepted + escalated else None,
+            "fields": fields,
+        }
+
+# Process-wide cascade outcomes
+cascade_stats = CascadeStats()
+
+def parse_extracted_response(response_text):
+    """
+    Parses the JSON between the <extracted> tags of an LLM response.
+    """
+    # Use regex to extract the JSON part between <extracted> tags
+    match = re.search(r'<extracted>(.*?)</extracted>', response_text, re.DOTALL)
+    if match:
+        extracted_json_text = match.group(1).strip()
+    else:
+        raise ValueError("<extracted> not found in the response.")
+
+    # Convert the extracted text to JSON
+    return json.loads(extracted_json_text)
 
 class ExtractField:
     """
     Provides functionality to extract specific field values from given content using a Language Model (LLM). 
     This class formats prompts based on required fields and handles retries in case of extraction failures.
+    Responses that parse are stored in the LLM response cache, and identical prompts are answered from it.
+    API calls wait for the providers' rate limits in the gateway, so the method can be called from many threads.
+
+    Three extraction modes are supported (EXTRACTION_MODE):
+        reasoning: PROMPT_TEMPLATE; the model thinks step by step, the answer is parsed from
+            its <extracted> tags, and the whole request is re-sent on failure.
+        structured: STRUCTURED_PROMPT_TEMPLATE with JSON-schema output and no reasoning preamble;
+            the answer is validated with the field's pydantic model, and an invalid answer gets
+            a single repair request quoting the validation errors.
+        cascade: constrained fields (FIELD_FORMATS) are first asked of a cheap model in the
+            structured mode; answers with the wrong format, an unknown page or low confidence
+            are escalated to CASCADE_ESCALATION_MODE with the full model, as are free-text fields.
 
     Attributes:
+        mode (str): The extraction mode.
         prompt_template (PromptTemplate): Template used for formatting prompts based on provided settings.
+        structured_prompt_template (PromptTemplate): Template of the structured mode.
 
     Methods:
-        extract_field_value(required_field, similar_content, query, points_to_remember, max_retries=3):
+        extract_field_value(required_field, similar_content, query, points_to_remember, max_retries=3, cancel_event=None, group_fields=None):
             Extracts the value of a specified field from the given content using the LLM.
             
             Parameters:
@@ -32,16 +216,51 @@ class ExtractField:
                 query (str): The query or question to guide the extraction process.
                 points_to_remember (str): Key points that the LLM should keep in mind during extraction.
                 max_retries (int, optional): The maximum number of retry attempts in case of failure. Defaults to 3.
+                    Reasoning mode (or escalation to it) only.
+            
+                cancel_event (threading.Event, optional): Once set, no further API attempts are made.
+                group_fields (list, optional): Member fields when extracting a field group; the
+                    answer then holds one entry per member (the prompt describes the format, and
+                    the structured mode validates it with the group's model).
             
             Returns:
                 dict: A dictionary containing the extracted field value, a boolean indicating 
                       if the field value was found, and the page number.
     """
-    def __init__(self):
+    def __init__(self, mode: str = None):
+        self.mode = mode or settings.EXTRACTION_MODE
+        if self.mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode '{self.mode}', expected one of {EXTRACTION_MODES}")
+        if self.mode == "cascade" and settings.CASCADE_ESCALATION_MODE not in ("reasoning", "structured"):
+            raise ValueError(f"Unknown cascade escalation mode '{settings.CASCADE_ESCALATION_MODE}'")
         self.prompt_template = PromptTemplate.from_template(settings.PROMPT_TEMPLATE)
+        self.structured_prompt_template = PromptTemplate.from_template(settings.STRUCTURED_PROMPT_TEMPLATE)
+        self._thread_calls = threading.local()
+
+    def llm_calls(self) -> int:
+        """
+        API requests made so far by the calling thread (answers from the cache not included).
+        """
+        return getattr(self._thread_calls, "count", 0)
 
-    def extract_field_value(self, required_field, similar_content, query, points_to_remember, max_retries=3):
+    def count_llm_call(self) -> None:
+        self._thread_calls.count = self.llm_calls() + 1
 
+    def extract_field_value(self, required_field, similar_content, query, points_to_remember, max_retries=3, cancel_event=None, group_fields=None):
+        if self.mode == "cascade":
+            return self.extract_cascade(required_field, similar_content, query, points_to_remember, max_retries, cancel_event, group_fields)
+        if self.mode == "structured":
+            return self.extract_structured(required_field, similar_content, query, points_to_remember, cancel_event, group_fields)
+        return self.extract_reasoning(required_field, similar_content, query, points_to_remember, max_retries, cancel_event, group_fields)
+
+    def extract_reasoning(self, required_field, similar_content, query, points_to_remember, max_retries=3, cancel_event=None, group_fields=None):
+        """
+        Extracts a field in the reasoning mode, re-sending the request up to `max_retries` times
+        until the answer between the <extracted> tags parses.
+
+        Returns:
+            dict: The parsed answer, or the default response.
+        """
         prompt = self.prompt_template.format(
             required_field=required_field,
             similar_content=similar_content,
@@ -49,35 +268,259 @@ class ExtractField:
             points_to_remember=points_to_remember
         )
 
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt},
+        ]
+
+        route = self.route(required_field, group_fields)
+        cache_key = llm_cache.make_key(llm_gateway.fingerprint(route), messages)
+        try:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return parse_extracted_response(cached.content)
+        except LLMCacheMiss:
+            print(f"Offline mode: no cached LLM response for '{required_field}'. Returning default response.")
+            return dict(DEFAULT_RESPONSE)
+        except Exception as e:
+            print(f"Ignoring unusable cached response: {e}")
+
         for attempt in range(max_retries):
+            # A hedged query that already lost does not need an answer
+            if cancel_event is not None and cancel_event.is_set():
+                return dict(DEFAULT_RESPONSE)
             try:
-                # Create a chat completion using the OpenAI API
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant."},
-                        {"role": "user", "content": prompt},
-                    ]
-                )
+                # Create a chat completion through the provider gateway, within each provider's rate limits
+                self.count_llm_call()
+                start = time.perf_counter()
+                response = llm_gateway.complete(messages, field=route, completion_tokens=COMPLETION_TOKENS_ESTIMATE)
+                elapsed = time.perf_counter() - start
 
                 # Extract the content from the response
-                response_text = response.choices[0].message.content.strip()
-
-                # Use regex to extract the JSON part between <extracted> tags
-                match = re.search(r'<extracted>(.*?)</extracted>', response_text, re.DOTALL)
-                if match:
-                    extracted_json_text = match.group(1).strip()
-                else:
-                    raise ValueError("<extracted> not found in the response.")
+                response_text = (response.choices[0].message.content or "").strip()
+                try:
+                    response_json = parse_extracted_response(response_text)
+                except Exception:
+                    extraction_stats.record("reasoning", elapsed, response.usage, parse_failed=True)
+                    raise
+                extraction_stats.record("reasoning", elapsed, response.usage)
 
-                # Convert the extracted text to JSON
-                response_json = json.loads(extracted_json_text)
+                # Only responses that parse are cached, so a retry never replays a bad answer, and
+                # only the route's first provider's, so a fallback model's answer is not replayed
+                if llm_gateway.answered_by_primary(response, route):
+                    llm_cache.set(cache_key, response.model, response_text, response.usage)
                 return response_json
 
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed with error: {e}")
                 if attempt == max_retries - 1:
                     print("Max retries reached. Returning default response.")
-                    return {"value": "null", "field_value_found": False, "page_number": 0}
+                    return dict(DEFAULT_RESPONSE)
                 else:
-                    continue
\ No newline at end of file
+                    continue
+
+    @staticmethod
+    def route(required_field, group_fields=None):
+        """
+        Field whose provider routing applies: a group follows its first member with an override.
+        """
+        if group_fields:
+            return llm_gateway.route(group_fields)
+        return required_field
+
+    def extract_structured(self, required_field, similar_content, query, points_to_remember, cancel_event=None, group_fields=None):
+        """
+        Extracts a field in the structured mode: one JSON-schema request, and if the answer does
+        not validate against the field's model, one repair request. API errors are not retried
+        here (the gateway already fails over to the other providers).
+
+        Returns:
+            dict: The validated answer, or the default response.
+        """
+        model = group_extraction_model(tuple(group_fields)) if group_fields else extraction_model(required_field)
+        request_format = response_format(model)
+        prompt = self.structured_prompt_template.format(
+            required_field=required_field,
+            similar_content=similar_content,
+            query=query,
+            points_to_remember=points_to_remember
+        )
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt},
+        ]
+
+        route = self.route(required_field, group_fields)
+        cache_key = llm_cache.make_key(llm_gateway.fingerprint(route), messages, response_format=request_format)
+        try:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return model.model_validate_json(cached.content).model_dump()
+        except LLMCacheMiss:
+            print(f"Offline mode: no cached LLM response for '{required_field}'. Returning default response.")
+            return dict(DEFAULT_RESPONSE)
+        except Exception as e:
+            print(f"Ignoring unusable cached response: {e}")
+
+        for repair in (False, True):
+            if cancel_event is not None and cancel_event.is_set():
+                return dict(DEFAULT_RESPONSE)
+            try:
+                self.count_llm_call()
+                start = time.perf_counter()
+                response = llm_gateway.complete(
+                    messages,
+                    field=route,
+                    completion_tokens=STRUCTURED_COMPLETION_TOKENS_ESTIMATE,
+                    response_format=request_format
+                )
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                print(f"Structured extraction of '{required_field}' failed with error: {e}")
+                return dict(DEFAULT_RESPONSE)
+
+            response_text = (response.choices[0].message.content or "").strip()
+            try:
+                answer = model.model_validate_json(response_text)
+            except ValidationError as e:
+                extraction_stats.record("structured", elapsed, response.usage, parse_failed=True, repair=repair)
+                errors = "; ".join(f"{'.'.join(map(str, error['loc'])) or 'response'}: {error['msg']}" for error in e.errors())
+                print(f"Invalid structured answer for '{required_field}': {errors}")
+                # Ask once for a corrected answer, showing the model what it returned
+                messages = messages + [
+                    {"role": "assistant", "content": response_text},
+                    {"role": "user", "content": settings.STRUCTURED_REPAIR_PROMPT.format(errors=errors)},
+                ]
+                continue
+            extraction_stats.record("structured", elapsed, response.usage, repair=repair)
+
+            # Cached under the original prompt, so a later identical request needs no repair
+            if llm_gateway.answered_by_primary(response, route):
+                llm_cache.set(cache_key, response.model, response_text, response.usage)
+            return answer.model_dump()
+
+        print("Repair failed. Returning default response.")
+        return dict(DEFAULT_RESPONSE)
+
+    def extract_cascade(self, required_field, similar_content, query, points_to_remember, max_retries=3, cancel_event=None, group_fields=None):
+        """
+        Extracts a field in the cascade mode: constrained fields (every member, for a group) are
+        asked of the cheap model first, and its answer is returned unless `escalation_reason`
+        rejects it. Rejected answers and free-text fields are extracted in
+        CASCADE_ESCALATION_MODE through the main gateway.
+
+        Returns:
+            dict: The accepted cheap answer or the escalated one, or the default response.
+        """
+        fields = list(group_fields) if group_fields else [required_field]
+        start = time.perf_counter()
+        if not cascade_gateway.providers or not all(field in FIELD_FORMATS for field in fields):
+            outcome, reason = "direct", None
+        else:
+            answer, reason = self.extract_with_cheap_model(required_field, similar_content, query, points_to_remember, cancel_event, group_fields)
+            if reason is None:
+                reason = self.escalation_reason(answer, fields, similar_content, grouped=bool(group_fields))
+            if reason is None:
+                cascade_stats.record(required_field, time.perf_counter() - start, "accepted")
+                return self.without_confidence(answer, grouped=bool(group_fields))
+            outcome = "escalated"
+            print(f"Escalating '{required_field}' to the full model: {reason[1]}")
+
+        if cancel_event is not None and cancel_event.is_set():
+            return dict(DEFAULT_RESPONSE)
+        if settings.CASCADE_ESCALATION_MODE == "structured":
+            result = self.extract_structured(required_field, similar_content, query, points_to_remember, cancel_event, group_fields)
+        else:
+            result = self.extract_reasoning(required_field, similar_content, query, points_to_remember, max_retries, cancel_event, group_fields)
+        cascade_stats.record(required_field, time.perf_counter() - start, outcome, reason[0] if reason else None)
+        return result
+
+    def extract_with_cheap_model(self, required_field, similar_content, query, points_to_remember, cancel_event=None, group_fields=None):
+        """
+        Asks the cheap model once, in the structured mode, for the field and its confidence.
+
+        Returns:
+            tuple: (answer dict, None), or (None, (reason, message)) if no valid answer came back.
+        """
+        model = cascade_group_extraction_model(tuple(group_fields)) if group_fields else cascade_extraction_model(required_field)
+        request_format = response_format(model)
+        prompt = self.structured_prompt_template.format(
+            required_field=required_field,
+            similar_content=similar_content,
+            query=query,
+            points_to_remember=points_to_remember
+        )
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt},
+        ]
+
+        cache_key = llm_cache.make_key(cascade_gateway.fingerprint(), messages, response_format=request_format)
+        try:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return model.model_validate_json(cached.content).model_dump(), None
+        except LLMCacheMiss:
+            return None, ("error", "no cached cheap-model response in offline mode")
+        except Exception as e:
+            print(f"Ignoring unusable cached response: {e}")
+
+        if cancel_event is not None and cancel_event.is_set():
+            return None, ("error", "cancelled")
+        try:
+            self.count_llm_call()
+            start = time.perf_counter()
+            response = cascade_gateway.complete(
+                messages,
+                completion_tokens=STRUCTURED_COMPLETION_TOKENS_ESTIMATE,
+                response_format=request_format
+            )
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            return None, ("error", f"cheap model failed: {e}")
+
+        response_text = (response.choices[0].message.content or "").strip()
+        try:
+            answer = model.model_validate_json(response_text)
+        except ValidationError as e:
+            extraction_stats.record("cascade", elapsed, response.usage, parse_failed=True)
+            return None, ("invalid_answer", f"answer does not match the schema ({e.error_count()} errors)")
+        extraction_stats.record("cascade", elapsed, response.usage)
+
+        if cascade_gateway.answered_by_primary(response):
+            llm_cache.set(cache_key, response.model, response_text, response.usage)
+        return answer.model_dump(), None
+
+    @staticmethod
+    def escalation_reason(answer, fields, similar_content, grouped=False):
+        """
+        Checks a cheap-model answer for every field: confidence of at least CASCADE_MIN_CONFIDENCE,
+        a value that has the field's format (or an acceptable "null"), and a page number that
+        occurs in the context.
+
+        Returns:
+            tuple: (reason, message) for the first failed check, or None if the answer is kept.
+        """
+        pages = {int(page) for page in re.findall(r"<PageNumber>\s*(\d+)\s*</PageNumber>", similar_content)}
+        min_confidence = CONFIDENCE_LEVELS.index(settings.CASCADE_MIN_CONFIDENCE)
+        for field in fields:
+            entry = answer[field] if grouped else answer
+            if CONFIDENCE_LEVELS.index(entry["confidence"]) < min_confidence:
+                return "confidence", f"{field}: {entry['confidence']} confidence"
+            rule = FIELD_FORMATS[field]
+            if not entry["field_value_found"] or str(entry["value"]).strip().lower() in ("", "null", "none"):
+                if settings.CASCADE_ESCALATE_NOT_FOUND or not rule.allow_null:
+                    return "not_found", f"{field}: no value found"
+                continue
+            error = rule.check(entry["value"])
+            if error:
+                return "format", f"{field}: '{entry['value']}' is not valid, {error}"
+            if pages and entry["page_number"] not in pages:
+                return "page", f"{field}: page {entry['page_number']} is not in the context"
+        return None
+
+    @staticmethod
+    def without_confidence(answer, grouped=False):
+        if grouped:
+            return {field: {key: value for key, value in entry.items() if key != "confidence"} for field, entry in answer.items()}
+        return {key: value for key, value in answer.items() if key != "confidence"}
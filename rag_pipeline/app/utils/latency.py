@@ -0,0 +1,57 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent latencies per key (e.g. per field) and reports their percentiles.
+
+    Attributes:
+        window (int): Number of recent samples kept per key.
+    """
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def count(self, key: str) -> int:
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """
+        Returns the given percentile of the key's recent latencies, or None without samples.
+        """
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if not samples:
+            return None
+        return float(np.percentile(samples, percentile))
+
+    def stats(self) -> dict:
+        """
+        Returns count, p50 and p95 (in seconds) for every key.
+        """
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+        return {
+            key: {
+                "count": len(samples),
+                "p50": round(float(np.percentile(samples, 50)), 3),
+                "p95": round(float(np.percentile(samples, 95)), 3),
+            }
+            for key, samples in sorted(snapshot.items())
+            if samples
+        }
+
+
+# Process-wide latencies per field: whole-field extraction, and single query attempts that
+# reached the LLM (the latter also set the hedge delay in hedged mode)
+field_latency = LatencyTracker()
+query_latency = LatencyTracker()
@@ -0,0 +1,169 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+
+from app.core.config import settings, Settings
+from app.database.connection import SOWSessionLocal, MSASessionLocal
+from app.models.models import SOWResultCache, MSAResultCache
+
+
+# Settings besides SOW_* / MSA_* that change extraction results
+CONFIG_VERSION_SETTINGS = (
+    "PROMPT_TEMPLATE", "LLM_MODEL",
+    "EMBEDDING_MODEL_NAME", "EMBEDDING_BACKEND", "CHUNK_SIZE", "CHUNK_OVERLAP",
+    "RETRIEVAL_MODE", "RETRIEVAL_MODE_BY_FIELD", "RRF_K", "HYBRID_CANDIDATES",
+    "EXTRACTION_MODE", "STRUCTURED_PROMPT_TEMPLATE", "STRUCTURED_REPAIR_PROMPT",
+    "RERANKER_MODEL_NAME", "RERANK_ENABLED", "RERANK_CANDIDATES", "RERANK_TOP_N", "RERANK_MIN_SCORE",
+    "CONTEXT_MAX_TOKENS", "CONTEXT_MAX_TOKENS_BY_FIELD",
+    "FIELD_GROUPS_ENABLED",
+    "LLM_PROVIDERS", "LLM_FIELD_ROUTES",
+    "CASCADE_PROVIDERS", "CASCADE_MIN_CONFIDENCE", "CASCADE_ESCALATE_NOT_FOUND", "CASCADE_ESCALATION_MODE",
+)
+
+
+def extraction_config_version(config: Settings) -> str:
+    """
+    Fingerprints every setting that changes extraction results: all SOW_* / MSA_* settings
+    (fields, queries, points to remember, ...) and CONFIG_VERSION_SETTINGS (prompts, models,
+    embedding, chunking, retrieval and extraction mode). Cached results from another version
+    are never returned.
+    """
+    relevant = {
+        name: value
+        for name, value in config.model_dump().items()
+        if (name.startswith(("SOW_", "MSA_")) and not name.endswith("_DATABASE_URL"))
+        or name in CONFIG_VERSION_SETTINGS
+    }
+    serialized = json.dumps(relevant, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Durable cache of final extracted data, stored in the SOW and MSA SQLite databases.
+
+    Entries are keyed by (file content hash, pdfType, extraction config version), so the same
+    PDF uploaded again returns instantly, and any change to the prompt template or the
+    SOW_* / MSA_* settings invalidates every earlier entry.
+
+    Attributes:
+        config_version (str): Fingerprint of the current extraction settings.
+        hits (int): Cache hits served by this process.
+        misses (int): Lookups that found nothing in this process.
+        bypassed (int): Requests that skipped the lookup in this process.
+    """
+
+    def __init__(self, config: Settings = settings):
+        self.config_version = extraction_config_version(config)
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def _session_and_model(self, pdf_type: str):
+        if pdf_type.upper() == "SOW":
+            return SOWSessionLocal(), SOWResultCache
+        elif pdf_type.upper() == "MSA":
+            return MSASessionLocal(), MSAResultCache
+        raise ValueError(f"Invalid pdfType: {pdf_type}")
+
+    def get(self, content_hash: str, pdf_type: str) -> Optional[list]:
+        """
+        Returns the cached final extracted data for a document, or None on a miss.
+        """
+        db_session, cache_model = self._session_and_model(pdf_type)
+        try:
+            entry = (
+                db_session.query(cache_model)
+                .filter_by(content_hash=content_hash, pdf_type=pdf_type.upper(), config_version=self.config_version)
+                .first()
+            )
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db_session.commit()
+            self.hits += 1
+            return json.loads(entry.result)
+        finally:
+            db_session.close()
+
+    def put(self, content_hash: str, pdf_type: str, final_extracted_data: list) -> None:
+        """
+        Stores (or replaces) the final extracted data for a document.
+        """
+        db_session, cache_model = self._session_and_model(pdf_type)
+        try:
+            entry = (
+                db_session.query(cache_model)
+                .filter_by(content_hash=content_hash, pdf_type=pdf_type.upper(), config_version=self.config_version)
+                .first()
+            )
+            if entry is None:
+                entry = cache_model(
+                    content_hash=content_hash,
+                    pdf_type=pdf_type.upper(),
+                    config_version=self.config_version,
+                    hit_count=0
+                )
+                db_session.add(entry)
+            entry.result = json.dumps(final_extracted_data)
+            entry.created_at = datetime.now()
+            db_session.commit()
+        except Exception as e:
+            print(f"An error occurred while caching the extraction result: {e}")
+        finally:
+            db_session.close()
+
+    def purge_stale(self) -> int:
+        """
+        Deletes entries written under any other extraction config version.
+        """
+        purged = 0
+        for pdf_type in ("SOW", "MSA"):
+            db_session, cache_model = self._session_and_model(pdf_type)
+            try:
+                purged += (
+                    db_session.query(cache_model)
+                    .filter(cache_model.config_version != self.config_version)
+                    .delete(synchronize_session=False)
+                )
+                db_session.commit()
+            finally:
+                db_session.close()
+        return purged
+
+    def stats(self) -> dict:
+        """
+        Returns this process's hit/miss counters and the persisted totals per database.
+        """
+        persisted = {}
+        for pdf_type in ("SOW", "MSA"):
+            db_session, cache_model = self._session_and_model(pdf_type)
+            try:
+                entries, total_hits = (
+                    db_session.query(func.count(cache_model.id), func.coalesce(func.sum(cache_model.hit_count), 0))
+                    .filter(cache_model.config_version == self.config_version)
+                    .one()
+                )
+                persisted[pdf_type] = {"entries": entries, "hits": total_hits}
+            finally:
+                db_session.close()
+
+        lookups = self.hits + self.misses
+        return {
+            "config_version": self.config_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "persisted": persisted,
+        }
+
+
+# Process-wide cache instance; the API drops stale entries from older configurations at
+# startup (app/main.py)
+result_cache = ResultCache()
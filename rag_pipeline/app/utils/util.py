@@ -1,3 +1,23 @@
+from typing import Callable, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # The token budget falls back to an estimate of four characters per token
+    tiktoken = None
+
+
+def render_chunk(index: int, text: str, page_number) -> str:
+    """
+    Renders one chunk of the XML-like context.
+    """
+    return (
+        f"  <Chunk{index}>\n"
+        f"    <Text>\n      {text}\n    </Text>\n"
+        f"    <PageNumber>{page_number}</PageNumber>\n"
+        f"  </Chunk{index}>\n"
+    )
+
+
 def convert_list_to_xml(data_list):
     """
     Convert a list of dictionaries containing 'text' and 'page_number' to an XML-like format.
@@ -8,19 +28,166 @@ def convert_list_to_xml(data_list):
     Returns:
         str: The converted data in XML-like format.
     """
-    # Initialize the XML-like string
-    xml_output = "<Context>\n"
+    parts = ["<Context>\n"]
+    parts.extend(render_chunk(i, item['text'], item['page_number']) for i, item in enumerate(data_list, start=1))
+    parts.append("</Context>")
+    return "".join(parts)
+
+
+class TokenCounter:
+    """
+    Counts and truncates text in tokens of the LLM's tokenizer (tiktoken), or with an estimate of
+    four characters per token when tiktoken or its encoding files are not available.
+
+    Attributes:
+        model (str): The LLM whose tokenizer is used.
+        exact (bool): Whether counts come from the real tokenizer.
+    """
+    def __init__(self, model: str):
+        self.model = model
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                try:
+                    self.encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    self.encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:  # The encoding is downloaded on first use
+                print(f"Tokenizer for '{model}' not available, estimating token counts: {e}")
+        self.exact = self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Returns the longest prefix of `text` within `max_tokens`, cut at a word boundary.
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            prefix = self.encoding.decode(tokens[:max_tokens])
+        else:
+            if len(text) <= max_tokens * 4:
+                return text
+            prefix = text[:max_tokens * 4]
+        cut = prefix.rfind(" ")
+        return prefix[:cut] if cut > 0 else prefix
+
+
+def _merge_chunks(a: dict, b: dict, min_overlap: int = 10, max_overlap: int = 512) -> Optional[dict]:
+    """
+    Merges two chunks of the same page if one contains the other, or they overlap or are
+    adjacent in the page text. Returns the merged chunk, or None if they are unrelated.
+
+    With known page offsets ('chunk_start') the merge is exact; otherwise the longest suffix of
+    one chunk that is a prefix of the other (`min_overlap` to `max_overlap` characters) is used.
+    """
+    if a["page_number"] != b["page_number"]:
+        return None
+    rank = min(a["rank"], b["rank"])
+
+    if a.get("chunk_start") is not None and b.get("chunk_start") is not None:
+        low, high = (a, b) if a["chunk_start"] <= b["chunk_start"] else (b, a)
+        low_end = low["chunk_start"] + len(low["text"])
+        high_end = high["chunk_start"] + len(high["text"])
+        if high["chunk_start"] > low_end + 1:  # Chunks are stripped, so adjacent ones may be one space apart
+            return None
+        if high_end <= low_end:
+            text = low["text"]
+        elif high["chunk_start"] > low_end:
+            text = low["text"] + " " + high["text"]
+        else:
+            text = low["text"] + high["text"][low_end - high["chunk_start"]:]
+        return {"text": text, "page_number": a["page_number"], "chunk_start": low["chunk_start"], "rank": rank}
+
+    if b["text"] in a["text"]:
+        return {**a, "rank": rank}
+    if a["text"] in b["text"]:
+        return {**b, "rank": rank}
+    for first, second in ((a, b), (b, a)):
+        for size in range(min(len(first["text"]), len(second["text"]), max_overlap), min_overlap - 1, -1):
+            if first["text"].endswith(second["text"][:size]):
+                return {
+                    "text": first["text"] + second["text"][size:],
+                    "page_number": a["page_number"],
+                    "chunk_start": None,
+                    "rank": rank
+                }
+    return None
+
+
+def pack_context(
+    data_list: List[dict],
+    max_tokens: int = 0,
+    counter: TokenCounter = None,
+    on_truncate: Callable[[int], None] = None
+) -> str:
+    """
+    Builds the XML-like context of `convert_list_to_xml` from retrieved chunks, without sending
+    the same text twice and within a token budget.
+
+    Chunks of the same page that overlap (CHUNK_OVERLAP) or are adjacent are merged into one,
+    chunks contained in another and exact duplicates are dropped. The merged chunks keep the
+    retrieval order (by their best-ranked part) and are added until `max_tokens` is reached;
+    the chunk crossing the budget is truncated, the rest are left out.
+
+    Args:
+        data_list (list): Retrieved chunks ('text', 'page_number', optionally 'chunk_start'), best first.
+        max_tokens (int, optional): Token budget of the whole context; 0 for no limit.
+        counter (TokenCounter, optional): Tokenizer for the budget. Required when max_tokens is set.
+        on_truncate (callable, optional): Called with the number of chunks cut or left out.
+
+    Returns:
+        str: The context in XML-like format.
+    """
+    blocks = []
+    seen_texts = set()
+    for rank, item in enumerate(data_list):
+        text = (item.get("text") or "").strip()
+        if not text or text in seen_texts:
+            continue
+        seen_texts.add(text)
 
-    # Iterate over the data list and construct the XML-like format
-    for i, item in enumerate(data_list, start=1):
-        text = item['text']
-        page_number = item['page_number']
-        xml_output += f"  <Chunk{i}>\n"
-        xml_output += f"    <Text>\n      {text}\n    </Text>\n"
-        xml_output += f"    <PageNumber>{page_number}</PageNumber>\n"
-        xml_output += f"  </Chunk{i}>\n"
+        block = {"text": text, "page_number": item["page_number"], "chunk_start": item.get("chunk_start"), "rank": rank}
+        # A merged block may now join another block of the page, so merge until nothing changes
+        merged = True
+        while merged:
+            merged = False
+            for i, other in enumerate(blocks):
+                combined = _merge_chunks(other, block)
+                if combined is not None:
+                    del blocks[i]
+                    block = combined
+                    merged = True
+                    break
+        blocks.append(block)
+    blocks.sort(key=lambda block: block["rank"])
 
-    # Close the Context tag
-    xml_output += "</Context>"
+    parts = ["<Context>\n"]
+    used = counter.count("<Context>\n</Context>") if max_tokens else 0
+    left_out = 0
+    for block in blocks:
+        chunk = render_chunk(len(parts), block["text"], block["page_number"])
+        if max_tokens:
+            tokens = counter.count(chunk)
+            if used + tokens > max_tokens:
+                left_out = len(blocks) - len(parts) + 1
+                # Fill the rest of the budget with the start of this chunk, if it is worth it
+                overhead = counter.count(render_chunk(len(parts), "", block["page_number"]))
+                text = counter.truncate(block["text"], max_tokens - used - overhead)
+                if counter.count(text) >= 50:
+                    parts.append(render_chunk(len(parts), text, block["page_number"]))
+                break
+            used += tokens
+        parts.append(chunk)
+    parts.append("</Context>")
 
-    return xml_output
+    if left_out and on_truncate:
+        on_truncate(left_out)
+    return "".join(parts)
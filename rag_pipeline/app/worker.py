@@ -0,0 +1,11 @@
+from app.core.config import settings
+from app.services.jobs import JOB_HANDLER
+from shared.jobs import parse_worker_args, run_workers
+
+# Runs job workers separately from the API so they can be scaled independently:
+#   cd rag_pipeline && python -m app.worker --workers 4
+# The API starts none itself unless JOB_WORKERS is set.
+
+if __name__ == "__main__":
+    args = parse_worker_args(settings.JOBS_DATABASE_URL, settings.JOB_WORKERS or 1, settings.JOB_POLL_INTERVAL)
+    run_workers(args.database_url, JOB_HANDLER, args.workers, args.poll_interval)
@@ -0,0 +1,141 @@
+# FILE: bench_context_packing.py
+
+import re
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.core.config import settings
+from app.database.chunking import split_pages
+from app.utils.util import TokenCounter, convert_list_to_xml, pack_context
+from app.utils.utilities import load_documents
+
+CONTRACT_DIR = current_dir.parent / "tests" / "contract_files"
+
+
+def lexical_retriever(chunks: list):
+    """
+    Ranks chunks by the cosine similarity of their word counts with the query. Only used when
+    the embedding model cannot be loaded; the hits overlap less than real retrieval does.
+    """
+    vocabulary = {}
+    def vectorize(text):
+        vector = {}
+        for word in re.findall(r"\w+", text.lower()):
+            index = vocabulary.setdefault(word, len(vocabulary))
+            vector[index] = vector.get(index, 0) + 1
+        return vector
+
+    chunk_vectors = [vectorize(text) for text, _, _ in chunks]
+    matrix = np.zeros((len(chunks), len(vocabulary)), dtype=np.float32)
+    for row, vector in enumerate(chunk_vectors):
+        for index, count in vector.items():
+            matrix[row, index] = count
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+
+    def retrieve(requests):
+        results = []
+        for query, k in requests:
+            query_vector = np.zeros(matrix.shape[1], dtype=np.float32)
+            for word in re.findall(r"\w+", query.lower()):
+                if word in vocabulary:
+                    query_vector[vocabulary[word]] += 1
+            top = np.argsort(-(matrix @ query_vector), kind="stable")[:k]
+            results.append([
+                {"text": chunks[i][0], "page_number": chunks[i][1], "chunk_start": chunks[i][2]}
+                for i in top
+            ])
+        return results
+    return retrieve
+
+
+def field_requests(pdf_type: str) -> list:
+    """
+    Every (field, query, k) the pipeline retrieves for a contract type, as in extract_fields.
+    """
+    fields = getattr(settings, f"{pdf_type}_FIELDS_TO_EXTRACT")
+    queries = getattr(settings, f"{pdf_type}_QUERIES")
+    query_for_each_field = getattr(settings, f"{pdf_type}_QUERY_FOR_EACH_FIELD")
+    return [
+        (field, query, 10 if field == "insurance_required" else 5)
+        for field in fields
+        for query in queries.get(field, [query_for_each_field.get(field, "")])
+    ]
+
+
+def main():
+    """
+    Measures prompt tokens per field with the old context (every retrieved chunk verbatim) and
+    the packed context (merged, de-duplicated and within the CONTEXT_MAX_TOKENS budget), for each
+    contract in tests/contract_files and both contract types.
+
+    Retrieval uses the embedding model when it can be loaded (--lexical skips it), otherwise a
+    word-count ranking. Token counts use the LLM's tokenizer when available.
+    """
+    parser = argparse.ArgumentParser(description="Prompt tokens per field before and after context packing.")
+    parser.add_argument("--lexical", action="store_true", help="Rank chunks by word overlap instead of embeddings")
+    parser.add_argument("--budget", type=int, default=None, help="Override CONTEXT_MAX_TOKENS (0 = merge and de-duplicate only)")
+    args = parser.parse_args()
+
+    counter = TokenCounter(settings.LLM_MODEL)
+    db_manager = None
+    if not args.lexical:
+        try:
+            from app.database.db_manager import DatabaseManager
+            db_manager = DatabaseManager(
+                model_name=settings.EMBEDDING_MODEL_NAME,
+                milvus_uri=settings.MILVUS_URI,
+                collection_name=settings.MILVUS_COLLECTION_NAME,
+                dimension=settings.DIMENSION,
+                chunk_size=settings.CHUNK_SIZE,
+                chunk_overlap=settings.CHUNK_OVERLAP
+            )
+        except Exception as e:
+            print(f"Embedding model not available, ranking chunks by word overlap: {e}")
+
+    print(f"Tokenizer: {'tiktoken ' + counter.encoding.name if counter.exact else 'estimate (4 chars/token)'}")
+    default_budget = settings.CONTEXT_MAX_TOKENS if args.budget is None else args.budget
+    budgets = {} if args.budget is not None else settings.CONTEXT_MAX_TOKENS_BY_FIELD
+    print(f"Budget: {default_budget} tokens, per field: {budgets}\n")
+    for pdf_path in sorted(CONTRACT_DIR.glob("*.pdf")):
+        pages = load_documents(str(pdf_path))
+        chunks = split_pages(pages, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+        for pdf_type in ("SOW", "MSA"):
+            requests = field_requests(pdf_type)
+            if db_manager is not None:
+                with db_manager.document_collection() as collection_name:
+                    db_manager.insert_data(db_manager.process_chunks(chunks), collection_name)
+                    retrieved = db_manager.retrieve_similar_content_batch(
+                        [(query, k) for _, query, k in requests], collection_name=collection_name
+                    )
+            else:
+                retrieved = lexical_retriever(chunks)([(query, k) for _, query, k in requests])
+
+            before, after = {}, {}
+            prompts = len(requests)
+            for (field, query, _), hits in zip(requests, retrieved):
+                budget = budgets.get(field, default_budget)
+                for totals, context in (
+                    (before, convert_list_to_xml(hits)),
+                    (after, pack_context(hits, budget, counter)),
+                ):
+                    prompt = settings.PROMPT_TEMPLATE.format(
+                        required_field=field, points_to_remember="", query=query, similar_content=context
+                    )
+                    totals[field] = totals.get(field, 0) + counter.count(prompt)
+
+            average_before = sum(before.values()) / len(before)
+            average_after = sum(after.values()) / len(after)
+            print(f"{pdf_path.name} ({len(pages)} pages, {len(chunks)} chunks), {pdf_type}, {len(before)} fields: "
+                  f"{average_before:.0f} -> {average_after:.0f} prompt tokens per field "
+                  f"({100 * (1 - average_after / average_before):.0f}% fewer; "
+                  f"{sum(before.values()) / prompts:.0f} -> {sum(after.values()) / prompts:.0f} per prompt, {prompts} prompts)")
+
+
+if __name__ == "__main__":
+    main()
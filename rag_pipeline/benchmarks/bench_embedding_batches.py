@@ -0,0 +1,111 @@
+# FILE: bench_embedding_batches.py
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import torch
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from app.core.config import settings
+from app.database.db_manager import DatabaseManager
+from app.utils.utilities import load_documents
+
+PDF_PATH = current_dir.parent / "tests" / "contract_files" / "WMGTS.pdf"
+TARGET_PAGES = 100
+
+
+def load_pages(pdf_path: str, target_pages: int) -> list:
+    """
+    Loads the contract and repeats its pages until it has `target_pages` pages.
+    """
+    pages = load_documents(pdf_path)
+    return [
+        {"page_number": i + 1, "text": pages[i % len(pages)]["text"]}
+        for i in range(target_pages)
+    ]
+
+
+def split_pages(db_manager: DatabaseManager, pages: list) -> list:
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=db_manager.chunk_size,
+        chunk_overlap=db_manager.chunk_overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    return [(page["page_number"], text_splitter.split_text(page["text"])) for page in pages]
+
+
+def encode_per_page(db_manager: DatabaseManager, page_chunks: list) -> list:
+    """
+    Previous behaviour: every page is encoded on its own, in batches of its 1-3 chunks.
+    """
+    data_list = []
+    for page_number, chunked_texts in page_chunks:
+        for i in range(0, len(chunked_texts), db_manager.inference_batch_size):
+            batch = chunked_texts[i:i + db_manager.inference_batch_size]
+            for text, embedding in zip(batch, db_manager.encode_text(batch)):
+                data_list.append({"text": text, "text_embedding": embedding.tolist(), "page_number": page_number})
+    return data_list
+
+
+def encode_bucketed(db_manager: DatabaseManager, page_chunks: list) -> list:
+    """
+    New behaviour: chunks of all pages are length-sorted and encoded in full batches.
+    """
+    return db_manager.process_chunks([
+        (text, page_number) for page_number, chunked_texts in page_chunks for text in chunked_texts
+    ])
+
+
+def main():
+    """
+    Compares CPU embedding throughput (chunks/sec) of per-page and cross-page bucketed batches.
+    """
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else str(PDF_PATH)
+    torch.set_grad_enabled(False)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_manager = DatabaseManager(
+            model_name=settings.EMBEDDING_MODEL_NAME,
+            milvus_uri=os.path.join(tmp_dir, "bench_milvus.db"),
+            collection_name="bench_collection",
+            dimension=settings.DIMENSION,
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP
+        )
+        page_chunks = split_pages(db_manager, load_pages(pdf_path, TARGET_PAGES))
+        chunk_count = sum(len(chunked_texts) for _, chunked_texts in page_chunks)
+
+        # Warm up the model so neither run pays for lazy initialization
+        db_manager.encode_text([text for _, chunked_texts in page_chunks[:2] for text in chunked_texts])
+
+        start = time.perf_counter()
+        per_page = encode_per_page(db_manager, page_chunks)
+        per_page_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bucketed = encode_bucketed(db_manager, page_chunks)
+        bucketed_time = time.perf_counter() - start
+
+    max_diff = max(
+        max(abs(a - b) for a, b in zip(old["text_embedding"], new["text_embedding"]))
+        for old, new in zip(per_page, bucketed)
+    )
+    same_pages = [item["page_number"] for item in per_page] == [item["page_number"] for item in bucketed]
+
+    print(f"\nDocument: {pdf_path} repeated to {TARGET_PAGES} pages, {chunk_count} chunks, "
+          f"batch size {db_manager.inference_batch_size}, torch threads {torch.get_num_threads()}")
+    print(f"Per-page batches: {per_page_time:.2f}s ({chunk_count / per_page_time:.1f} chunks/sec)")
+    print(f"Bucketed batches: {bucketed_time:.2f}s ({chunk_count / bucketed_time:.1f} chunks/sec)")
+    print(f"Speedup: {per_page_time / bucketed_time:.2f}x")
+    print(f"Same chunk order and page numbers: {same_pages}, max embedding difference: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# FILE: bench_extraction_modes.py
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.core.config import settings
+from app.schemas.extraction import INSURANCE_FIELDS
+from app.utils import extract_fields
+from app.utils.extract_fields import FIELD_FORMATS, CascadeStats, ExtractField, ExtractionStats
+from shared.llm_gateway import LLMGateway, Provider
+from shared.rate_limit import estimate_tokens
+
+CONTEXT = (
+    "<Context>\n  <Chunk1>\n    <Text>\n      This Statement of Work No. SOW-2024-017 is effective from "
+    "1 April 2024 until 31 March 2025 between Acme Corp and the Supplier. Fees are USD 120,000, "
+    "payable within 45 days of invoice, exclusive of GST.\n    </Text>\n    <PageNumber>1</PageNumber>\n"
+    "  </Chunk1>\n</Context>"
+)
+
+
+class StubLLM:
+    """
+    Behaviour of the stub chat completions server: latency of time-to-first-token plus a fixed
+    time per output token, a reasoning preamble of random length in the reasoning mode, and a
+    share of malformed answers per mode. Cascade (cheap-model) requests get a confidence, and a
+    share of them a value of the wrong format or a medium confidence.
+    """
+    def __init__(self, args, ttft_ms=None, per_token_ms=None):
+        self.args = args
+        self.ttft_ms = args.ttft_ms if ttft_ms is None else ttft_ms
+        self.per_token_ms = args.per_token_ms if per_token_ms is None else per_token_ms
+        self.rng = random.Random(args.seed)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def value(field: str, malformed: bool = False) -> str:
+        rule = FIELD_FORMATS.get(field)
+        if rule is None:
+            return f"{field} value"
+        if rule.kind == "date":
+            return "1st April 2024" if malformed else "2024-04-01"
+        if rule.kind == "number":
+            return "forty-five" if malformed else "45"
+        return "Unclear" if malformed else rule.choices[0]
+
+    def answer(self, body: dict) -> str:
+        prompt = body["messages"][1]["content"]
+        field = re.search(r"Required Field: (\w+)", prompt).group(1)
+        if field == "insurance_required":
+            answer = {name: {"value": "null", "page_number": 0} for name in INSURANCE_FIELDS}
+            answer["type_of_insurance_required"]["value"] = []
+        else:
+            answer = {"value": self.value(field), "field_value_found": True, "page_number": 1}
+
+        with self.lock:
+            roll = self.rng.random()
+            steps = self.rng.randint(self.args.min_reasoning_tokens, self.args.max_reasoning_tokens)
+        schema_name = ((body.get("response_format") or {}).get("json_schema") or {}).get("name", "")
+        if schema_name.endswith("CascadeExtraction"):
+            answer["confidence"] = "high"
+            if roll < self.args.cheap_format_error_rate:
+                answer["value"] = self.value(field, malformed=True)
+            elif roll < self.args.cheap_format_error_rate + self.args.cheap_low_confidence_rate:
+                answer["confidence"] = "medium"
+            return json.dumps(answer)
+        if schema_name:
+            if roll < self.args.structured_failure_rate:
+                return json.dumps(answer)[:-12]  # Truncated output
+            return json.dumps(answer)
+
+        text = json.dumps(answer)
+        if roll < self.args.reasoning_failure_rate / 2:
+            text = text.replace('"', "'")  # Python-style quotes, as in the insurance example
+        elif roll < self.args.reasoning_failure_rate:
+            return "<steps>\n" + "the " * steps + "\n</steps>\n<extracted>\n" + text  # Missing closing tag
+        return "<steps>\n" + "the " * steps + "\n</steps>\n\n<extracted>\n" + text + "\n</extracted>"
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                content = stub.answer(body)
+                prompt_tokens = estimate_tokens("".join(message["content"] for message in body["messages"]))
+                completion_tokens = estimate_tokens(content)
+                time.sleep(stub.ttft_ms / 1000 + completion_tokens * stub.per_token_ms / 1000)
+
+                payload = json.dumps({
+                    "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def run_mode(mode: str, fields: list, workers: int) -> tuple:
+    extract_fields.extraction_stats = ExtractionStats()
+    extract_fields.cascade_stats = CascadeStats()
+    extractor = ExtractField(mode)
+    points = {**settings.SOW_POINTS_TO_REMEMBER, **settings.MSA_POINTS_TO_REMEMBER}
+    queries = {**settings.SOW_QUERY_FOR_EACH_FIELD, **settings.MSA_QUERY_FOR_EACH_FIELD}
+
+    def extract(field):
+        start = time.perf_counter()
+        result = extractor.extract_field_value(field, CONTEXT, queries.get(field, ""), points.get(field, ""))
+        return time.perf_counter() - start, result == extract_fields.DEFAULT_RESPONSE
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(extract, fields))
+    # The cascade mode's calls are split between the cheap model and the escalation mode
+    by_mode = extract_fields.extraction_stats.to_dict().values()
+    stats = {
+        "calls": sum(totals["calls"] for totals in by_mode),
+        "completion_tokens": sum(totals["completion_tokens"] for totals in by_mode),
+        "parse_failure_rate": sum(totals["parse_failures"] for totals in by_mode) / max(sum(totals["calls"] for totals in by_mode), 1),
+    }
+    return [latency for latency, _ in results], sum(failed for _, failed in results), stats
+
+
+def main():
+    """
+    Compares the reasoning, structured and cascade extraction modes against local stub LLM
+    servers (a second, faster one stands in for the cheap cascade model): output tokens, latency
+    per field and parse-failure rate, and for the cascade mode its escalation rate and latency
+    per field. The stubs' latency models and failure rates are parameters; the defaults assume
+    ~100 output tokens/s for the full model and ~300 for the cheap one.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the extraction modes against a stub LLM server.")
+    parser.add_argument("--rounds", type=int, default=10, help="Extractions of every SOW and MSA field per mode")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--per-token-ms", type=float, default=10)
+    parser.add_argument("--min-reasoning-tokens", type=int, default=120)
+    parser.add_argument("--max-reasoning-tokens", type=int, default=300)
+    parser.add_argument("--reasoning-failure-rate", type=float, default=0.08)
+    parser.add_argument("--structured-failure-rate", type=float, default=0.01)
+    parser.add_argument("--cheap-ttft-ms", type=float, default=150)
+    parser.add_argument("--cheap-per-token-ms", type=float, default=3)
+    parser.add_argument("--cheap-format-error-rate", type=float, default=0.05)
+    parser.add_argument("--cheap-low-confidence-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLM(args).handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cheap_server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLM(args, args.cheap_ttft_ms, args.cheap_per_token_ms).handler())
+    threading.Thread(target=cheap_server.serve_forever, daemon=True).start()
+
+    # Point the extractor at the stub, without caching or rate limiting
+    extract_fields.llm_gateway = LLMGateway([
+        Provider("stub", settings.LLM_MODEL, "stub", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+    ])
+    extract_fields.cascade_gateway = LLMGateway([
+        Provider("cheap-stub", "cheap-model", "stub", base_url=f"http://127.0.0.1:{cheap_server.server_port}/v1")
+    ])
+    extract_fields.llm_cache.enabled = False
+
+    fields = (settings.SOW_FIELDS_TO_EXTRACT + settings.MSA_FIELDS_TO_EXTRACT) * args.rounds
+    print(f"{len(fields)} extractions per mode, {args.workers} workers, "
+          f"stub: {args.ttft_ms:.0f}ms + {args.per_token_ms:.0f}ms/token, failure rates "
+          f"{args.reasoning_failure_rate:.0%} (reasoning) / {args.structured_failure_rate:.0%} (structured)\n")
+    for mode in ("reasoning", "structured", "cascade"):
+        latencies, failed, stats = run_mode(mode, fields, args.workers)
+        print(f"{mode:>10}: {stats['calls'] / len(fields):.2f} calls/field, "
+              f"{stats['completion_tokens'] / len(fields):.0f} output tokens/field, "
+              f"p50 {np.percentile(latencies, 50):.2f}s, p95 {np.percentile(latencies, 95):.2f}s, "
+              f"parse failures {stats['parse_failure_rate']:.1%} of calls, unanswered fields {failed}")
+
+    cascade = extract_fields.cascade_stats.to_dict()
+    print(f"\nCascade (escalating to {settings.CASCADE_ESCALATION_MODE}): {cascade['accepted']} cheap answers kept, "
+          f"{cascade['escalated']} escalated ({cascade['escalation_rate']:.1%})")
+    for field, totals in cascade["fields"].items():
+        rate = f"escalated {totals['escalation_rate']:>4.0%}" if totals["escalation_rate"] is not None else "full model only"
+        reasons = ", ".join(f"{reason} {count}" for reason, count in sorted(totals["escalation_reasons"].items()))
+        print(f"  {field:>32}: {rate:>15}, p50 {totals['latency']['p50']:.2f}s, "
+              f"p95 {totals['latency']['p95']:.2f}s{'  (' + reasons + ')' if reasons else ''}")
+    server.shutdown()
+    cheap_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
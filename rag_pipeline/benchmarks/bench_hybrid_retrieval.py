@@ -0,0 +1,130 @@
+# FILE: bench_hybrid_retrieval.py
+
+import re
+import sys
+import argparse
+from pathlib import Path
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.core.config import settings
+from app.database.chunking import split_pages
+from app.database.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.utils.util import TokenCounter, pack_context
+from app.utils.utilities import load_documents
+from bench_context_packing import lexical_retriever
+
+CONTRACT_DIR = current_dir.parent / "tests" / "contract_files"
+
+# Text that must reach the LLM for each field to be found, per contract in tests/contract_files
+# (fields whose value is not quoted verbatim in the contract are left out)
+EVIDENCE = {
+    "WMGTS.pdf": {
+        "client_company_name": "WM GLOBAL TECHNOLOGY SERVICES",
+        "currency": "INR",
+        "credit_period": "45 days",
+        "inclusive_or_exclusive_gst": "exclusive of GST",
+        "sow_value": "1,26,71,620",
+        "sow_no": "CW3950536",
+        "type_of_billing": "per Transaction",
+        "po_number": "4500383264",
+        "amendment_no": "CW3967194",
+    },
+}
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).lower()
+
+
+def dense_retriever(chunks: list):
+    """
+    Returns a function retrieving vector store hits for (query, limit) pairs: with the embedding
+    model when it can be loaded, otherwise with the word-count ranking of bench_context_packing.
+    """
+    try:
+        from app.database.db_manager import DatabaseManager
+        db_manager = DatabaseManager(
+            model_name=settings.EMBEDDING_MODEL_NAME,
+            milvus_uri=settings.MILVUS_URI,
+            collection_name=settings.MILVUS_COLLECTION_NAME,
+            dimension=settings.DIMENSION,
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            retrieval_mode="dense"
+        )
+    except Exception as e:
+        print(f"Embedding model not available, dense ranking stood in for by word overlap: {e}\n")
+        retrieve = lexical_retriever(chunks)
+        return lambda requests: [[{"entity": hit} for hit in hits] for hits in retrieve(requests)]
+
+    def retrieve(requests):
+        with db_manager.document_collection() as collection_name:
+            db_manager.insert_data(db_manager.process_chunks(chunks), collection_name)
+            return [[{"entity": hit} for hit in hits] for hits in db_manager.retrieve_similar_content_batch(requests, collection_name)]
+    return retrieve
+
+
+def main():
+    """
+    Counts the LLM calls per field with dense, hybrid and lexical retrieval, and with the
+    configured per-field modes (RETRIEVAL_MODE / RETRIEVAL_MODE_BY_FIELD).
+
+    Each field tries its SOW_QUERIES in order, as `extract_field` does. A stand-in for the LLM
+    finds the value when the field's evidence text is in the packed context (CONTEXT_MAX_TOKENS,
+    or the budgets given); every query after the first is a fallback call.
+    """
+    parser = argparse.ArgumentParser(description="Fallback LLM calls with dense, lexical and hybrid retrieval.")
+    parser.add_argument("--budgets", default=None, help="Comma-separated context budgets in tokens (default: CONTEXT_MAX_TOKENS)")
+    args = parser.parse_args()
+    budgets = [int(budget) for budget in args.budgets.split(",")] if args.budgets else [settings.CONTEXT_MAX_TOKENS]
+    counter = TokenCounter(settings.LLM_MODEL)
+
+    configurations = {
+        "dense": lambda field: "dense",
+        "hybrid": lambda field: "hybrid",
+        "lexical": lambda field: "lexical",
+        "configured": lambda field: settings.RETRIEVAL_MODE_BY_FIELD.get(field, settings.RETRIEVAL_MODE),
+    }
+    for pdf_path in sorted(CONTRACT_DIR.glob("*.pdf")):
+        evidence = EVIDENCE.get(pdf_path.name)
+        if not evidence:
+            continue
+        pages = load_documents(str(pdf_path))
+        chunks = split_pages(pages, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+        index = BM25Index([{"text": text, "page_number": page, "chunk_start": start} for text, page, start in chunks])
+
+        # Every ranking, computed once: field -> query -> mode -> hits
+        requests = [(field, query) for field in evidence for query in settings.SOW_QUERIES[field]]
+        dense = dense_retriever(chunks)([(query, settings.HYBRID_CANDIDATES) for _, query in requests])
+        lexical = index.search([query for _, query in requests], settings.HYBRID_CANDIDATES)
+        rankings = {}
+        for (field, query), dense_hits, lexical_hits in zip(requests, dense, lexical):
+            rankings.setdefault(field, {})[query] = {
+                "dense": dense_hits,
+                "lexical": lexical_hits,
+                "hybrid": reciprocal_rank_fusion([dense_hits, lexical_hits], k=settings.RRF_K),
+            }
+
+        print(f"{pdf_path.name}: {len(chunks)} chunks, {len(evidence)} fields, {len(requests)} queries")
+        for budget in budgets:
+            print(f"\n  context budget {budget} tokens")
+            for name, mode_of in configurations.items():
+                calls, first_query_hits, not_found = 0, 0, []
+                for field, value in evidence.items():
+                    for attempt, query in enumerate(settings.SOW_QUERIES[field], start=1):
+                        hits = [hit["entity"] for hit in rankings[field][query][mode_of(field)][:5]]
+                        if normalize(value) in normalize(pack_context(hits, budget, counter)):
+                            break
+                    else:
+                        not_found.append(field)
+                    calls += attempt
+                    first_query_hits += int(attempt == 1 and field not in not_found)
+                print(f"  {name:>10}: {calls} LLM calls, {calls - len(evidence)} fallback, "
+                      f"first query found {first_query_hits}/{len(evidence)}"
+                      + (f", not found: {', '.join(not_found)}" if not_found else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# FILE: bench_llm_gateway.py
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent.parent))
+
+from shared.llm_gateway import LLMGateway, Provider
+
+ANSWER = json.dumps({"value": "SOW-2024-017", "field_value_found": True, "page_number": 1})
+
+
+class Scenario:
+    """
+    Shared request counter: the primary stub is degraded while the benchmark is between the
+    `degrade_from` and `degrade_to` shares of its requests.
+    """
+    def __init__(self, args):
+        self.args = args
+        self.issued = 0
+        self.lock = threading.Lock()
+
+    def next_request(self) -> None:
+        with self.lock:
+            self.issued += 1
+
+    def degraded(self) -> bool:
+        progress = self.issued / self.args.requests
+        return self.args.degrade_from <= progress < self.args.degrade_to
+
+
+class StubProvider:
+    """
+    Stub chat completions server with a latency (jittered +/-20%) and an error rate, both of
+    which change while the scenario marks it degraded.
+    """
+    def __init__(self, latency_ms, error_rate, scenario=None, degraded_latency_ms=None, degraded_error_rate=None, seed=0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.scenario = scenario
+        self.degraded_latency_ms = degraded_latency_ms
+        self.degraded_error_rate = degraded_error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def behaviour(self) -> tuple:
+        degraded = self.scenario is not None and self.scenario.degraded()
+        latency_ms = self.degraded_latency_ms if degraded else self.latency_ms
+        error_rate = self.degraded_error_rate if degraded else self.error_rate
+        with self.lock:
+            return latency_ms * self.rng.uniform(0.8, 1.2) / 1000, self.rng.random() < error_rate
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                latency, fail = stub.behaviour()
+                time.sleep(latency)
+                if fail:
+                    status, payload = 503, json.dumps({"error": {"message": "overloaded", "type": "server_error"}}).encode()
+                else:
+                    status, payload = 200, json.dumps({
+                        "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+                        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": ANSWER}}],
+                        "usage": {"prompt_tokens": 500, "completion_tokens": 25, "total_tokens": 525},
+                    }).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def serve(stub: StubProvider) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(gateway: LLMGateway, scenario: Scenario, args) -> tuple:
+    messages = [{"role": "system", "content": "Extract the field."}, {"role": "user", "content": "Required Field: sow_no"}]
+
+    def request(_):
+        scenario.next_request()
+        start = time.perf_counter()
+        try:
+            response = gateway.complete(messages, field="sow_no")
+            return time.perf_counter() - start, response.model
+        except Exception:
+            return time.perf_counter() - start, None
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(request, range(args.requests)))
+    return [latency for latency, _ in results], [model for _, model in results]
+
+
+def main():
+    """
+    Compares a single provider with the gateway over two stub providers while the primary one
+    degrades mid-run (slower and failing part of its requests): latency percentiles, failed
+    requests and where the gateway sent its traffic.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the LLM provider gateway against stub servers.")
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--primary-ms", type=float, default=400, help="Primary latency while healthy")
+    parser.add_argument("--primary-error-rate", type=float, default=0.01)
+    parser.add_argument("--degraded-ms", type=float, default=2500, help="Primary latency while degraded")
+    parser.add_argument("--degraded-error-rate", type=float, default=0.3)
+    parser.add_argument("--degrade-from", type=float, default=0.25, help="Share of the run where degradation starts")
+    parser.add_argument("--degrade-to", type=float, default=0.6, help="Share of the run where degradation ends")
+    parser.add_argument("--secondary-ms", type=float, default=600, help="Secondary latency (never degrades)")
+    parser.add_argument("--secondary-error-rate", type=float, default=0.01)
+    parser.add_argument("--window-seconds", type=float, default=10, help="Gateway health window (short for the benchmark)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.workers} workers; primary {args.primary_ms:.0f}ms "
+          f"({args.primary_error_rate:.0%} errors), degraded to {args.degraded_ms:.0f}ms ({args.degraded_error_rate:.0%} errors) "
+          f"for {args.degrade_from:.0%}-{args.degrade_to:.0%} of the run; secondary {args.secondary_ms:.0f}ms "
+          f"({args.secondary_error_rate:.0%} errors)\n")
+
+    setups = {
+        # One provider: the OpenAI client's usual retries are its only defence
+        "single provider": lambda primary, secondary: LLMGateway([
+            Provider("primary", "primary-model", "stub", base_url=primary, max_retries=2),
+        ]),
+        "gateway": lambda primary, secondary: LLMGateway([
+            Provider("primary", "primary-model", "stub", base_url=primary),
+            Provider("secondary", "secondary-model", "stub", base_url=secondary),
+        ], window_seconds=args.window_seconds, cooldown_seconds=args.window_seconds / 2),
+    }
+    for name, setup in setups.items():
+        scenario = Scenario(args)
+        primary = serve(StubProvider(args.primary_ms, args.primary_error_rate, scenario, args.degraded_ms,
+                                     args.degraded_error_rate, seed=args.seed))
+        secondary = serve(StubProvider(args.secondary_ms, args.secondary_error_rate, seed=args.seed + 1))
+        gateway = setup(f"http://127.0.0.1:{primary.server_port}/v1", f"http://127.0.0.1:{secondary.server_port}/v1")
+
+        start = time.perf_counter()
+        latencies, models = run(gateway, scenario, args)
+        elapsed = time.perf_counter() - start
+        failed = models.count(None)
+        stats = gateway.stats()
+        print(f"{name:>15}: p50 {np.percentile(latencies, 50):.2f}s, p95 {np.percentile(latencies, 95):.2f}s, "
+              f"p99 {np.percentile(latencies, 99):.2f}s, failed {failed}/{len(models)} ({failed / len(models):.1%}), "
+              f"{elapsed:.1f}s total, failovers {stats['failovers']}, answered by "
+              + ", ".join(f"{model}: {models.count(model)}" for model in sorted({m for m in models if m})))
+        primary.shutdown()
+        secondary.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# FILE: bench_vector_store.py
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.database.vector_store import MilvusVectorStore, NumpyVectorStore
+
+DIMENSION = 512
+CHUNK_COUNTS = (20, 50, 200)
+QUERY_COUNT = 40  # Roughly the retrievals of one SOW
+TOP_K = 5
+ROUNDS = 5
+
+
+def random_unit_vectors(rng: np.random.Generator, count: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run_document(store, chunks: list, queries: list) -> list:
+    """
+    One document's lifecycle, as in DocumentProcessor.process: setup, insert, search, teardown.
+    """
+    collection_name = "bench_collection"
+    if store.has_collection(collection_name):
+        store.drop_collection(collection_name)
+    store.create_collection(collection_name, DIMENSION)
+    store.insert(collection_name, chunks)
+    results = store.search(collection_name, queries, TOP_K, ["text", "page_number"])
+    store.drop_collection(collection_name)
+    return [[hit["entity"]["text"] for hit in hits] for hits in results]
+
+
+def time_store(store, chunks: list, queries: list) -> tuple:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        results = run_document(store, chunks, queries)
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    """
+    Compares setup + insert + search + teardown time of the in-memory and Milvus Lite stores.
+    """
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stores = {"memory": NumpyVectorStore()}
+        try:
+            stores["milvus"] = MilvusVectorStore(os.path.join(tmp_dir, "bench_milvus.db"))
+        except ImportError as e:
+            print(f"Milvus Lite not available, timing the in-memory store only: {e}")
+
+        print(f"\n{QUERY_COUNT} queries, top {TOP_K}, best of {ROUNDS} rounds")
+        for chunk_count in CHUNK_COUNTS:
+            vectors = random_unit_vectors(rng, chunk_count)
+            chunks = [
+                {"text": f"chunk {i}", "text_embedding": vector.tolist(), "page_number": i // 2 + 1}
+                for i, vector in enumerate(vectors)
+            ]
+            queries = random_unit_vectors(rng, QUERY_COUNT).tolist()
+
+            timings = {name: time_store(store, chunks, queries) for name, store in stores.items()}
+            line = ", ".join(f"{name}: {elapsed * 1000:.2f}ms" for name, (elapsed, _) in timings.items())
+            if "milvus" in timings:
+                same = timings["memory"][1] == timings["milvus"][1]
+                line += f" ({timings['milvus'][0] / timings['memory'][0]:.0f}x), same hits: {same}"
+            print(f"{chunk_count:>4} chunks - {line}")
+
+
+if __name__ == "__main__":
+    main()
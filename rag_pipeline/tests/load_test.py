@@ -0,0 +1,69 @@
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.utils.document_processor import DocumentProcessor
+
+def main():
+    """
+    Load test for concurrent document processing.
+
+    Processes the test contract once to get a reference result, then N copies one after another
+    and N copies in parallel threads through one shared DocumentProcessor, as concurrent uploads
+    do. Every parallel result must equal the reference (each document works in its own vector
+    store collection), and the parallel run should finish well before the sequential one.
+
+    The result cache is bypassed so every copy is really processed. With the LLM response cache
+    enabled (the default), LLM answers are identical across runs, so results can be compared
+    exactly; run once to populate it, then again (optionally with LLM_CACHE_OFFLINE=true).
+    """
+    parser = argparse.ArgumentParser(description="Process N copies of a contract sequentially and in parallel.")
+    parser.add_argument("--documents", type=int, default=8, help="Copies of the contract to process per run")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel threads in the concurrent run")
+    parser.add_argument("--pdf", default=os.path.join(current_dir, "contract_files", "WMGTS.pdf"))
+    parser.add_argument("--pdf-type", default="SOW")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.pdf):
+        print(f"Error: The file '{args.pdf}' does not exist.")
+        return 1
+
+    processor = DocumentProcessor()
+
+    def process(_):
+        return processor.process(args.pdf_type, args.pdf, bypass_cache=True)
+
+    reference = process(0)
+
+    start = time.perf_counter()
+    sequential_results = [process(i) for i in range(args.documents)]
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        parallel_results = list(executor.map(process, range(args.documents)))
+    parallel_time = time.perf_counter() - start
+
+    mismatches = sum(result != reference for result in sequential_results + parallel_results)
+    leftover = [
+        name for name in getattr(processor.db_manager.vector_store, "_collections", {})
+        if name.startswith(processor.db_manager.collection_name)
+    ]
+
+    print(f"\n{args.documents} documents, {args.workers} workers")
+    print(f"Sequential: {sequential_time:.1f}s ({args.documents / sequential_time:.2f} docs/sec)")
+    print(f"Parallel:   {parallel_time:.1f}s ({args.documents / parallel_time:.2f} docs/sec), "
+          f"{sequential_time / parallel_time:.2f}x")
+    print(f"Results different from the reference: {mismatches}")
+    print(f"Collections left behind: {len(leftover)}")
+    return 1 if mismatches or leftover else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
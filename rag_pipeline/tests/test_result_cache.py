@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+current_dir = Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.core.config import settings
+from app.utils.result_cache import extraction_config_version
+
+# A changed value for every setting the result cache version must follow
+TOGGLED_SETTINGS = {
+    "EXTRACTION_MODE": "structured",
+    "STRUCTURED_PROMPT_TEMPLATE": settings.STRUCTURED_PROMPT_TEMPLATE + " ",
+    "STRUCTURED_REPAIR_PROMPT": settings.STRUCTURED_REPAIR_PROMPT + " ",
+    "RERANKER_MODEL_NAME": settings.RERANKER_MODEL_NAME + "-v2",
+    "RERANK_ENABLED": not settings.RERANK_ENABLED,
+    "RERANK_CANDIDATES": settings.RERANK_CANDIDATES + 1,
+    "RERANK_TOP_N": settings.RERANK_TOP_N + 1,
+    "RERANK_MIN_SCORE": 0.5,
+    "CONTEXT_MAX_TOKENS": 1000,
+    "CONTEXT_MAX_TOKENS_BY_FIELD": {"insurance_required": 4000},
+    "FIELD_GROUPS_ENABLED": not settings.FIELD_GROUPS_ENABLED,
+    "LLM_PROVIDERS": settings.LLM_PROVIDERS[::-1],
+    "LLM_FIELD_ROUTES": {"sow_value": ["openai"]},
+    "CASCADE_PROVIDERS": settings.CASCADE_PROVIDERS[:1],
+    "CASCADE_MIN_CONFIDENCE": "medium",
+    "CASCADE_ESCALATE_NOT_FOUND": not settings.CASCADE_ESCALATE_NOT_FOUND,
+    "CASCADE_ESCALATION_MODE": "structured",
+}
+
+# Settings that do not change extraction results
+UNRELATED_SETTINGS = {
+    "JOB_WORKERS": settings.JOB_WORKERS + 1,
+    "LLM_CACHE_MEMORY_ENTRIES": settings.LLM_CACHE_MEMORY_ENTRIES + 1,
+}
+
+
+def test_version_changes_with_each_setting():
+    version = extraction_config_version(settings)
+    for name, value in TOGGLED_SETTINGS.items():
+        assert getattr(settings, name) != value, name
+        toggled = settings.model_copy(update={name: value})
+        assert extraction_config_version(toggled) != version, f"{name} does not change the result cache version"
+
+
+def test_version_ignores_unrelated_settings():
+    version = extraction_config_version(settings)
+    for name, value in UNRELATED_SETTINGS.items():
+        toggled = settings.model_copy(update={name: value})
+        assert extraction_config_version(toggled) == version, f"{name} changes the result cache version"
+
+
+def main():
+    """
+    Checks that toggling any extraction setting invalidates cached results, and that
+    unrelated settings do not.
+    """
+    test_version_changes_with_each_setting()
+    test_version_ignores_unrelated_settings()
+    print(f"Result cache version follows {len(TOGGLED_SETTINGS)} settings.")
+
+
+if __name__ == "__main__":
+    main()
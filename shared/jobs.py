@@ -0,0 +1,276 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.declarative import declarative_base
+
+# Base for the job table
+JobBase = declarative_base()
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job(JobBase):
+    """
+    Database model for an asynchronous document processing job.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)
+    pdf_type = Column(String)
+    file_name = Column(String)
+    file_location = Column(String)
+    options = Column(Text)
+    status = Column(String, index=True, default=QUEUED)
+    result = Column(Text)
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    worker = Column(String)
+    created_at = Column(DateTime, index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "pdf_type": self.pdf_type,
+            "file_name": self.file_name,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobStore:
+    """
+    Persistent job table in SQLite shared by the API process and the worker processes.
+
+    Jobs move from queued -> running -> done/failed. Workers claim jobs with a conditional
+    update, so several worker processes (or machines sharing the file) never run the same job.
+
+    Attributes:
+        database_url (str): SQLAlchemy URL of the job database.
+    """
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self.engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        JobBase.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    def submit(
+        self,
+        pdf_type: str,
+        file_name: str,
+        file_location: str,
+        job_id: Optional[str] = None,
+        options: Optional[dict] = None
+    ) -> str:
+        """
+        Records a new queued job and returns its id. `options` are passed to the handler as keyword arguments.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        db_session = self.SessionLocal()
+        try:
+            db_session.add(Job(
+                id=job_id,
+                pdf_type=pdf_type,
+                file_name=file_name,
+                file_location=file_location,
+                options=json.dumps(options or {}),
+                status=QUEUED,
+                created_at=datetime.now()
+            ))
+            db_session.commit()
+        finally:
+            db_session.close()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        db_session = self.SessionLocal()
+        try:
+            return db_session.get(Job, job_id)
+        finally:
+            db_session.close()
+
+    def result(self, job: Job):
+        """
+        Returns the decoded result of a finished job.
+        """
+        return json.loads(job.result) if job.result else None
+
+    def claim_next(self, worker: str) -> Optional[Job]:
+        """
+        Atomically moves the oldest queued job to running and returns it, or None if the queue is empty.
+        """
+        db_session = self.SessionLocal()
+        try:
+            while True:
+                job = (
+                    db_session.query(Job)
+                    .filter(Job.status == QUEUED)
+                    .order_by(Job.created_at)
+                    .first()
+                )
+                if job is None:
+                    return None
+
+                claimed = db_session.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == QUEUED)
+                    .values(status=RUNNING, worker=worker, started_at=datetime.now(), attempts=Job.attempts + 1)
+                )
+                db_session.commit()
+                if claimed.rowcount == 1:
+                    return db_session.get(Job, job.id, populate_existing=True)
+                # Another worker got there first, try the next one
+        finally:
+            db_session.close()
+
+    def complete(self, job_id: str, result) -> None:
+        self._finish(job_id, status=DONE, result=json.dumps(result))
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, status=FAILED, error=error)
+
+    def _finish(self, job_id: str, **values) -> None:
+        db_session = self.SessionLocal()
+        try:
+            db_session.execute(
+                update(Job).where(Job.id == job_id).values(finished_at=datetime.now(), **values)
+            )
+            db_session.commit()
+        finally:
+            db_session.close()
+
+    def requeue_running(self) -> int:
+        """
+        Puts jobs left running by workers that died (e.g. on restart) back in the queue.
+        """
+        db_session = self.SessionLocal()
+        try:
+            requeued = db_session.execute(
+                update(Job).where(Job.status == RUNNING).values(status=QUEUED, worker=None, started_at=None)
+            )
+            db_session.commit()
+            return requeued.rowcount
+        finally:
+            db_session.close()
+
+
+def load_handler(handler_path: str) -> Callable:
+    """
+    Imports a handler given as 'package.module:function'.
+    """
+    module_name, function_name = handler_path.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def worker_loop(database_url: str, handler_path: str, poll_interval: float = 1.0) -> None:
+    """
+    Runs in a worker process: claims queued jobs one at a time and runs the handler on them.
+
+    The handler is called as handler(pdf_type, file_location, **options) and must return a
+    JSON serializable result, which is stored on the job.
+    """
+    store = JobStore(database_url)
+    handler = load_handler(handler_path)
+    worker = f"{os.uname().nodename}:{os.getpid()}"
+    print(f"Job worker {worker} started for '{handler_path}'")
+
+    while True:
+        job = store.claim_next(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Worker {worker} processing job {job.id} ({job.file_name})")
+        try:
+            options = json.loads(job.options) if job.options else {}
+            result = handler(job.pdf_type, job.file_location, **options)
+            store.complete(job.id, result)
+            print(f"Job {job.id} completed")
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            store.fail(job.id, str(e))
+
+
+class WorkerPool:
+    """
+    A configurable pool of worker processes draining a JobStore.
+
+    Workers are started with the 'spawn' method so they get a fresh interpreter (no forked
+    model or event loop state) and load their own copy of the handler's dependencies.
+
+    Attributes:
+        workers (int): Number of worker processes; 0 means jobs are only run by external workers.
+    """
+    def __init__(self, database_url: str, handler_path: str, workers: int = 1, poll_interval: float = 1.0):
+        self.database_url = database_url
+        self.handler_path = handler_path
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        for _ in range(self.workers):
+            process = context.Process(
+                target=worker_loop,
+                args=(self.database_url, self.handler_path, self.poll_interval),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout=10)
+        self.processes = []
+
+    def join(self) -> None:
+        for process in self.processes:
+            process.join()
+
+
+def run_workers(database_url: str, handler_path: str, workers: int, poll_interval: float = 1.0) -> None:
+    """
+    Runs a standalone pool of workers in the foreground, independently of the API process.
+    """
+    store = JobStore(database_url)
+    requeued = store.requeue_running()
+    if requeued:
+        print(f"Requeued {requeued} interrupted job(s)")
+
+    pool = WorkerPool(database_url, handler_path, workers=workers, poll_interval=poll_interval)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+def parse_worker_args(default_database_url: str, default_workers: int, default_poll_interval: float) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run document processing job workers.")
+    parser.add_argument("--database-url", default=default_database_url, help="SQLAlchemy URL of the job database.")
+    parser.add_argument("--workers", type=int, default=default_workers, help="Number of worker processes.")
+    parser.add_argument("--poll-interval", type=float, default=default_poll_interval, help="Seconds between queue polls.")
+    return parser.parse_args()
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, Float, Integer, String, Text, create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.declarative import declarative_base
+
+# Base for the on-disk response cache
+LLMCacheBase = declarative_base()
+
+
+class LLMCacheEntry(LLMCacheBase):
+    """
+    Database model for a cached LLM response.
+    """
+    __tablename__ = "llm_cache"
+
+    key = Column(String, primary_key=True)
+    model = Column(String)
+    content = Column(Text)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    created_at = Column(Float)
+    last_access = Column(Float, index=True)
+    expires_at = Column(Float, index=True)
+
+
+class CachedResponse:
+    """
+    A cached completion: its text and the token usage of the original request.
+    """
+    def __init__(self, content: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMCacheMiss(Exception):
+    """
+    Raised in offline mode when a prompt is not in the cache.
+    """
+
+
+class MemoryTier:
+    """
+    In-process LRU tier with a maximum number of entries and a TTL.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            response, expires_at = item
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """
+    On-disk SQLite tier, bounded by entry count (least recently used rows are evicted) and TTL.
+    """
+    def __init__(self, database_url: str, max_entries: int = 50000, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.engine = create_engine(database_url, connect_args={"check_same_thread": False, "timeout": 30})
+        LLMCacheBase.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        db_session = self.SessionLocal()
+        try:
+            entry = db_session.get(LLMCacheEntry, key)
+            if entry is None:
+                return None
+            now = time.time()
+            if entry.expires_at is not None and entry.expires_at < now:
+                db_session.delete(entry)
+                db_session.commit()
+                return None
+            entry.last_access = now
+            db_session.commit()
+            return CachedResponse(entry.content, entry.prompt_tokens or 0, entry.completion_tokens or 0)
+        finally:
+            db_session.close()
+
+    def set(self, key: str, model: str, response: CachedResponse) -> None:
+        now = time.time()
+        db_session = self.SessionLocal()
+        try:
+            db_session.merge(LLMCacheEntry(
+                key=key,
+                model=model,
+                content=response.content,
+                prompt_tokens=response.prompt_tokens,
+                completion_tokens=response.completion_tokens,
+                created_at=now,
+                last_access=now,
+                expires_at=now + self.ttl_seconds if self.ttl_seconds else None
+            ))
+            db_session.commit()
+            self._evict(db_session, now)
+        finally:
+            db_session.close()
+
+    def _evict(self, db_session, now: float) -> None:
+        db_session.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at < now).delete(synchronize_session=False)
+        overflow = db_session.query(func.count(LLMCacheEntry.key)).scalar() - self.max_entries
+        if overflow > 0:
+            oldest = (
+                db_session.query(LLMCacheEntry.key)
+                .order_by(LLMCacheEntry.last_access)
+                .limit(overflow)
+                .subquery()
+            )
+            db_session.query(LLMCacheEntry).filter(LLMCacheEntry.key.in_(oldest.select())).delete(synchronize_session=False)
+        db_session.commit()
+
+    def __len__(self) -> int:
+        db_session = self.SessionLocal()
+        try:
+            return db_session.query(func.count(LLMCacheEntry.key)).scalar()
+        finally:
+            db_session.close()
+
+
+class LLMCache:
+    """
+    Response cache for deterministic LLM prompts, shared by both pipelines.
+
+    Keys are a SHA-256 of the model (the gateway's fingerprint of the providers and models a
+    request can be routed to) and the rendered request (messages plus any extra request
+    options such as response_format). Lookups go to the in-process LRU tier first,
+    then the SQLite tier; disk hits are promoted to memory. Only responses the caller
+    accepted are stored (see `set`), so a malformed answer is never replayed.
+
+    In offline mode a miss raises LLMCacheMiss instead of letting the caller reach the
+    network, so test runs can be replayed entirely from a populated cache.
+
+    Attributes:
+        enabled (bool): When False, every lookup misses and nothing is stored.
+        offline (bool): Raise LLMCacheMiss on a miss.
+    """
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        memory_entries: int = 1024,
+        disk_entries: int = 50000,
+        ttl_seconds: Optional[float] = None,
+        enabled: bool = True,
+        offline: bool = False
+    ):
+        self.enabled = enabled
+        self.offline = offline
+        self.memory = MemoryTier(memory_entries, ttl_seconds)
+        self.disk = SQLiteTier(database_url, disk_entries, ttl_seconds) if database_url and enabled else None
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.saved_prompt_tokens = 0
+        self.saved_completion_tokens = 0
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], **request_options) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "options": request_options},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Returns the cached response for a key, or None (raises LLMCacheMiss in offline mode).
+        """
+        if not self.enabled:
+            if self.offline:
+                raise LLMCacheMiss(key)
+            return None
+
+        response = self.memory.get(key)
+        tier = "memory"
+        if response is None and self.disk is not None:
+            response = self.disk.get(key)
+            tier = "disk"
+            if response is not None:
+                self.memory.set(key, response)
+
+        with self._lock:
+            self.lookups += 1
+            if response is not None:
+                if tier == "memory":
+                    self.memory_hits += 1
+                else:
+                    self.disk_hits += 1
+                self.saved_prompt_tokens += response.prompt_tokens
+                self.saved_completion_tokens += response.completion_tokens
+
+        if response is None and self.offline:
+            raise LLMCacheMiss(key)
+        return response
+
+    def set(self, key: str, model: str, content: str, usage=None) -> None:
+        """
+        Stores an accepted response. `usage` is the OpenAI usage object of the request, if any.
+        """
+        if not self.enabled or content is None:
+            return
+        response = CachedResponse(
+            content,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0
+        )
+        self.memory.set(key, response)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, model, response)
+            except Exception as e:
+                print(f"Could not write LLM response to the disk cache: {e}")
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "enabled": self.enabled,
+            "offline": self.offline,
+            "lookups": self.lookups,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.lookups - hits,
+            "hit_rate": hits / self.lookups if self.lookups else 0.0,
+            "saved_prompt_tokens": self.saved_prompt_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
@@ -0,0 +1,344 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+
+from shared.rate_limit import RateLimiter, estimate_tokens
+
+
+class Provider:
+    """
+    One OpenAI-compatible endpoint and the model requested from it.
+
+    Attributes:
+        name (str): Name used in routes and stats (e.g. "openai", "groq").
+        model (str): Model sent with every request to this provider.
+        base_url (str, optional): API base URL; None for the OpenAI API.
+        api_key (str): API key.
+        timeout (float): Seconds before a request counts as failed.
+        max_retries (int): Retries of the OpenAI client itself before the gateway fails over.
+        requests_per_minute (int): Request limit of this provider (0 = no limit).
+        tokens_per_minute (int): Token limit of this provider (0 = no limit).
+    """
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 60.0,
+        max_retries: int = 0,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0
+    ):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=self.max_retries)
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=self.max_retries)
+        return self._async_client
+
+
+class ProviderHealth:
+    """
+    Rolling window of a provider's recent requests: (time, latency, succeeded) samples from the
+    last `window_seconds`, plus a cooldown after consecutive failures.
+    """
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.samples = deque()
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def prune(self, now: float) -> None:
+        while self.samples and self.samples[0][0] < now - self.window_seconds:
+            self.samples.popleft()
+
+    def error_rate(self) -> float:
+        return sum(not ok for _, _, ok in self.samples) / len(self.samples) if self.samples else 0.0
+
+    def latency(self, percentile: float) -> Optional[float]:
+        latencies = [latency for _, latency, ok in self.samples if ok]
+        return float(np.percentile(latencies, percentile)) if latencies else None
+
+
+class LLMGateway:
+    """
+    Routes chat completions across several OpenAI-compatible providers, preferring healthy,
+    fast ones and failing over to the next provider when a request errors or times out.
+
+    Providers are tried in configured order, except that providers cooling down (after
+    `max_consecutive_failures` failures in a row), with an error rate above `max_error_rate`,
+    or with a latency percentile over `slow_factor` times the fastest provider's are moved to
+    the back. Health only counts the last `window_seconds`, so a demoted provider returns to
+    its place once its bad samples age out. Every `probe_every`-th request goes first to a
+    provider with too few recent samples to judge, so the others' latency stays known.
+
+    Each provider has its own request and token budget (`rate_limiters`, keyed by provider
+    name), spent per attempt: a request that fails over waits for, and is charged to, the
+    budget of every provider it is sent to.
+
+    Attributes:
+        providers (list): The configured providers, in preference order.
+        routes (dict): Field -> provider names allowed for it, in preference order.
+        rate_limiters (dict): Provider name -> its RateLimiter.
+    """
+    def __init__(
+        self,
+        providers: List[Provider],
+        routes: Optional[Dict[str, List[str]]] = None,
+        window_seconds: float = 300.0,
+        min_samples: int = 5,
+        latency_percentile: float = 95,
+        slow_factor: float = 2.0,
+        max_error_rate: float = 0.5,
+        max_consecutive_failures: int = 3,
+        cooldown_seconds: float = 30.0,
+        probe_every: int = 20
+    ):
+        self.providers = providers
+        self.routes = routes or {}
+        self.min_samples = min_samples
+        self.latency_percentile = latency_percentile
+        self.slow_factor = slow_factor
+        self.max_error_rate = max_error_rate
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown_seconds = cooldown_seconds
+        self.probe_every = probe_every
+        self.health = {provider.name: ProviderHealth(window_seconds) for provider in providers}
+        self.rate_limiters = {
+            provider.name: RateLimiter(provider.requests_per_minute, provider.tokens_per_minute)
+            for provider in providers
+        }
+        self._by_name = {provider.name: provider for provider in providers}
+        self._requests = 0
+        self._failovers = 0
+        self._lock = threading.Lock()
+
+    def route(self, fields: List[str]) -> Optional[str]:
+        """
+        Field whose routing applies to a request for several fields: the first one with an override.
+        """
+        return next((field for field in fields if field in self.routes), None)
+
+    def allowed(self, field: Optional[str] = None) -> List[Provider]:
+        """
+        Providers a request for the field may go to, in configured order (health not considered).
+        """
+        names = self.routes.get(field) if field else None
+        allowed = [self._by_name[name] for name in names if name in self._by_name] if names else []
+        return allowed or list(self.providers)
+
+    def fingerprint(self, field: Optional[str] = None) -> str:
+        """
+        The providers and models a request for the field can be answered by, e.g.
+        "openai:gpt-4o-mini>groq:llama-3.3-70b-versatile". Response caches key on it, so changing
+        the providers or routes starts from an empty cache.
+        """
+        return ">".join(f"{provider.name}:{provider.model}" for provider in self.allowed(field))
+
+    def answered_by_primary(self, response, field: Optional[str] = None) -> bool:
+        """
+        Whether a response came from the first provider allowed for the field, rather than from
+        a fallback. Only those are cached, so a fallback model's answer is not replayed later
+        under the primary model's key.
+        """
+        allowed = self.allowed(field)
+        return bool(allowed) and getattr(response, "provider", None) == allowed[0].name
+
+    def candidates(self, field: Optional[str] = None) -> List[Provider]:
+        """
+        Providers to try for a request, best first.
+        """
+        candidates = self.allowed(field)
+
+        now = time.monotonic()
+        with self._lock:
+            self._requests += 1
+            for health in self.health.values():
+                health.prune(now)
+
+            latencies = {}
+            unhealthy = set()
+            for provider in candidates:
+                health = self.health[provider.name]
+                if health.cooldown_until > now or (
+                    len(health.samples) >= self.min_samples and health.error_rate() > self.max_error_rate
+                ):
+                    unhealthy.add(provider.name)
+                elif len(health.samples) >= self.min_samples:
+                    latencies[provider.name] = health.latency(self.latency_percentile)
+            known = [latency for latency in latencies.values() if latency is not None]
+            fastest = min(known) if known else None
+
+            def rank(item):
+                index, provider = item
+                latency = latencies.get(provider.name)
+                slow = fastest is not None and latency is not None and latency > fastest * self.slow_factor
+                return (provider.name in unhealthy, slow, index)
+
+            ordered = [provider for _, provider in sorted(enumerate(candidates), key=rank)]
+
+            # Probe a healthy provider lacking recent samples now and then
+            if self.probe_every and self._requests % self.probe_every == 0:
+                for provider in ordered[1:]:
+                    if provider.name not in unhealthy and len(self.health[provider.name].samples) < self.min_samples:
+                        ordered.remove(provider)
+                        ordered.insert(0, provider)
+                        break
+        return ordered
+
+    def record(self, provider: Provider, latency: float, succeeded: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            health = self.health[provider.name]
+            health.samples.append((now, latency, succeeded))
+            health.requests += 1
+            if succeeded:
+                health.consecutive_failures = 0
+            else:
+                health.failures += 1
+                health.consecutive_failures += 1
+                if health.consecutive_failures >= self.max_consecutive_failures:
+                    health.cooldown_until = now + self.cooldown_seconds
+
+    def complete(self, messages: List[Dict[str, str]], field: Optional[str] = None, completion_tokens: int = 0, **options):
+        """
+        Sends a chat completion to the best provider for the field, failing over on errors.
+
+        Each attempt first waits for one request and the estimated tokens (prompt plus
+        `completion_tokens`) in that provider's rate limits; the estimate is corrected with the
+        reported usage once the provider answers.
+
+        Returns:
+            The chat completion of the first provider that answered, with that provider's name
+            set as its `provider`.
+
+        Raises:
+            Exception: The last provider's error, if every provider failed.
+        """
+        error = RuntimeError("No LLM provider is configured")
+        reserved_tokens = estimate_tokens("".join(message.get("content") or "" for message in messages), completion_tokens)
+        for attempt, provider in enumerate(self.candidates(field)):
+            rate_limiter = self.rate_limiters[provider.name]
+            rate_limiter.acquire(reserved_tokens)
+            start = time.perf_counter()
+            try:
+                response = provider.client.chat.completions.create(model=provider.model, messages=messages, **options)
+            except Exception as e:
+                self.record(provider, time.perf_counter() - start, False)
+                print(f"LLM provider '{provider.name}' failed, failing over: {e}")
+                error = e
+                continue
+            self.record(provider, time.perf_counter() - start, True)
+            rate_limiter.settle(reserved_tokens, getattr(getattr(response, "usage", None), "total_tokens", None))
+            if attempt:
+                with self._lock:
+                    self._failovers += 1
+            response.provider = provider.name
+            return response
+        raise error
+
+    async def acomplete(self, messages: List[Dict[str, str]], field: Optional[str] = None, completion_tokens: int = 0, **options):
+        """
+        Async variant of `complete`. Waiting for a rate limit happens in a thread, so other
+        requests on the event loop keep running.
+        """
+        error = RuntimeError("No LLM provider is configured")
+        reserved_tokens = estimate_tokens("".join(message.get("content") or "" for message in messages), completion_tokens)
+        for attempt, provider in enumerate(self.candidates(field)):
+            rate_limiter = self.rate_limiters[provider.name]
+            await asyncio.to_thread(rate_limiter.acquire, reserved_tokens)
+            start = time.perf_counter()
+            try:
+                response = await provider.async_client.chat.completions.create(model=provider.model, messages=messages, **options)
+            except Exception as e:
+                self.record(provider, time.perf_counter() - start, False)
+                print(f"LLM provider '{provider.name}' failed, failing over: {e}")
+                error = e
+                continue
+            self.record(provider, time.perf_counter() - start, True)
+            rate_limiter.settle(reserved_tokens, getattr(getattr(response, "usage", None), "total_tokens", None))
+            if attempt:
+                with self._lock:
+                    self._failovers += 1
+            response.provider = provider.name
+            return response
+        raise error
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            providers = {}
+            for provider in self.providers:
+                health = self.health[provider.name]
+                health.prune(now)
+                latency = health.latency(self.latency_percentile)
+                providers[provider.name] = {
+                    "model": provider.model,
+                    "requests": health.requests,
+                    "failures": health.failures,
+                    "window_samples": len(health.samples),
+                    "window_error_rate": round(health.error_rate(), 3),
+                    f"window_p{self.latency_percentile:g}": round(latency, 3) if latency is not None else None,
+                    "cooling_down": health.cooldown_until > now,
+                }
+            return {"requests": self._requests, "failovers": self._failovers, "providers": providers}
+
+    def rate_limit_stats(self) -> dict:
+        """
+        Limits and waits of each provider's rate limiter, keyed by provider name.
+        """
+        return {name: rate_limiter.stats() for name, rate_limiter in self.rate_limiters.items()}
+
+
+def load_providers(configs: List[dict], requests_per_minute: int = 0, tokens_per_minute: int = 0) -> List[Provider]:
+    """
+    Builds providers from config entries with 'name', 'model', 'api_key_env' and optionally
+    'base_url', 'timeout', 'max_retries', 'requests_per_minute' and 'tokens_per_minute' (by default
+    the limits given here). Entries whose API key variable is not set are skipped.
+
+    With several providers the clients do not retry by default, so a failing provider is left
+    at once; a single provider keeps the OpenAI client's usual 2 retries.
+    """
+    providers = []
+    entries = [entry for entry in configs if entry.get("api_key") or os.getenv(entry.get("api_key_env", ""))]
+    for entry in configs:
+        api_key = entry.get("api_key") or os.getenv(entry.get("api_key_env", ""))
+        if not api_key:
+            print(f"LLM provider '{entry['name']}' skipped: {entry.get('api_key_env')} is not set")
+            continue
+        providers.append(Provider(
+            name=entry["name"],
+            model=entry["model"],
+            api_key=api_key,
+            base_url=entry.get("base_url") or None,
+            timeout=entry.get("timeout", 60.0),
+            max_retries=entry.get("max_retries", 2 if len(entries) == 1 else 0),
+            requests_per_minute=entry.get("requests_per_minute", requests_per_minute),
+            tokens_per_minute=entry.get("tokens_per_minute", tokens_per_minute)
+        ))
+    return providers
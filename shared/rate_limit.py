@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    A bucket holding up to `per_minute` units, refilled continuously at `per_minute / 60` per second.
+    The level may go negative when actual usage turns out higher than reserved.
+    """
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` units are available (0 if they are now).
+        """
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for LLM requests, with one token bucket for requests per minute and one
+    for tokens per minute, so parallel extraction stays under the provider's limits.
+
+    Callers reserve one request and an estimate of its tokens with `acquire` (blocking until both
+    buckets allow it), and report the real usage with `settle` once the response arrives.
+    A limit of 0 disables that bucket.
+
+    Attributes:
+        waits (int): Calls to `acquire` that had to wait.
+        waited_seconds (float): Total time spent waiting.
+    """
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Blocks until one request and `tokens` tokens can be spent, then spends them.
+        """
+        if self.requests is None and self.tokens is None:
+            return
+
+        started = None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = 0.0
+                for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                    if bucket is not None:
+                        bucket.refill(now)
+                        delay = max(delay, bucket.wait_time(amount))
+                if delay == 0.0:
+                    if self.requests is not None:
+                        self.requests.level -= 1
+                    if self.tokens is not None:
+                        self.tokens.level -= min(tokens, self.tokens.capacity)
+                    if started is not None:
+                        self.waits += 1
+                        self.waited_seconds += now - started
+                    return
+            if started is None:
+                started = time.monotonic()
+            time.sleep(delay)
+
+    def settle(self, reserved_tokens: int, used_tokens: Optional[int]) -> None:
+        """
+        Corrects the token bucket by the difference between the reserved and the actual usage.
+        """
+        if self.tokens is None or used_tokens is None:
+            return
+        with self._lock:
+            self.tokens.level += min(reserved_tokens, self.tokens.capacity) - used_tokens
+
+    def stats(self) -> dict:
+        return {
+            "requests_per_minute": self.requests.capacity if self.requests else None,
+            "tokens_per_minute": self.tokens.capacity if self.tokens else None,
+            "waits": self.waits,
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
+
+
+def estimate_tokens(text: str, completion_tokens: int = 0) -> int:
+    """
+    Rough token count of a prompt (about four characters per token) plus the expected completion.
+    """
+    return len(text) // 4 + completion_tokens
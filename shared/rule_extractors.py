@@ -0,0 +1,209 @@
+import re
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8, "sep": 9, "sept": 9,
+    "oct": 10, "nov": 11, "dec": 12,
+}
+
+_MONTH = r"(?i:" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_DAY = r"\d{1,2}(?i:st|nd|rd|th)?"
+
+# A date as contracts write it: 2024-04-01, 1st April 2024, April 1, 2024, 01-Apr-2024,
+# 29th- Feb -2024, 01/04/2024
+DATE = (
+    r"(?:\d{4}-\d{1,2}-\d{1,2}"
+    rf"|{_DAY}[\s/.-]*(?i:of\s+)?{_MONTH}[\s,/.-]*\d{{4}}"
+    rf"|{_MONTH}\s+{_DAY},?\s+\d{{4}}"
+    r"|\d{1,2}[/.-]\d{1,2}[/.-]\d{4})"
+)
+
+# A reference number: letters, digits and separators, ending in a letter or digit (and not
+# the start of an amount such as 1,26,71,620)
+IDENTIFIER = r"([A-Za-z0-9](?:[A-Za-z0-9/_.-]*[A-Za-z0-9])?)(?![,\d])"
+
+# What must follow a label before a reference number: "No.", "Number", "Ref", "#" or ":",
+# as in "PURCHASE ORDER # : 4500383264" (a bare "SOW 2024" or "PO Box 12" is not a number label)
+_LABEL_SUFFIX = r"\s*(?:(?i:no|number|num|ref(?:erence)?)\b\.?|[#:])(?:\s*[#:-])*\s*"
+
+# A currency written next to an amount label: "contract value of INR", "Cost (USD)",
+# "Currency: INR", "fees of $1,200"; a currency elsewhere in the text is not enough
+_AMOUNT_LABEL = r"(?i:\b(?:currency|value|amount|cost|price|fees?|rates?|sum)\b)"
+CURRENCY_CODES = {"usd": "USD", "us$": "USD", "$": "USD", "inr": "INR", "₹": "INR", "rs": "INR", "rs.": "INR"}
+
+# Precompiled patterns per rule; the first group of a match is the value
+RULE_PATTERNS = {
+    "sow_no": [
+        re.compile(r"\b(?:SOW|(?i:statement\s+of\s+work))" + _LABEL_SUFFIX + IDENTIFIER),
+    ],
+    "po_number": [
+        re.compile(r"\b(?:P\.?O\b\.?(?!\s*(?i:box)\b)|(?i:purchase\s+order))" + _LABEL_SUFFIX + IDENTIFIER),
+    ],
+    "amendment_no": [
+        re.compile(r"(?i:\bamendment)" + _LABEL_SUFFIX + IDENTIFIER),
+    ],
+    "credit_period": [
+        re.compile(r"(?i:\bnet\s*(?:due\s+)?\(?(\d{1,3})\)?\s*days?)"),
+        re.compile(r"(?i:\bwithin\s+(?:[a-z-]+\s*)?\(?(\d{1,3})\)?\s*days?\s+(?:of|from|after)\s+(?:the\s+)?(?:date\s+of\s+)?(?:receipt\s+of\s+)?(?:receiving\s+)?(?:the\s+|an\s+)?invoice)"),
+        re.compile(r"(?i:\bcredit\s+period\s+(?:of\s+|is\s+|shall\s+be\s+)?(?:[a-z-]+\s*)?\(?(\d{1,3})\)?\s*days?)"),
+    ],
+    "currency": [
+        re.compile(_AMOUNT_LABEL + r"[^.\n]{0,30}?(?<![A-Za-z])(\b(?i:USD|INR|Rs\.?)\b|US\$|\$|₹)(?=[\s\d).,;]|$)"),
+    ],
+    "cola": [
+        re.compile(r"(?i:\b(?:COLA|cost\s+of\s+living\s+adjustment)\b[^.%\n]{0,80}?(\d{1,2}(?:\.\d{1,2})?)\s*(?:%|percent\b))"),
+    ],
+    "start_date": [
+        re.compile(rf"(?i:\b(?:effective|commencement|start)\s+date\b(?:\s+of\s+this\s+[a-z ]{{1,40}}?)?\s*(?:is|shall\s+be|will\s+be)?\s*[:-]?\s*(?:on\s+)?)({DATE})"),
+        re.compile(rf"(?i:\b(?:effective|commencing|starting|commences|starts)\s+(?:from|on|as\s+of)\s+)({DATE})"),
+    ],
+    "end_date": [
+        re.compile(rf"(?i:\b(?:end|expiry|expiration|termination)\s+date\b\s*(?:is|shall\s+be|will\s+be)?\s*[:-]?\s*(?:on\s+)?)({DATE})"),
+        re.compile(rf"(?i:\b(?:expires\s+on|expire\s+on|ending\s+on|ends\s+on)\s+)({DATE})"),
+    ],
+}
+
+# Rule applied to each field name (SOW and MSA start and end dates share the date rules)
+FIELD_RULES = {
+    "sow_no": "sow_no",
+    "po_number": "po_number",
+    "amendment_no": "amendment_no",
+    "credit_period": "credit_period",
+    "cola": "cola",
+    "currency": "currency",
+    "sow_start_date": "start_date",
+    "msa_start_date": "start_date",
+    "sow_end_date": "end_date",
+    "msa_end_date": "end_date",
+}
+
+# Stands for a match that could not be normalized (e.g. 03/04/2024), so it counts as ambiguous
+_UNREADABLE = object()
+
+
+def parse_date(text: str) -> Optional[date]:
+    """
+    Parses a date matched by DATE. Numeric day/month dates are read day first, and only when
+    the day is over 12 (otherwise they are ambiguous and None is returned).
+    """
+    text = re.sub(r"(?<=\d)(?:st|nd|rd|th)\b", "", text.strip(), flags=re.IGNORECASE)
+    try:
+        match = re.fullmatch(r"(\d{4})-(\d{1,2})-(\d{1,2})", text)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        match = re.fullmatch(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})", text)
+        if match:
+            first, second, year = map(int, match.groups())
+            if first <= 12 and second <= 12 and first != second:
+                return None
+            day, month = (first, second) if first > 12 or first == second else (second, first)
+            return date(year, month, day)
+        words = re.findall(r"[A-Za-z]+|\d+", text)
+        numbers = [int(word) for word in words if word.isdigit()]
+        months = [MONTHS[word.lower()] for word in words if word.lower() in MONTHS]
+        if len(numbers) == 2 and len(months) == 1:
+            day, year = sorted(numbers)
+            return date(year, months[0], day)
+    except ValueError:
+        pass
+    return None
+
+
+class RuleExtractor:
+    """
+    Deterministic fast path run over a document's page text before retrieval and the LLM.
+
+    Each supported field has precompiled patterns (FIELD_RULES / RULE_PATTERNS). Every match on
+    every page is normalized (dates to `date_format`, numbers without padding, reference numbers
+    as written), and the field is answered only if all matches agree on a single value. No
+    match, or several different values, leave the field to the LLM.
+
+    Attributes:
+        date_format (str): strftime format of extracted dates.
+    """
+    def __init__(self, date_format: str = "%Y-%m-%d"):
+        self.date_format = date_format
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._documents = 0
+        self._seconds = 0.0
+
+    def extract(self, pages: List[Tuple[int, str]], fields: Iterable[str]) -> Dict[str, dict]:
+        """
+        Answers the fields that have a single unambiguous match in the pages.
+
+        Args:
+            pages (list): (page number, page text) pairs.
+            fields (iterable): Fields to try; fields without a rule are skipped.
+
+        Returns:
+            dict: Field -> {"value", "page_number"} for the answered fields only.
+        """
+        start = time.perf_counter()
+        answers = {}
+        outcomes = {}
+        for field in fields:
+            rule = FIELD_RULES.get(field)
+            if rule is None:
+                continue
+            candidates = self.candidates(rule, pages)
+            values = {value for value, _ in candidates}
+            if not candidates:
+                outcomes[field] = "no_match"
+            elif len(values) > 1 or _UNREADABLE in values:
+                outcomes[field] = "ambiguous"
+            else:
+                value, page_number = candidates[0]
+                answers[field] = {"value": value, "page_number": page_number}
+                outcomes[field] = "answered"
+
+        with self._lock:
+            self._documents += 1
+            self._seconds += time.perf_counter() - start
+            for field, outcome in outcomes.items():
+                totals = self._totals.setdefault(field, {"answered": 0, "ambiguous": 0, "no_match": 0})
+                totals[outcome] += 1
+        return answers
+
+    def candidates(self, rule: str, pages: List[Tuple[int, str]]) -> List[tuple]:
+        """
+        Returns the normalized (value, page number) of every match of the rule, in page order.
+        """
+        candidates = []
+        for page_number, text in pages:
+            for pattern in RULE_PATTERNS[rule]:
+                for match in pattern.finditer(text):
+                    value = self.normalize(rule, match.group(1))
+                    if value is not None:
+                        candidates.append((value, page_number))
+        return candidates
+
+    def normalize(self, rule: str, value: str):
+        """
+        Normalizes a matched value; returns None for matches that are not values after all
+        (e.g. a reference without digits) and _UNREADABLE for dates that cannot be read safely.
+        """
+        if rule in ("start_date", "end_date"):
+            parsed = parse_date(value)
+            return parsed.strftime(self.date_format) if parsed else _UNREADABLE
+        if rule == "currency":
+            return CURRENCY_CODES[value.lower()]
+        if rule in ("credit_period", "cola"):
+            number = float(value)
+            return f"{number:g}"
+        # Reference numbers must contain a digit, so that words after the label are not taken
+        value = value.rstrip(".-/")
+        return value if re.search(r"\d", value) else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": self._documents,
+                "ms_per_document": round(1000 * self._seconds / self._documents, 3) if self._documents else 0.0,
+                "fields": {field: dict(totals) for field, totals in sorted(self._totals.items())},
+            }
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+
+# Size of each chunk read from the upload and written to disk
+CHUNK_SIZE = 1024 * 1024
+
+
+class SavedUpload:
+    """
+    An uploaded file that has been streamed to disk.
+
+    Attributes:
+        file_location (str): Path of the saved file.
+        size (int): Size in bytes.
+        sha256 (str): Hex SHA-256 digest of the content, computed while streaming.
+    """
+    def __init__(self, file_location: str, size: int, sha256: str):
+        self.file_location = file_location
+        self.size = size
+        self.sha256 = sha256
+
+
+async def save_upload(
+    file: UploadFile,
+    file_location: str,
+    max_size: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> SavedUpload:
+    """
+    Streams an upload to disk chunk by chunk, so memory use does not grow with file size.
+
+    The content is written to a temporary file next to `file_location` and hashed on the fly;
+    the temporary file is moved into place only once the whole upload has been received.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        file_location (str): Final path of the saved file.
+        max_size (int, optional): Maximum accepted size in bytes. Larger uploads are rejected with 413.
+        chunk_size (int): Bytes read per chunk.
+
+    Returns:
+        SavedUpload: The saved file's location, size and SHA-256 digest.
+
+    Raises:
+        HTTPException: 413 if the upload exceeds `max_size`.
+    """
+    directory = os.path.dirname(file_location) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    fd, temp_location = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds the maximum upload size of {max_size // (1024 * 1024)} MB."
+                    )
+                sha256.update(chunk)
+                f.write(chunk)
+        os.replace(temp_location, file_location)
+    except BaseException:
+        if os.path.exists(temp_location):
+            os.remove(temp_location)
+        raise
+
+    return SavedUpload(file_location, size, sha256.hexdigest())
+
+
+def hash_file(file_location: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Returns the hex SHA-256 digest of a file on disk, read chunk by chunk.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_location, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()